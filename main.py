@@ -3,21 +3,49 @@ Script principal para transcrição de áudio e geração automática de slides.
 Orquestra todos os módulos do sistema com sistema de fila de processamento.
 """
 
+import builtins
+import gc
+import os
 import shutil
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import repeat
+from operator import setitem
 from pathlib import Path
 
+from openai import APIError
+
 from src.config import carregar_configuracao
-from src.transcription import criar_cliente, transcrever_audio, processar_transcricao
+from src.audio_utils import listar_audios
+from src.transcription import (
+    criar_cliente, aquecer_cliente, obter_palavras_com_timestamps, obter_palavras_de_varios_audios
+)
 from src.output import exibir_resultados, salvar_transcricao, exibir_resumo
-from src.router import detectar_tipo_conteudo, deve_processar_matematica
+from src.router import detectar_tipo_conteudo, detectar_tipos_de_varios_textos, deve_processar_matematica
 from src.math_parser import converter_formulas_para_latex
 from src.chunking import segmentar_transcricao, preparar_chunks_com_texto
-from src.slide_generator import gerar_slides, salvar_slides, exibir_preview_slides
+from src.slide_generator import gerar_slides, gerar_slides_batch, salvar_slides, exibir_preview_slides
 from src.slide_enricher import enriquecer_todos_slides, limpar_metadados_enriquecimento
 from src.validation import validar_conteudo, corrigir_conteudo_slides
 from src.timestamp_matcher import sincronizar_todos_slides, limpar_metadados_sincronizacao
-from src.pptx_generator import gerar_apresentacao_powerpoint
-from src.pptx_to_images import exportar_slides_como_imagens
+
+
+# Formatos de áudio aceitos nas pastas de projeto
+EXTENSOES_PROJETO = frozenset({'.mp3', '.m4a'})
+
+# Serializa a escrita no console quando vários áudios são processados ao
+# mesmo tempo (reentrante: blocos com vários prints também o seguram)
+_lock_console = threading.RLock()
+
+# Com mais de um worker, print é substituído por _print_sincronizado: cada
+# chamada escreve de uma vez, com as linhas identificadas pelo áudio da thread
+_print_original = builtins.print
+_audio_da_thread = threading.local()
+
+# ETAPA 5 usa matplotlib (pyplot), que não é thread-safe
+_lock_pptx = threading.Lock()
 
 
 def obter_pastas_projetos(pasta_audios):
@@ -42,17 +70,78 @@ def obter_audios_projeto(pasta_projeto):
         print(f"Aviso: {pasta_audios_projeto} não encontrada")
         return []
 
-    # Buscar ambos formatos de áudio
-    audios_mp3 = list(pasta_audios_projeto.glob("*.mp3"))
-    audios_m4a = list(pasta_audios_projeto.glob("*.m4a"))
-    audios = sorted(audios_mp3 + audios_m4a)
-    return audios
+    # Buscar ambos formatos de áudio em uma única varredura
+    return listar_audios(pasta_audios_projeto, EXTENSOES_PROJETO)
 
 
-def processar_audio(client, audio_path, output_dir, template_path):
+def obter_num_workers(total_audios):
+    """
+    Define quantos áudios de um projeto são processados em paralelo.
+    Aceita --workers=N na linha de comando; padrão: número de CPUs.
+
+    Args:
+        total_audios (int): Quantidade de áudios do projeto
+
+    Returns:
+        int: Número de workers (mínimo 1)
+    """
+    padrao = max(1, min(total_audios, os.cpu_count() or 4))
+    for arg in sys.argv[1:]:
+        if arg.startswith("--workers="):
+            try:
+                return max(1, min(total_audios, int(arg.split("=", 1)[1])))
+            except ValueError:
+                print(f"Aviso: {arg} inválido (use --workers=N, com N inteiro); usando {padrao} worker(s)")
+    return padrao
+
+
+def _print_sincronizado(*args, sep=" ", end="\n", file=None, flush=False):
+    """
+    Substituto de print durante o processamento paralelo: escreve sob
+    _lock_console e, nas threads de áudio, prefixa cada linha com o nome do áudio.
+    """
+    prefixo = getattr(_audio_da_thread, "nome", None)
+    if prefixo and file in (None, sys.stdout, sys.stderr):
+        texto = (" " if sep is None else sep).join(map(str, args))
+        args = ("\n".join(f"[{prefixo}] {linha}" if linha else linha for linha in texto.split("\n")),)
+    with _lock_console:
+        _print_original(*args, sep=sep, end=end, file=file, flush=flush)
+
+
+def _processar_audio_no_worker(client, audio_path, *args):
+    """
+    Executa processar_audio numa thread do pool, identificando no console as
+    linhas impressas por ela com o nome do áudio.
+    """
+    _audio_da_thread.nome = audio_path.stem
+    try:
+        return processar_audio(client, audio_path, *args)
+    finally:
+        _audio_da_thread.nome = None
+
+
+def mover_projeto(origem, destino):
+    """
+    Move a pasta do projeto concluído (executado em segundo plano).
+
+    Args:
+        origem (Path): Pasta do projeto
+        destino (Path): Caminho de destino
+    """
+    try:
+        shutil.move(str(origem), str(destino))
+        with _lock_console:
+            print(f"\n✓ Movido para: {destino}")
+    except OSError as e:
+        with _lock_console:
+            print(f"\n✗ ERRO ao mover {origem.name} para {destino}: {e}")
+
+
+def processar_audio(client, audio_path, output_dir, template_path, usar_cache=True,
+                    palavras_com_timestamps=None, deteccao=None):
     """
     Processa um único arquivo de áudio:
-    1. Transcrição com timestamps
+    1. Transcrição com timestamps (reaproveitada do lote/cache quando possível)
     2. Segmentação em chunks
     3. Geração de slides JSON
     4. Validação e sincronização
@@ -72,35 +161,57 @@ def processar_audio(client, audio_path, output_dir, template_path):
         # ETAPA 1: Transcrição
         print("\n[ETAPA 1] Transcrição do áudio")
         print("-" * 70)
-        transcript = transcrever_audio(client, audio_path)
-        palavras_com_timestamps = processar_transcricao(transcript)
+        if palavras_com_timestamps is None:
+            palavras_com_timestamps = obter_palavras_com_timestamps(client, audio_path, usar_cache)
+        else:
+            print(f"Arquivo selecionado: {audio_path.name}")
+            print("Transcrição obtida no lote do projeto.")
 
         if not palavras_com_timestamps:
             print("Aviso: Nenhuma palavra com timestamp encontrada")
             return False
 
         exibir_resultados(palavras_com_timestamps)
-        json_path = salvar_transcricao(palavras_com_timestamps, audio_path, output_dir)
+        json_path = salvar_transcricao(
+            palavras_com_timestamps, audio_path, output_dir,
+            compacto="--json-compacto" in sys.argv
+        )
         exibir_resumo(palavras_com_timestamps)
 
         # ETAPA 1.5: Detecção de tipo de conteúdo e conversão matemática
         print(f"\n{'=' * 70}")
         print("[ETAPA 1.5] Análise de Tipo de Conteúdo")
         print("-" * 70)
-        texto_completo = " ".join([p["palavra"] for p in palavras_com_timestamps])
-        deteccao = detectar_tipo_conteudo(client, texto_completo)
+        # Lista de palavras e texto completo montados uma única vez e reutilizados
+        # nas etapas seguintes (segmentação, conversão LaTeX, busca de marcadores)
+        palavras_texto = [p["palavra"] for p in palavras_com_timestamps]
+        texto_transcricao = " ".join(palavras_texto)
+
+        # A segmentação (ETAPA 2) só depende do texto original: é disparada em paralelo
+        # com a detecção de tipo e a conversão LaTeX, que também são chamadas de rede
+        executor_llm = ThreadPoolExecutor(max_workers=1)
+        futuro_chunks = executor_llm.submit(
+            segmentar_transcricao, client, palavras_com_timestamps, texto_transcricao
+        )
+        executor_llm.shutdown(wait=False)
+
+        if deteccao is None:
+            deteccao = detectar_tipo_conteudo(client, texto_transcricao, usar_cache)
+        else:
+            print(f"Tipo de conteúdo obtido no lote do projeto: {deteccao['tipo_conteudo'].upper()}")
 
         # Converte fórmulas para LaTeX se for conteúdo matemático
         if deve_processar_matematica(deteccao):
             print("\n[MATH MODE] Ativando processamento matemático...")
-            texto_completo = converter_formulas_para_latex(client, texto_completo)
+            texto_convertido = converter_formulas_para_latex(client, texto_transcricao, usar_cache)
 
             # Atualiza palavras_com_timestamps com texto convertido
             # (mantém os timestamps originais, apenas substitui as palavras)
-            palavras_convertidas = texto_completo.split()
+            palavras_convertidas = texto_convertido.split()
             if len(palavras_convertidas) == len(palavras_com_timestamps):
-                for i, nova_palavra in enumerate(palavras_convertidas):
-                    palavras_com_timestamps[i]["palavra"] = nova_palavra
+                # Substituição em loop C (map + setitem), sem alocar novos dicionários
+                list(map(setitem, palavras_com_timestamps, repeat("palavra"), palavras_convertidas))
+                texto_transcricao = " ".join(palavras_convertidas)
             else:
                 print("  ⚠ Aviso: Comprimento do texto convertido difere do original")
                 print("  ⚠ Mantendo transcrição original com LaTeX inline")
@@ -109,9 +220,13 @@ def processar_audio(client, audio_path, output_dir, template_path):
         print(f"\n{'=' * 70}")
         print("[ETAPA 2] Segmentação e Geração de Slides")
         print("-" * 70)
-        chunks = segmentar_transcricao(client, palavras_com_timestamps)
-        chunks_com_texto = preparar_chunks_com_texto(palavras_com_timestamps, chunks)
-        slides = gerar_slides(client, chunks_com_texto)
+        chunks = futuro_chunks.result()
+        # Marcadores da segmentação referem-se ao texto original (palavras_texto)
+        chunks_com_texto = preparar_chunks_com_texto(palavras_com_timestamps, chunks, palavras_texto)
+        if "--batch-api" in sys.argv:
+            slides = gerar_slides_batch(client, chunks_com_texto, usar_cache=usar_cache)
+        else:
+            slides = gerar_slides(client, chunks_com_texto, usar_cache=usar_cache)
 
         if not slides:
             print("Aviso: Nenhum slide gerado")
@@ -121,7 +236,6 @@ def processar_audio(client, audio_path, output_dir, template_path):
         print(f"\n{'=' * 70}")
         print("[ETAPA 3] Validação e Sincronização")
         print("-" * 70)
-        texto_transcricao = " ".join([p["palavra"] for p in palavras_com_timestamps])
         resultado_conteudo = validar_conteudo(client, texto_transcricao, slides)
 
         if not resultado_conteudo.get("conteudo_valido", False):
@@ -136,23 +250,32 @@ def processar_audio(client, audio_path, output_dir, template_path):
         print(f"\n{'=' * 70}")
         print("[ETAPA 4] Enriquecimento de Conteúdo")
         print("-" * 70)
-        slides_enriquecidos = enriquecer_todos_slides(client, slides_sincronizados)
+        slides_enriquecidos = enriquecer_todos_slides(client, slides_sincronizados, usar_cache=usar_cache)
         slides_limpos = limpar_metadados_sincronizacao(slides_enriquecidos)
         slides_finais = limpar_metadados_enriquecimento(slides_limpos)
         slides_json_path = salvar_slides(slides_finais, json_path, output_dir)
         exibir_preview_slides(slides_finais)
 
-        # ETAPA 5: Geração de PowerPoint
-        print(f"\n{'=' * 70}")
-        print("[ETAPA 5] Geração de PowerPoint")
-        print("-" * 70)
-        pptx_path = gerar_apresentacao_powerpoint(
-            slides_json_path,
-            template_path if template_path.exists() else None,
-            output_dir
-        )
-
-        # ETAPA 6: Exportação para PNG
+        # Importados sob demanda: python-pptx e matplotlib só são carregados
+        # quando algum áudio chega de fato a estas etapas
+        from src.pptx_generator import gerar_apresentacao_powerpoint
+        from src.pptx_to_images import exportar_slides_como_imagens
+
+        # Só a ETAPA 5 é serializada aqui: enquanto um áudio exporta PNGs,
+        # o próximo já pode gerar seu PowerPoint (pipeline entre áudios)
+        with _lock_pptx:
+            # ETAPA 5: Geração de PowerPoint
+            print(f"\n{'=' * 70}")
+            print("[ETAPA 5] Geração de PowerPoint")
+            print("-" * 70)
+            pptx_path = gerar_apresentacao_powerpoint(
+                slides_json_path,
+                template_path if template_path.exists() else None,
+                output_dir,
+                usar_dvipng="--dvipng" in sys.argv
+            )
+
+        # ETAPA 6: Exportação para PNG (PowerPoint COM serializado dentro de pptx_to_images)
         print(f"\n{'=' * 70}")
         print("[ETAPA 6] Exportação de Slides para PNG")
         print("-" * 70)
@@ -172,10 +295,14 @@ def processar_audio(client, audio_path, output_dir, template_path):
 
         return True
 
+    except (APIError, TimeoutError, FileNotFoundError) as e:
+        # Falhas esperadas (API instável, arquivo ausente): mensagem curta, sem stack trace
+        print(f"\n✗ ERRO ao processar {audio_path.name}: {e}")
+        return False
     except Exception as e:
         print(f"\n✗ ERRO ao processar {audio_path.name}: {e}")
-        import traceback
-        traceback.print_exc()
+        # Via print, para o traceback sair inteiro (e identificado) sob o lock do console
+        print(traceback.format_exc(), end="", file=sys.stderr)
         return False
 
 
@@ -183,7 +310,7 @@ def main():
     """
     Função principal com sistema de fila:
     1. Escaneia pastas de projetos em audios/
-    2. Para cada projeto, processa todos os áudios
+    2. Para cada projeto, processa todos os áudios (em paralelo, --workers=N)
     3. Move projeto para audios/Prontos/ após conclusão
     """
     try:
@@ -194,7 +321,12 @@ def main():
         # Configuração inicial
         api_key = carregar_configuracao()
         client = criar_cliente(api_key)
+        # Conexão com a API é aquecida enquanto as pastas são escaneadas
+        aquecer_cliente(client)
         template_path = Path("template.pptx")
+        usar_cache = "--no-cache" not in sys.argv
+        if not usar_cache:
+            print("\n*** CACHE DESATIVADO (--no-cache) ***")
 
         # Diretórios base
         pasta_audios_base = Path("audios")
@@ -215,6 +347,13 @@ def main():
         for p in projetos:
             print(f"  - {p.name}")
 
+        # Movimentação de projetos concluídos (uma de cada vez, em segundo plano)
+        mover = ThreadPoolExecutor(max_workers=1)
+
+        # O pipeline cria muitos dicts temporários e nenhum ciclo de referência:
+        # coleta automática desligada, com uma coleta manual a cada áudio concluído
+        gc.disable()
+
         # Processar cada projeto
         total_projetos = len(projetos)
         total_audios_processados = 0
@@ -236,28 +375,60 @@ def main():
             for a in audios:
                 print(f"  - {a.name}")
 
-            # Processar cada áudio do projeto
-            sucessos_projeto = 0
-            erros_projeto = 0
-
-            for idx_audio, audio_path in enumerate(audios, 1):
-                print(f"\n{'-' * 70}")
-                print(f"ÁUDIO [{idx_audio}/{len(audios)}]: {audio_path.name}")
-                print(f"{'-' * 70}")
-
-                # Determinar nome do output (ex: audio_01, audio_02)
-                audio_nome = audio_path.stem  # audio_01.mp3 -> audio_01
-                output_dir = pasta_output_base / pasta_projeto.name / audio_nome
+            # ETAPA 1 em lote: todas as transcrições do projeto disparadas de uma vez
+            print(f"\nTranscrevendo {len(audios)} áudio(s) em lote...")
+            transcricoes = obter_palavras_de_varios_audios(client, audios, usar_cache)
 
-                # Processar áudio
-                sucesso = processar_audio(client, audio_path, output_dir, template_path)
+            # ETAPA 1.5 (detecção de tipo) também em lote, sobre as transcrições obtidas
+            textos = [
+                " ".join([p["palavra"] for p in palavras]) if palavras else None
+                for palavras in transcricoes
+            ]
+            deteccoes = detectar_tipos_de_varios_textos(client, textos, usar_cache)
 
-                if sucesso:
-                    sucessos_projeto += 1
-                    total_audios_processados += 1
-                else:
-                    erros_projeto += 1
-                    total_audios_erro += 1
+            # Processar áudios do projeto em paralelo (etapas limitadas por rede/API)
+            sucessos_projeto = 0
+            erros_projeto = 0
+            num_workers = obter_num_workers(len(audios))
+            print(f"\nProcessando com {num_workers} worker(s) em paralelo")
+
+            # Com vários workers, cada print sai inteiro e identificado pelo áudio
+            if num_workers > 1:
+                builtins.print = _print_sincronizado
+            try:
+                with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    futuros = {}
+                    for audio_path, palavras, deteccao in zip(audios, transcricoes, deteccoes):
+                        # Determinar nome do output (ex: audio_01, audio_02)
+                        audio_nome = audio_path.stem  # audio_01.mp3 -> audio_01
+                        output_dir = pasta_output_base / pasta_projeto.name / audio_nome
+
+                        futuro = executor.submit(
+                            _processar_audio_no_worker, client, audio_path, output_dir, template_path, usar_cache,
+                            palavras, deteccao
+                        )
+                        futuros[futuro] = audio_path
+
+                    for idx_audio, futuro in enumerate(as_completed(futuros), 1):
+                        audio_path = futuros[futuro]
+                        sucesso = futuro.result()
+
+                        with _lock_console:
+                            print(f"\n{'-' * 70}")
+                            status = "OK" if sucesso else "ERRO"
+                            print(f"ÁUDIO [{idx_audio}/{len(audios)}] concluído: {audio_path.name} ({status})")
+                            print(f"{'-' * 70}")
+
+                        if sucesso:
+                            sucessos_projeto += 1
+                            total_audios_processados += 1
+                        else:
+                            erros_projeto += 1
+                            total_audios_erro += 1
+
+                        gc.collect()
+            finally:
+                builtins.print = _print_original
 
             # Resumo do projeto
             print(f"\n{'#' * 70}")
@@ -270,11 +441,14 @@ def main():
             if erros_projeto == 0 and len(audios) > 0:
                 destino = pasta_prontos / pasta_projeto.name
                 print(f"\nMovendo {pasta_projeto.name} para Prontos/")
-                shutil.move(str(pasta_projeto), str(destino))
-                print(f"✓ Movido para: {destino}")
+                # Move em segundo plano: o próximo projeto começa sem esperar a cópia
+                mover.submit(mover_projeto, pasta_projeto, destino)
             else:
                 print(f"\n⚠ Projeto NÃO movido para Prontos (houve erros ou sem áudios)")
 
+        # Aguarda as movimentações pendentes antes do resumo
+        mover.shutdown(wait=True)
+
         # RESUMO FINAL GERAL
         print(f"\n{'=' * 70}")
         print("PROCESSAMENTO COMPLETO - RESUMO GERAL")
@@ -290,8 +464,9 @@ def main():
         print(f"\nErro de configuração: {e}")
     except Exception as e:
         print(f"\nErro inesperado: {e}")
-        import traceback
         traceback.print_exc()
+    finally:
+        gc.enable()
 
 
 if __name__ == "__main__":
@@ -4,11 +4,19 @@ Processa projetos em fila: output/ → resultados/
 Orquestra todo o pipeline: conversão de slides → script → renderização.
 """
 
+import os
 import shutil
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from src.pptx_to_images import exportar_slides_como_imagens, verificar_imagens_exportadas
-from src.show_script_generator import gerar_show_script, validar_show_script, exibir_preview_show_script
-from src.video_renderer import renderizar_video, estimar_tempo_renderizacao, verificar_dependencias_moviepy
+from src.audio_utils import listar_audios, obter_primeiro_audio, obter_duracao_audio
+from src.show_script_generator import (
+    gerar_show_script, obter_show_script, validar_show_script, exibir_preview_show_script
+)
+from src.video_renderer_ffmpeg import ffmpeg_disponivel
+
+# src.pptx_to_images (python-pptx) e src.video_renderer (moviepy) são importados
+# dentro das funções que os usam, para não pesar na inicialização do script
 
 
 def obter_projetos_output(pasta_output):
@@ -34,6 +42,57 @@ def obter_subpastas_audio(pasta_projeto):
     return subpastas
 
 
+def mover_projeto(origem, destino):
+    """
+    Move a pasta do projeto concluído (executado em segundo plano).
+
+    Args:
+        origem (Path): Pasta do projeto
+        destino (Path): Caminho de destino
+    """
+    try:
+        shutil.move(str(origem), str(destino))
+        print(f"\nOK Movido para: {destino}")
+    except OSError as e:
+        print(f"\nERRO ao mover {origem.name} para {destino}: {e}")
+
+
+def copiar_arquivo_rapido(origem, destino):
+    """
+    Copia um arquivo evitando mover bytes sempre que possível:
+    1. Hardlink (mesmo sistema de arquivos, instantâneo)
+    2. os.copy_file_range (cópia dentro do kernel / reflink em btrfs e XFS)
+    3. shutil.copy2 (cópia convencional, ex: entre discos diferentes)
+
+    Args:
+        origem (Path): Arquivo de origem
+        destino (Path): Caminho de destino (não deve existir)
+    """
+    try:
+        os.link(origem, destino)
+        return
+    except OSError:
+        pass
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            tamanho = origem.stat().st_size
+            copiado = 0
+            with open(origem, 'rb') as f_origem, open(destino, 'wb') as f_destino:
+                while copiado < tamanho:
+                    n = os.copy_file_range(f_origem.fileno(), f_destino.fileno(), tamanho - copiado)
+                    if n == 0:
+                        break
+                    copiado += n
+            if copiado == tamanho:
+                shutil.copystat(origem, destino)
+                return
+        except OSError:
+            pass
+
+    shutil.copy2(origem, destino)
+
+
 def localizar_audio_original(nome_projeto, nome_audio):
     """
     Localiza o áudio original em audios/Prontos/nome_projeto/audios/
@@ -51,13 +110,24 @@ def localizar_audio_original(nome_projeto, nome_audio):
         print(f"  Aviso: Pasta {pasta_prontos} não encontrada")
         return None
 
-    # Procurar arquivo de áudio em formatos suportados
+    # Procurar arquivo de áudio em formatos suportados (ordem = prioridade)
     extensoes = ['.mp3', '.m4a', '.wav', '.mp4', '.mpeg', '.mpga', '.webm']
 
+    # Uma única varredura da pasta em vez de um exists() por extensão. A
+    # extensão é comparada sem diferenciar maiúsculas (audio_01.MP3) e o nome
+    # segue a regra do sistema (no Windows, Audio_01 == audio_01, como no exists())
+    nome_normalizado = os.path.normcase(nome_audio)
+    encontrados = {}
+    with os.scandir(pasta_prontos) as entradas:
+        for entrada in entradas:
+            stem, ext = os.path.splitext(entrada.name)
+            ext = ext.lower()
+            if os.path.normcase(stem) == nome_normalizado and ext in extensoes:
+                encontrados.setdefault(ext, entrada.path)
+
     for ext in extensoes:
-        audio_path = pasta_prontos / f"{nome_audio}{ext}"
-        if audio_path.exists():
-            return audio_path
+        if ext in encontrados:
+            return Path(encontrados[ext])
 
     print(f"  Aviso: Áudio {nome_audio} não encontrado em {pasta_prontos}")
     return None
@@ -67,7 +137,8 @@ def processar_audio_para_video(
     pasta_audio,
     nome_projeto,
     resolucao=(1920, 1080),
-    fps=24
+    fps=24,
+    usar_ffmpeg=False
 ):
     """
     Processa um único áudio: regenera imagens, monta vídeo.
@@ -77,10 +148,14 @@ def processar_audio_para_video(
         nome_projeto (str): Nome do projeto
         resolucao (tuple): Resolução do vídeo
         fps (int): Frames por segundo
+        usar_ffmpeg (bool): Se True, renderiza com ffmpeg em vez de moviepy
 
     Returns:
         bool: True se sucesso, False se erro
     """
+    from src.pptx_to_images import exportar_slides_como_imagens
+    from src.video_renderer import renderizar_video, estimar_tempo_renderizacao
+
     try:
         nome_audio = pasta_audio.name  # audio_01, audio_02, etc.
 
@@ -88,30 +163,33 @@ def processar_audio_para_video(
         print(f"Processando: {nome_projeto}/{nome_audio}")
         print(f"{'=' * 70}")
 
-        # 1. Localizar arquivos necessários
-        pptx_files = list(pasta_audio.glob("*.pptx"))
-        slides_json_files = list(pasta_audio.glob("*_slides.json"))
-
-        if not pptx_files:
+        # 1. Localizar arquivos necessários (.pptx e *_slides.json numa única varredura)
+        pptx_path = None
+        slides_json_path = None
+        with os.scandir(pasta_audio) as entradas:
+            for entrada in entradas:
+                nome = entrada.name
+                if pptx_path is None and nome.endswith(".pptx"):
+                    pptx_path = Path(entrada.path)
+                elif slides_json_path is None and nome.endswith("_slides.json"):
+                    slides_json_path = Path(entrada.path)
+                if pptx_path and slides_json_path:
+                    break
+
+        if not pptx_path:
             print(f"  ERRO: Nenhum .pptx encontrado em {pasta_audio}")
             return False
 
-        if not slides_json_files:
+        if not slides_json_path:
             print(f"  ERRO: Nenhum *_slides.json encontrado em {pasta_audio}")
             return False
 
-        pptx_path = pptx_files[0]
-        slides_json_path = slides_json_files[0]
-
         print(f"  PowerPoint: {pptx_path.name}")
         print(f"  Slides JSON: {slides_json_path.name}")
 
         # 2. Localizar áudio (primeiro localmente, depois em audios/Prontos)
-        # Procurar arquivos de áudio na pasta atual (múltiplos formatos)
-        extensoes = ['*.mp3', '*.m4a', '*.wav', '*.mp4', '*.mpeg', '*.mpga', '*.webm']
-        audio_files = []
-        for ext in extensoes:
-            audio_files.extend(list(pasta_audio.glob(ext)))
+        # Procurar arquivos de áudio na pasta atual (múltiplos formatos, uma varredura)
+        audio_files = listar_audios(pasta_audio)
 
         if audio_files:
             # Áudio já existe localmente
@@ -129,7 +207,7 @@ def processar_audio_para_video(
             # Copiar áudio para pasta de output
             audio_destino = pasta_audio / audio_original.name
             print(f"  Copiando áudio: {audio_original.name}")
-            shutil.copy2(audio_original, audio_destino)
+            copiar_arquivo_rapido(audio_original, audio_destino)
 
         # 3. Regenerar slides_images/
         print("\n[ETAPA 1] Regenerando slides como imagens...")
@@ -148,7 +226,8 @@ def processar_audio_para_video(
         show_script_path = pasta_audio / "show_script.json"
 
         try:
-            show_script = gerar_show_script(slides_json_path, show_script_path)
+            # Reaproveita o script se os slides não mudaram desde a última geração
+            show_script = obter_show_script(slides_json_path, show_script_path)
             valido, erros = validar_show_script(show_script)
 
             if not valido:
@@ -165,21 +244,10 @@ def processar_audio_para_video(
         # 5. Renderizar vídeo
         print("\n[ETAPA 3] Renderizando vídeo...")
 
-        # Estimar tempo
-        import json
-        with open(show_script_path, 'r', encoding='utf-8') as f:
-            script_data = json.load(f)
-
-        try:
-            from moviepy import AudioFileClip
-        except ImportError:
-            from moviepy.editor import AudioFileClip
-
-        audio_clip = AudioFileClip(str(audio_destino))
-        duracao_audio = audio_clip.duration
-        audio_clip.close()
+        # Estimar tempo (usa o script já em memória)
+        duracao_audio = obter_duracao_audio(audio_destino)
 
-        tempo_estimado = estimar_tempo_renderizacao(duracao_audio, len(script_data))
+        tempo_estimado = estimar_tempo_renderizacao(duracao_audio, len(show_script))
         print(f"  Tempo estimado: {tempo_estimado:.1f} minutos")
 
         # Determinar nome do vídeo
@@ -194,7 +262,8 @@ def processar_audio_para_video(
                 output_path=output_video_path,
                 legendas_moviepy=None,
                 resolucao=resolucao,
-                fps=fps
+                fps=fps,
+                usar_ffmpeg_direto=usar_ffmpeg
             )
 
             print(f"\n{'=' * 70}")
@@ -202,15 +271,20 @@ def processar_audio_para_video(
             print(f"{'=' * 70}")
             return True
 
+        except (TimeoutError, FileNotFoundError) as e:
+            # Falhas esperadas (ex: ffmpeg ou imagem ausente): mensagem curta, sem stack trace
+            print(f"\n  ERRO na renderização: {e}")
+            return False
         except Exception as e:
             print(f"\n  ERRO na renderização: {e}")
-            import traceback
             traceback.print_exc()
             return False
 
+    except (TimeoutError, FileNotFoundError) as e:
+        print(f"\n  ERRO: {e}")
+        return False
     except Exception as e:
         print(f"\n  ERRO inesperado: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -221,7 +295,8 @@ def montar_video_completo(
     audio_path=None,
     output_video_path=None,
     resolucao=(1920, 1080),
-    fps=24
+    fps=24,
+    usar_ffmpeg=False
 ):
     """
     Pipeline completo de montagem de vídeo.
@@ -233,10 +308,14 @@ def montar_video_completo(
         output_video_path (Path): Caminho para salvar vídeo (auto-gera se None)
         resolucao (tuple): Resolução do vídeo (largura, altura)
         fps (int): Frames por segundo
+        usar_ffmpeg (bool): Se True, renderiza com ffmpeg em vez de moviepy
 
     Returns:
         Path: Caminho do vídeo renderizado
     """
+    from src.pptx_to_images import exportar_slides_como_imagens
+    from src.video_renderer import renderizar_video, estimar_tempo_renderizacao, verificar_dependencias_moviepy
+
     print("=" * 70)
     print("PIPELINE DE MONTAGEM DE VÍDEO")
     print("=" * 70)
@@ -316,20 +395,10 @@ def montar_video_completo(
     # ETAPA 4: Renderizar vídeo (legendas removidas)
     print("\n[ETAPA 4] Renderizando vídeo final...")
 
-    # Estimar tempo
-    import json
-    with open(show_script_path, 'r') as f:
-        script_data = json.load(f)
+    # Estimar tempo (usa o script já em memória)
+    duracao_audio = obter_duracao_audio(audio_path)
 
-    try:
-        from moviepy import AudioFileClip
-    except ImportError:
-        from moviepy.editor import AudioFileClip
-    audio_clip = AudioFileClip(str(audio_path))
-    duracao_audio = audio_clip.duration
-    audio_clip.close()
-
-    tempo_estimado = estimar_tempo_renderizacao(duracao_audio, len(script_data))
+    tempo_estimado = estimar_tempo_renderizacao(duracao_audio, len(show_script))
     print(f"Tempo estimado de renderização: {tempo_estimado:.1f} minutos")
 
     try:
@@ -340,14 +409,18 @@ def montar_video_completo(
             output_path=output_video_path,
             legendas_moviepy=None,  # Legendas removidas
             resolucao=resolucao,
-            fps=fps
+            fps=fps,
+            usar_ffmpeg_direto=usar_ffmpeg
         )
 
         return video_path
 
+    except (TimeoutError, FileNotFoundError) as e:
+        # Falhas esperadas: mensagem curta, sem stack trace
+        print(f"\nERRO na renderização: {e}")
+        return None
     except Exception as e:
         print(f"\nERRO na renderização: {e}")
-        import traceback
         traceback.print_exc()
         return None
 
@@ -366,8 +439,12 @@ def main():
     - Resolução: 1920x1080
     - FPS: 24
     - Usar: python montar_video.py
+
+    Para renderizar com ffmpeg (encoder por hardware quando houver):
+    - Usar: python montar_video.py --ffmpeg
     """
     import sys
+    from src.video_renderer import verificar_dependencias_moviepy
 
     try:
         print("=" * 70)
@@ -396,6 +473,15 @@ def main():
             resolucao = (1920, 1080)
             fps = 24
 
+        # Renderizador: ffmpeg direto (--ffmpeg) ou moviepy
+        usar_ffmpeg = '--ffmpeg' in sys.argv
+        if usar_ffmpeg:
+            if ffmpeg_disponivel():
+                print("Renderizador: ffmpeg (concat de imagens)")
+            else:
+                print("AVISO: ffmpeg não encontrado no PATH, usando moviepy")
+                usar_ffmpeg = False
+
         # Diretórios
         pasta_output = Path("output")
         pasta_resultados = Path("resultados")
@@ -412,6 +498,9 @@ def main():
         for p in projetos:
             print(f"  - {p.name}")
 
+        # Movimentação de projetos concluídos (uma de cada vez, em segundo plano)
+        mover = ThreadPoolExecutor(max_workers=1)
+
         # Processar cada projeto
         total_projetos = len(projetos)
         total_videos_gerados = 0
@@ -446,7 +535,8 @@ def main():
                     pasta_audio,
                     pasta_projeto.name,
                     resolucao,
-                    fps
+                    fps,
+                    usar_ffmpeg
                 )
 
                 if sucesso:
@@ -467,11 +557,14 @@ def main():
             if erros_projeto == 0 and len(subpastas) > 0:
                 destino = pasta_resultados / pasta_projeto.name
                 print(f"\nMovendo {pasta_projeto.name} para resultados/")
-                shutil.move(str(pasta_projeto), str(destino))
-                print(f"OK Movido para: {destino}")
+                # Move em segundo plano: o próximo projeto começa sem esperar a cópia
+                mover.submit(mover_projeto, pasta_projeto, destino)
             else:
                 print(f"\nAVISO: Projeto NAO movido para resultados/ (houve erros ou sem audios)")
 
+        # Aguarda as movimentações pendentes antes do resumo
+        mover.shutdown(wait=True)
+
         # RESUMO FINAL GERAL
         print(f"\n{'=' * 70}")
         print("PROCESSAMENTO COMPLETO - RESUMO GERAL")
@@ -483,7 +576,6 @@ def main():
 
     except Exception as e:
         print(f"\nErro inesperado: {e}")
-        import traceback
         traceback.print_exc()
 
 
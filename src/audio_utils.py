@@ -2,8 +2,38 @@
 Módulo para manipulação de arquivos de áudio.
 """
 
+import hashlib
+import os
+import subprocess
 from pathlib import Path
 
+try:
+    # BLAKE3 (SIMD, lê o arquivo via mmap) quando disponível
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+
+EXTENSOES_AUDIO = frozenset({'.mp3', '.wav', '.m4a', '.mp4', '.mpeg', '.mpga', '.webm'})
+
+
+def listar_audios(pasta, extensoes=EXTENSOES_AUDIO):
+    """
+    Lista os arquivos de áudio de uma pasta em uma única varredura (os.scandir).
+
+    Args:
+        pasta (Path): Pasta a ser varrida
+        extensoes (frozenset): Extensões aceitas (minúsculas, com ponto)
+
+    Returns:
+        list: Caminhos dos arquivos de áudio, em ordem alfabética
+    """
+    with os.scandir(pasta) as entradas:
+        return sorted(
+            Path(entrada.path) for entrada in entradas
+            if entrada.is_file() and os.path.splitext(entrada.name)[1].lower() in extensoes
+        )
+
 
 def obter_primeiro_audio(pasta_audios):
     """
@@ -18,11 +48,10 @@ def obter_primeiro_audio(pasta_audios):
     Raises:
         FileNotFoundError: Se nenhum arquivo de áudio for encontrado
     """
-    extensoes_audio = ['.mp3', '.wav', '.m4a', '.mp4', '.mpeg', '.mpga', '.webm']
+    audios = listar_audios(pasta_audios)
 
-    for arquivo in pasta_audios.iterdir():
-        if arquivo.suffix.lower() in extensoes_audio:
-            return arquivo
+    if audios:
+        return audios[0]
 
     raise FileNotFoundError(f"Nenhum arquivo de áudio encontrado na pasta {pasta_audios}")
 
@@ -39,3 +68,66 @@ def validar_pasta_audios(pasta_audios):
     """
     if not pasta_audios.exists():
         raise FileNotFoundError("A pasta 'audios/' não existe.")
+
+
+def calcular_fingerprint_audio(audio_path, extra=""):
+    """
+    Calcula um identificador do conteúdo do arquivo de áudio sem carregá-lo
+    inteiro na memória. Usa BLAKE3 se o pacote estiver instalado, senão BLAKE2b.
+
+    Args:
+        audio_path (Path): Caminho do arquivo de áudio
+        extra (str): Texto adicional incluído no identificador (ex: versão do modelo)
+
+    Returns:
+        str: Hash hexadecimal (32 caracteres)
+    """
+    if blake3 is not None:
+        h = blake3()
+        h.update_mmap(str(audio_path))
+        h.update(extra.encode("utf-8"))
+        return h.hexdigest(16)
+
+    # Leitura em blocos de 1 MiB (hashlib.file_digest só existe a partir do 3.11)
+    h = hashlib.blake2b(digest_size=16)
+    with open(audio_path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    h.update(extra.encode("utf-8"))
+    return h.hexdigest()
+
+
+def obter_duracao_audio(audio_path):
+    """
+    Obtém a duração do áudio em segundos lendo apenas os metadados via ffprobe.
+    Se ffprobe não estiver disponível, abre o áudio com moviepy.
+
+    Args:
+        audio_path (Path): Caminho do arquivo de áudio
+
+    Returns:
+        float: Duração em segundos
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=nw=1:nk=1",
+        str(audio_path)
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return float(result.stdout.strip())
+    except (FileNotFoundError, subprocess.CalledProcessError, ValueError):
+        pass
+
+    try:
+        from moviepy import AudioFileClip
+    except ImportError:
+        from moviepy.editor import AudioFileClip
+
+    audio_clip = AudioFileClip(str(audio_path))
+    duracao = audio_clip.duration
+    audio_clip.close()
+    return duracao
@@ -0,0 +1,71 @@
+"""
+Módulo de cache em disco para respostas das APIs da OpenAI.
+Evita repetir transcrição, detecção de tipo, conversão LaTeX, geração e enriquecimento
+de slides ao reprocessar um áudio.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from src.json_utils import carregar_json, salvar_json
+
+
+PASTA_CACHE = Path("output") / ".cache"
+
+
+def calcular_hash_texto(texto, extra=""):
+    """
+    Calcula o hash BLAKE2b de um texto.
+
+    Args:
+        texto (str): Texto a ser identificado
+        extra (str): Texto adicional incluído na chave (ex: modelo usado)
+
+    Returns:
+        str: Hash hexadecimal (32 caracteres)
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(extra.encode("utf-8"))
+    h.update(b"\0")
+    h.update(texto.encode("utf-8"))
+    return h.hexdigest()
+
+
+def ler_cache(chave, categoria):
+    """
+    Lê uma entrada do cache.
+
+    Args:
+        chave (str): Hash identificando a entrada
+        categoria (str): Tipo do conteúdo (ex: "transcript", "deteccao", "latex")
+
+    Returns:
+        Dados armazenados, ou None se não houver entrada válida
+    """
+    caminho = PASTA_CACHE / f"{chave}.{categoria}.json"
+
+    try:
+        return carregar_json(caminho)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def salvar_cache(chave, categoria, dados):
+    """
+    Salva uma entrada no cache (escrita atômica via arquivo temporário).
+
+    Args:
+        chave (str): Hash identificando a entrada
+        categoria (str): Tipo do conteúdo (ex: "transcript", "deteccao", "latex")
+        dados: Dados serializáveis em JSON
+    """
+    PASTA_CACHE.mkdir(parents=True, exist_ok=True)
+    caminho = PASTA_CACHE / f"{chave}.{categoria}.json"
+    caminho_tmp = caminho.with_name(f"{caminho.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    salvar_json(caminho_tmp, dados, indentar=False)
+
+    os.replace(caminho_tmp, caminho)
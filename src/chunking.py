@@ -2,11 +2,41 @@
 Módulo para segmentação semântica de transcrições usando LLM.
 """
 
-import json
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from openai import OpenAI
 from src.prompts import CHUNKING_PROMPT
+from src.json_utils import carregar_json, ler_json_texto
 from difflib import SequenceMatcher
 
+# Folga (em pontos de 0 a 100) do corte do pré-filtro RapidFuzz abaixo do mínimo
+FOLGA_PRE_FILTRO = 1e-6
+
+try:
+    # RapidFuzz (C++): a similaridade de fuzz.ratio (Indel, via maior subsequência
+    # comum) não é a do difflib (Ratcliff/Obershelp), mas nunca é menor que ela;
+    # descarta barato as janelas que não chegariam ao mínimo no difflib
+    from rapidfuzz.fuzz import ratio as _rapidfuzz_ratio
+except ImportError:
+    # Fallback: só difflib (biblioteca padrão)
+    _rapidfuzz_ratio = None
+
+
+def _similaridade(a, b, minimo=0.0):
+    """
+    Similaridade do difflib (0 a 1) entre a e b, ou 0.0 quando ela fica
+    abaixo de minimo (o cálculo pode então ser interrompido antes).
+    """
+    if minimo > 0 and _rapidfuzz_ratio is not None:
+        if not _rapidfuzz_ratio(a, b, score_cutoff=max(0.0, minimo * 100 - FOLGA_PRE_FILTRO)):
+            return 0.0
+    matcher = SequenceMatcher(None, a, b)
+    # real_quick_ratio/quick_ratio são limites superiores baratos de ratio()
+    if matcher.real_quick_ratio() < minimo or matcher.quick_ratio() < minimo:
+        return 0.0
+    similaridade = matcher.ratio()
+    return similaridade if similaridade >= minimo else 0.0
+
 
 def carregar_transcricao_json(json_path):
     """
@@ -18,11 +48,10 @@ def carregar_transcricao_json(json_path):
     Returns:
         dict: Dicionário com dados da transcrição
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return carregar_json(json_path)
 
 
-def segmentar_transcricao(client, palavras_com_timestamps):
+def segmentar_transcricao(client, palavras_com_timestamps, texto_completo=None):
     """
     Segmenta a transcrição em chunks semânticos usando GPT.
     GPT retorna marcadores textuais, não índices numéricos.
@@ -30,14 +59,16 @@ def segmentar_transcricao(client, palavras_com_timestamps):
     Args:
         client (OpenAI): Cliente OpenAI configurado
         palavras_com_timestamps (list): Lista de palavras com timestamps
+        texto_completo (str): Texto já montado da transcrição (opcional)
 
     Returns:
         list: Lista de chunks com marcador_inicio e marcador_fim
     """
     print("\nAnalisando estrutura do conteúdo com IA...")
 
-    # Reconstrói o texto completo para análise
-    texto_completo = " ".join([p["palavra"] for p in palavras_com_timestamps])
+    # Reconstrói o texto completo para análise (se não foi fornecido)
+    if texto_completo is None:
+        texto_completo = " ".join([p["palavra"] for p in palavras_com_timestamps])
 
     # Envia apenas o texto (não os índices - GPT identifica apenas marcadores)
     prompt_dados = f"""TEXTO COMPLETO DA TRANSCRIÇÃO:
@@ -60,7 +91,7 @@ TAREFA: Identifique os blocos conceituais e retorne os marcadores de início/fim
     )
 
     # Parse da resposta
-    resultado = json.loads(response.choices[0].message.content)
+    resultado = ler_json_texto(response.choices[0].message.content)
     chunks = resultado.get("chunks", [])
 
     print(f"OK Identificados {len(chunks)} blocos conceituais")
@@ -81,36 +112,36 @@ def normalizar_para_busca(texto):
     return " ".join(texto.split())
 
 
-def encontrar_marcador_no_audio(marcador, palavras_com_timestamps, inicio_busca=0):
+def construir_indice_palavras(palavras_lower):
     """
-    Encontra um marcador textual no array de palavras usando fuzzy matching.
+    Indexa as posições de cada palavra (em minúsculas) da transcrição.
 
     Args:
-        marcador (str): Texto do marcador a buscar
-        palavras_com_timestamps (list): Array de palavras com timestamps
-        inicio_busca (int): Índice a partir do qual buscar
+        palavras_lower (list): Palavras da transcrição em minúsculas
 
     Returns:
-        int: Índice da primeira palavra do marcador, ou None se não encontrar
+        dict: {palavra: [índices em ordem crescente]}
     """
-    marcador_norm = normalizar_para_busca(marcador)
-    palavras_marcador = marcador_norm.split()
-    num_palavras = len(palavras_marcador)
+    indice = defaultdict(list)
+    for i, palavra in enumerate(palavras_lower):
+        indice[palavra].append(i)
+    return dict(indice)
 
-    if num_palavras == 0:
-        return None
 
+def _melhor_janela(posicoes, marcador_lower, palavras_lower, num_palavras):
+    """
+    Avalia as janelas que começam nas posições dadas e retorna a primeira com
+    similaridade >= 0.95, ou a de maior similaridade >= 0.8, ou None.
+    """
     melhor_match = None
     melhor_similaridade = 0.0
 
-    # Busca janela deslizante
-    for i in range(inicio_busca, len(palavras_com_timestamps) - num_palavras + 1):
-        # Extrai janela de palavras
-        janela = [palavras_com_timestamps[j]["palavra"] for j in range(i, i + num_palavras)]
-        janela_texto = " ".join(janela)
+    for i in posicoes:
+        # Extrai janela de palavras (já em minúsculas)
+        janela_texto = " ".join(palavras_lower[i:i + num_palavras])
 
-        # Calcula similaridade
-        similaridade = SequenceMatcher(None, marcador_norm.lower(), janela_texto.lower()).ratio()
+        # Calcula similaridade (janelas abaixo de 0.8 são descartadas cedo)
+        similaridade = _similaridade(marcador_lower, janela_texto, 0.8)
 
         # Aceita match se similaridade >= 0.8
         if similaridade >= 0.8 and similaridade > melhor_similaridade:
@@ -121,13 +152,94 @@ def encontrar_marcador_no_audio(marcador, palavras_com_timestamps, inicio_busca=
             if similaridade >= 0.95:
                 return i
 
-    if melhor_match is not None and melhor_similaridade >= 0.8:
-        return melhor_match
+    return melhor_match
+
+
+def _buscar_marcador(marcador_lower, palavras_lower, inicio_busca, indice_palavras):
+    """
+    Busca de encontrar_marcador_no_audio, sobre o marcador já normalizado e em
+    minúsculas.
+    """
+    palavras_marcador_lower = marcador_lower.split()
+    num_palavras = len(palavras_marcador_lower)
+    ultimo_inicio = len(palavras_lower) - num_palavras
+
+    # Janelas ancoradas na primeira palavra do marcador
+    if indice_palavras is not None:
+        posicoes = indice_palavras.get(palavras_marcador_lower[0], [])
+        candidatas = posicoes[bisect_left(posicoes, inicio_busca):bisect_right(posicoes, ultimo_inicio)]
+    else:
+        candidatas = range(inicio_busca, ultimo_inicio + 1)
+
+    # Caminho rápido: marcador idêntico ao texto (caso comum), sem cálculo de similaridade
+    for i in candidatas:
+        if palavras_lower[i:i + num_palavras] == palavras_marcador_lower:
+            return i
+
+    if indice_palavras is not None:
+        idx = _melhor_janela(candidatas, marcador_lower, palavras_lower, num_palavras)
+        if idx is not None:
+            return idx
+
+    # Busca janela deslizante completa
+    return _melhor_janela(
+        range(inicio_busca, ultimo_inicio + 1), marcador_lower, palavras_lower, num_palavras
+    )
+
+
+def encontrar_marcador_no_audio(marcador, palavras_com_timestamps, inicio_busca=0, palavras_lower=None,
+                                indice_palavras=None, cache_busca=None):
+    """
+    Encontra um marcador textual no array de palavras usando fuzzy matching.
+
+    Uma janela idêntica ao marcador é retornada sem cálculo de similaridade.
+    Com indice_palavras, avalia primeiro apenas as janelas que começam pela
+    mesma palavra do marcador; a varredura completa só é feita se nenhuma
+    delas atingir a similaridade mínima.
+
+    Com cache_busca, reaproveita o resultado de uma busca anterior do mesmo
+    marcador quando ele continua válido: se a busca a partir de s retornou r,
+    qualquer busca a partir de s' com s <= s' <= r também retorna r (e uma busca
+    sem resultado continua sem resultado a partir de qualquer s' >= s).
+
+    Args:
+        marcador (str): Texto do marcador a buscar
+        palavras_com_timestamps (list): Array de palavras com timestamps
+        inicio_busca (int): Índice a partir do qual buscar
+        palavras_lower (list): Palavras já em minúsculas (opcional; calculado se None)
+        indice_palavras (dict): Índice de construir_indice_palavras (opcional)
+        cache_busca (dict): Memo {marcador: (inicio_busca, resultado)} (opcional)
+
+    Returns:
+        tuple: (índice da primeira palavra do marcador ou None se não encontrar,
+            número de palavras do marcador normalizado)
+    """
+    marcador_lower = normalizar_para_busca(marcador).lower()
+
+    if not marcador_lower:
+        return (None, 0)
+
+    # Marcador normalizado: palavras separadas por um único espaço
+    num_palavras = marcador_lower.count(" ") + 1
+
+    if cache_busca is not None and marcador_lower in cache_busca:
+        inicio_anterior, resultado = cache_busca[marcador_lower]
+        if inicio_anterior <= inicio_busca and (resultado is None or inicio_busca <= resultado):
+            return (resultado, num_palavras)
+
+    if palavras_lower is None:
+        palavras_lower = [p["palavra"].lower() for p in palavras_com_timestamps]
 
-    return None
+    resultado = _buscar_marcador(marcador_lower, palavras_lower, inicio_busca, indice_palavras)
 
+    if cache_busca is not None:
+        cache_busca[marcador_lower] = (inicio_busca, resultado)
 
-def encontrar_indices_chunk(chunk_dict, palavras_com_timestamps, inicio_busca=0):
+    return (resultado, num_palavras)
+
+
+def encontrar_indices_chunk(chunk_dict, palavras_com_timestamps, inicio_busca=0, palavras_lower=None,
+                            indice_palavras=None, cache_busca=None):
     """
     Encontra os índices palavra_inicio e palavra_fim de um chunk usando marcadores textuais.
 
@@ -135,6 +247,9 @@ def encontrar_indices_chunk(chunk_dict, palavras_com_timestamps, inicio_busca=0)
         chunk_dict (dict): Chunk com marcador_inicio e marcador_fim
         palavras_com_timestamps (list): Array de palavras com timestamps
         inicio_busca (int): Índice a partir do qual buscar
+        palavras_lower (list): Palavras já em minúsculas (opcional)
+        indice_palavras (dict): Índice de construir_indice_palavras (opcional)
+        cache_busca (dict): Memo de buscas de marcadores (opcional)
 
     Returns:
         tuple: (palavra_inicio, palavra_fim, sucesso)
@@ -143,27 +258,30 @@ def encontrar_indices_chunk(chunk_dict, palavras_com_timestamps, inicio_busca=0)
     marcador_fim = chunk_dict.get("marcador_fim", "")
 
     # Busca marcador de início
-    idx_inicio = encontrar_marcador_no_audio(marcador_inicio, palavras_com_timestamps, inicio_busca)
+    idx_inicio, _ = encontrar_marcador_no_audio(
+        marcador_inicio, palavras_com_timestamps, inicio_busca, palavras_lower, indice_palavras, cache_busca
+    )
 
     if idx_inicio is None:
         print(f"  ERRO: Não encontrou marcador_inicio: '{marcador_inicio}'")
         return (None, None, False)
 
     # Busca marcador de fim (a partir do início encontrado)
-    idx_fim_marcador = encontrar_marcador_no_audio(marcador_fim, palavras_com_timestamps, idx_inicio)
+    idx_fim_marcador, num_palavras_fim = encontrar_marcador_no_audio(
+        marcador_fim, palavras_com_timestamps, idx_inicio, palavras_lower, indice_palavras, cache_busca
+    )
 
     if idx_fim_marcador is None:
         print(f"  ERRO: Não encontrou marcador_fim: '{marcador_fim}'")
         return (None, None, False)
 
     # Calcula palavra_fim: última palavra do marcador de fim
-    num_palavras_fim = len(marcador_fim.split())
     palavra_fim = idx_fim_marcador + num_palavras_fim - 1
 
     return (idx_inicio, palavra_fim, True)
 
 
-def extrair_texto_chunk(palavras_com_timestamps, palavra_inicio, palavra_fim):
+def extrair_texto_chunk(palavras_com_timestamps, palavra_inicio, palavra_fim, textos_palavras=None):
     """
     Extrai o texto de um chunk baseado nos índices de palavras.
 
@@ -171,23 +289,31 @@ def extrair_texto_chunk(palavras_com_timestamps, palavra_inicio, palavra_fim):
         palavras_com_timestamps (list): Lista completa de palavras
         palavra_inicio (int): Índice da primeira palavra
         palavra_fim (int): Índice da última palavra
+        textos_palavras (list): Coluna só com o texto de cada palavra (opcional),
+            alinhada com palavras_com_timestamps; evita um acesso ao dict por palavra
 
     Returns:
         str: Texto do chunk
     """
     if palavra_inicio is None or palavra_fim is None:
         return ""
+    if textos_palavras is not None:
+        return " ".join(textos_palavras[palavra_inicio:palavra_fim + 1])
     palavras_chunk = palavras_com_timestamps[palavra_inicio:palavra_fim + 1]
     return " ".join([p["palavra"] for p in palavras_chunk])
 
 
-def preparar_chunks_com_texto(palavras_com_timestamps, chunks):
+def preparar_chunks_com_texto(palavras_com_timestamps, chunks, palavras_busca=None):
     """
     Adiciona o texto extraído a cada chunk usando busca determinística por marcadores.
 
     Args:
         palavras_com_timestamps (list): Lista completa de palavras
         chunks (list): Lista de chunks da segmentação (com marcador_inicio/fim)
+        palavras_busca (list): Palavras (str), alinhadas índice a índice com
+            palavras_com_timestamps, onde os marcadores são procurados. Usado quando
+            a segmentação foi feita sobre o texto anterior à conversão LaTeX.
+            Padrão: as próprias palavras de palavras_com_timestamps
 
     Returns:
         list: Chunks enriquecidos com texto e índices
@@ -195,12 +321,23 @@ def preparar_chunks_com_texto(palavras_com_timestamps, chunks):
     chunks_com_texto = []
     inicio_busca = 0  # Mantém posição sequencial
 
+    # Coluna de textos, minúsculas e índice de palavras calculados uma única vez
+    textos_palavras = [p["palavra"] for p in palavras_com_timestamps]
+    if palavras_busca is None:
+        palavras_busca = textos_palavras
+    palavras_lower = [palavra.lower() for palavra in palavras_busca]
+    indice_palavras = construir_indice_palavras(palavras_lower)
+    cache_busca = {}  # Marcadores repetidos entre chunks (válido só nesta chamada)
+
     for i, chunk in enumerate(chunks):
         # Encontra índices usando marcadores textuais
         palavra_inicio, palavra_fim, sucesso = encontrar_indices_chunk(
             chunk,
             palavras_com_timestamps,
-            inicio_busca
+            inicio_busca,
+            palavras_lower,
+            indice_palavras,
+            cache_busca
         )
 
         if not sucesso:
@@ -208,7 +345,7 @@ def preparar_chunks_com_texto(palavras_com_timestamps, chunks):
             continue
 
         # Extrai texto usando índices encontrados
-        texto = extrair_texto_chunk(palavras_com_timestamps, palavra_inicio, palavra_fim)
+        texto = extrair_texto_chunk(palavras_com_timestamps, palavra_inicio, palavra_fim, textos_palavras)
 
         # Calcula timestamp_inicio
         timestamp_inicio = palavras_com_timestamps[palavra_inicio]["inicio"]
@@ -0,0 +1,98 @@
+"""
+Módulo com leitura e escrita de arquivos JSON.
+Usa orjson (parser em C, mais rápido) quando instalado; caso contrário, json da biblioteca padrão.
+"""
+
+import json
+import mmap
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# A partir deste tamanho o arquivo é mapeado em memória em vez de lido para um
+# buffer: as páginas vêm do cache do sistema e não somam ao pico de memória
+TAMANHO_MINIMO_MMAP = 64 * 1024 * 1024
+
+
+def carregar_json(caminho):
+    """
+    Carrega um arquivo JSON. Com orjson, arquivos grandes (ex: transcrições de
+    aulas de várias horas) são lidos via mmap, sem cópia do conteúdo.
+
+    Args:
+        caminho (Path): Caminho do arquivo
+
+    Returns:
+        Dados do arquivo (dict ou list)
+    """
+    if orjson is not None:
+        with open(caminho, 'rb') as f:
+            if os.fstat(f.fileno()).st_size >= TAMANHO_MINIMO_MMAP:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as conteudo:
+                        return orjson.loads(conteudo)
+            return orjson.loads(f.read())
+
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def salvar_json(caminho, dados, indentar=True):
+    """
+    Salva dados em um arquivo JSON (UTF-8, sem escapar acentos).
+
+    Args:
+        caminho (Path): Caminho do arquivo
+        dados: Dados serializáveis em JSON
+        indentar (bool): Se True, indenta com 2 espaços
+    """
+    if orjson is not None:
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if indentar:
+            opcoes |= orjson.OPT_INDENT_2
+        with open(caminho, 'wb') as f:
+            f.write(orjson.dumps(dados, option=opcoes))
+        return
+
+    # json.dumps + uma única escrita: json.dump faz um write() por fragmento
+    texto = json.dumps(dados, ensure_ascii=False, indent=2 if indentar else None)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(texto)
+
+
+def ler_json_texto(texto):
+    """
+    Converte um texto JSON (ex: resposta de um LLM) em dados Python.
+
+    Args:
+        texto (str): Conteúdo JSON
+
+    Returns:
+        Dados decodificados (dict ou list)
+
+    Raises:
+        json.JSONDecodeError: Se o texto não for JSON válido
+    """
+    if orjson is not None:
+        return orjson.loads(texto)
+    return json.loads(texto)
+
+
+def json_para_texto(dados):
+    """
+    Serializa dados em texto JSON compacto, sem escapar acentos
+    (ex: conteúdo de mensagens enviadas ao LLM).
+
+    Args:
+        dados: Dados serializáveis em JSON
+
+    Returns:
+        str: Texto JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(dados, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(dados, ensure_ascii=False)
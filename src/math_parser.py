@@ -2,27 +2,40 @@
 Módulo para detecção e conversão de fórmulas matemáticas para LaTeX.
 """
 
-import json
 from openai import OpenAI
 from src.prompts import MATH_CONVERSION_PROMPT
+from src.cache import calcular_hash_texto, ler_cache, salvar_cache
+from src.json_utils import ler_json_texto
 
 
-def converter_formulas_para_latex(client: OpenAI, texto_transcricao: str) -> str:
+MODELO_MATH = "gpt-4o"
+
+
+def converter_formulas_para_latex(client: OpenAI, texto_transcricao: str, usar_cache: bool = True) -> str:
     """
     Usa GPT-4o para encontrar expressões matemáticas no texto e convertê-las para LaTeX.
+    Conversões bem-sucedidas são guardadas no cache em disco.
 
     Args:
         client (OpenAI): Cliente OpenAI configurado
         texto_transcricao (str): Texto da transcrição completa
+        usar_cache (bool): Se True, consulta e alimenta o cache
 
     Returns:
         str: Texto com fórmulas convertidas para LaTeX
     """
     print("\n[MATH PARSER] Detectando e convertendo fórmulas para LaTeX...")
 
+    chave = calcular_hash_texto(texto_transcricao, MODELO_MATH) if usar_cache else None
+    if chave:
+        texto_convertido = ler_cache(chave, "latex")
+        if texto_convertido is not None:
+            print("✓ Conversão LaTeX reaproveitada do cache")
+            return texto_convertido
+
     try:
         response = client.chat.completions.create(
-            model="gpt-4o",
+            model=MODELO_MATH,
             messages=[
                 {"role": "system", "content": MATH_CONVERSION_PROMPT},
                 {"role": "user", "content": texto_transcricao}
@@ -31,7 +44,7 @@ def converter_formulas_para_latex(client: OpenAI, texto_transcricao: str) -> str
             response_format={"type": "json_object"}
         )
 
-        resultado = json.loads(response.choices[0].message.content)
+        resultado = ler_json_texto(response.choices[0].message.content)
         texto_convertido = resultado.get("texto_com_latex", texto_transcricao)
 
         # Conta quantas fórmulas foram encontradas
@@ -41,6 +54,9 @@ def converter_formulas_para_latex(client: OpenAI, texto_transcricao: str) -> str
         else:
             print("✓ Nenhuma fórmula matemática detectada")
 
+        if chave:
+            salvar_cache(chave, "latex", texto_convertido)
+
         return texto_convertido
 
     except Exception as e:
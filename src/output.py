@@ -2,9 +2,10 @@
 Módulo para exibição e salvamento de resultados da transcrição.
 """
 
-import json
 from pathlib import Path
 
+from src.json_utils import salvar_json
+
 
 def exibir_resultados(palavras_com_timestamps):
     """
@@ -23,7 +24,7 @@ def exibir_resultados(palavras_com_timestamps):
               f"Fim: {palavra_info['fim']:.2f}s")
 
 
-def salvar_transcricao(palavras_com_timestamps, audio_file_path, output_dir=None):
+def salvar_transcricao(palavras_com_timestamps, audio_file_path, output_dir=None, compacto=False):
     """
     Salva a transcrição em um arquivo JSON.
 
@@ -31,6 +32,8 @@ def salvar_transcricao(palavras_com_timestamps, audio_file_path, output_dir=None
         palavras_com_timestamps (list): Lista de palavras com timestamps
         audio_file_path (Path): Caminho do arquivo de áudio original
         output_dir (Path, optional): Diretório de output customizado. Padrão: "output/"
+        compacto (bool): Se True, grava sem indentação (arquivo menor e escrita
+            mais rápida em transcrições longas). Padrão: indentado, para leitura
 
     Returns:
         Path: Caminho do arquivo JSON salvo
@@ -53,8 +56,7 @@ def salvar_transcricao(palavras_com_timestamps, audio_file_path, output_dir=None
         'palavras': palavras_com_timestamps
     }
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    salvar_json(output_path, resultado, indentar=not compacto)
 
     print(f"\nTranscrição salva em: {output_path}")
     return output_path
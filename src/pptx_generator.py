@@ -3,16 +3,99 @@ Módulo para geração de apresentações PowerPoint a partir de slides JSON.
 Suporta renderização de fórmulas matemáticas em LaTeX.
 """
 
-import json
+import multiprocessing
+import os
 import re
+import shutil
+import struct
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from pathlib import Path
 from pptx import Presentation
 from pptx.util import Pt, Inches
 from pptx.enum.text import PP_ALIGN
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Backend sem GUI
 import io
+import logging
+
+from src.cache import calcular_hash_texto
+from src.json_utils import carregar_json
+
+
+logger = logging.getLogger(__name__)
+
+
+# Texto antes de uma fórmula $$...$$ ou $...$ (compilado uma única vez).
+# [^$]+ impede que a fórmula inline atravesse outros $ em bullets malformados.
+_PADRAO_LATEX = re.compile(r'(.*?)(\$\$.*?\$\$|\$[^$]+\$)', re.DOTALL)
+
+
+# Abaixo disso, iniciar processos (cada um importa o matplotlib) custa mais do que renderizar
+MIN_FORMULAS_PROCESSOS = 8
+
+
+# Largura das imagens de fórmula do matplotlib no slide (canvas de 12x2 pol.)
+LARGURA_FORMULA_MATPLOTLIB = Inches(5.5)
+
+# dvipng recorta a imagem ao redor da fórmula (-T tight), renderizada em LaTeX
+# 10pt: o tamanho no slide vem dos pixels e do DPI, ampliado para acompanhar
+# o texto dos bullets (24pt), sem passar da largura usada no matplotlib
+DPI_DVIPNG = 300
+ESCALA_FORMULA_DVIPNG = 24 / 10
+
+# Renderizadores de fórmula: entram na chave do cache, pois geram imagens
+# de tamanhos diferentes para a mesma fórmula
+RENDERIZADOR_MATPLOTLIB = "matplotlib"
+RENDERIZADOR_DVIPNG = "dvipng"
+
+
+# matplotlib.pyplot é importado só na primeira fórmula renderizada (import custoso)
+_plt = None
+
+
+def _obter_plt():
+    """
+    Importa o matplotlib (backend sem GUI) na primeira chamada e retorna o pyplot.
+
+    Returns:
+        module: matplotlib.pyplot
+    """
+    global _plt
+
+    if _plt is None:
+        import matplotlib
+        matplotlib.use('Agg')  # Backend sem GUI
+        import matplotlib.pyplot as plt
+        _plt = plt
+
+    return _plt
+
+
+# Figura única reaproveitada por todas as fórmulas (criada na primeira renderização).
+# A ETAPA 5 é serializada no main.py, então não há acesso concorrente.
+_figura_latex = None
+_eixo_latex = None
+
+
+def _obter_figura_latex():
+    """
+    Retorna a figura/eixo persistentes usados para renderizar LaTeX, limpos.
+
+    Returns:
+        tuple: (fig, ax)
+    """
+    global _figura_latex, _eixo_latex
+
+    if _figura_latex is None:
+        _figura_latex, _eixo_latex = _obter_plt().subplots(figsize=(12, 2), dpi=150)
+        _figura_latex.patch.set_alpha(0)  # Transparente
+    else:
+        _eixo_latex.clear()
+
+    _eixo_latex.axis('off')
+    return _figura_latex, _eixo_latex
 
 
 def detectar_latex(texto):
@@ -41,10 +124,8 @@ def separar_texto_e_latex(bullet):
     Returns:
         tuple: (texto_antes, formula_latex) ou (bullet, None) se não houver LaTeX
     """
-    import re
-
     # Busca por padrão: texto antes de $...$ ou $$...$$
-    match = re.search(r'(.*?)(\$\$.*?\$\$|\$.*?\$)', bullet)
+    match = _PADRAO_LATEX.search(bullet)
 
     if match:
         texto_antes = match.group(1).strip()
@@ -54,81 +135,302 @@ def separar_texto_e_latex(bullet):
         return (bullet, None)
 
 
-def render_latex_as_image(latex_str, filepath, images_folder):
+def _limpar_latex(latex_str):
     """
-    Renderiza uma string LaTeX para um arquivo de imagem PNG transparente.
+    Remove os delimitadores $ ou $$ externos de uma fórmula.
 
     Args:
         latex_str (str): String LaTeX (com ou sem delimitadores $)
-        filepath (Path): Caminho para salvar a imagem
-        images_folder (Path): Pasta onde salvar imagens de fórmulas
 
     Returns:
-        io.BytesIO: Buffer da imagem PNG
+        str: Conteúdo LaTeX sem delimitadores
+    """
+    latex_limpo = latex_str.strip()
+    # Remove $ externo, mantém conteúdo
+    if latex_limpo.startswith('$$') and latex_limpo.endswith('$$'):
+        latex_limpo = latex_limpo[2:-2].strip()
+    elif latex_limpo.startswith('$') and latex_limpo.endswith('$'):
+        latex_limpo = latex_limpo[1:-1].strip()
+    return latex_limpo
+
+
+def _caminho_cache_formula(images_folder, latex_limpo, renderizador=RENDERIZADOR_MATPLOTLIB):
+    """
+    Caminho do PNG em cache de uma fórmula (images_folder/.cache/<hash>.png),
+    com o renderizador na chave.
+    """
+    return images_folder / ".cache" / f"{calcular_hash_texto(latex_limpo, extra=renderizador)}.png"
+
+
+def _largura_formula(dados_png, renderizador):
+    """
+    Largura da imagem de uma fórmula no slide.
+
+    Args:
+        dados_png (bytes): Imagem PNG da fórmula
+        renderizador (str): RENDERIZADOR_MATPLOTLIB ou RENDERIZADOR_DVIPNG
+
+    Returns:
+        Length: Largura em EMU
+    """
+    if renderizador != RENDERIZADOR_DVIPNG:
+        return LARGURA_FORMULA_MATPLOTLIB
+
+    # Largura em pixels no cabeçalho IHDR do PNG
+    largura_px = struct.unpack(">I", dados_png[16:20])[0]
+    return min(Inches(largura_px / DPI_DVIPNG * ESCALA_FORMULA_DVIPNG), LARGURA_FORMULA_MATPLOTLIB)
+
+
+def _renderizar_lote_dvipng(formulas):
+    """
+    Renderiza várias fórmulas de uma vez com LaTeX + dvipng: um único documento
+    (uma fórmula por página), uma execução do latex e uma do dvipng.
+
+    Args:
+        formulas (list): Fórmulas LaTeX sem delimitadores $
+
+    Returns:
+        dict: {formula: bytes PNG}, vazio se latex/dvipng não estiverem
+              disponíveis ou se a compilação falhar
     """
+    if not formulas or not (shutil.which("latex") and shutil.which("dvipng")):
+        return {}
+
+    paginas = "\n\\newpage\n".join(f"$\\displaystyle {formula}$" for formula in formulas)
+    documento = (
+        "\\documentclass{article}\n"
+        "\\usepackage{amsmath,amssymb}\n"
+        "\\pagestyle{empty}\n"
+        "\\begin{document}\n"
+        f"{paginas}\n"
+        "\\end{document}\n"
+    )
+
+    with tempfile.TemporaryDirectory() as pasta_tmp:
+        pasta_tmp = Path(pasta_tmp)
+        (pasta_tmp / "formulas.tex").write_text(documento, encoding="utf-8")
+
+        try:
+            subprocess.run(
+                ["latex", "-interaction=nonstopmode", "-halt-on-error", "formulas.tex"],
+                cwd=pasta_tmp, capture_output=True, check=True, timeout=120
+            )
+            subprocess.run(
+                ["dvipng", "-q", "-T", "tight", "-D", str(DPI_DVIPNG), "-bg", "Transparent",
+                 "-o", "formula_%d.png", "formulas.dvi"],
+                cwd=pasta_tmp, capture_output=True, check=True, timeout=120
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"    AVISO: Renderização em lote com dvipng falhou ({e}); usando matplotlib")
+            return {}
+
+        resultado = {}
+        for i, formula in enumerate(formulas, 1):
+            png_path = pasta_tmp / f"formula_{i}.png"
+            if png_path.exists():
+                resultado[formula] = png_path.read_bytes()
+        return resultado
+
+
+def _renderizar_formula_worker(latex_limpo):
+    """
+    Renderiza uma fórmula com matplotlib em um processo do pool.
+    Erros são devolvidos como None para não derrubar as demais fórmulas.
+
+    Args:
+        latex_limpo (str): Fórmula sem delimitadores $
+
+    Returns:
+        tuple: (latex_limpo, bytes do PNG ou None)
+    """
+    try:
+        return latex_limpo, _renderizar_latex_png(latex_limpo)
+    except Exception:
+        return latex_limpo, None
+
+
+def _renderizar_lote_processos(formulas):
+    """
+    Renderiza várias fórmulas com matplotlib em paralelo (um processo por núcleo).
+    O pool só compensa o custo de iniciar os processos a partir de
+    MIN_FORMULAS_PROCESSOS fórmulas; abaixo disso, nada é feito aqui e as
+    fórmulas são renderizadas uma a uma no próprio processo.
+
+    Args:
+        formulas (list): Fórmulas sem delimitadores $
+
+    Returns:
+        dict: {latex_limpo: bytes do PNG} das fórmulas renderizadas
+    """
+    if len(formulas) < MIN_FORMULAS_PROCESSOS:
+        return {}
+
+    num_processos = min(len(formulas), os.cpu_count() or 1)
+    if num_processos < 2:
+        return {}
+
+    # spawn: o main.py roda várias threads, e fork com threads ativas não é seguro
+    contexto = multiprocessing.get_context("spawn")
+    renderizadas = {}
+
     try:
-        # Cria pasta de imagens se não existir
-        images_folder.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=num_processos, mp_context=contexto) as executor:
+            for latex_limpo, dados_png in executor.map(_renderizar_formula_worker, formulas):
+                if dados_png is not None:
+                    renderizadas[latex_limpo] = dados_png
+    except (OSError, BrokenProcessPool) as e:
+        print(f"  Aviso: renderização paralela indisponível ({e}), usando matplotlib sequencial")
+
+    return renderizadas
+
+
+def pre_renderizar_formulas(slides, images_folder, usar_dvipng=False):
+    """
+    Renderiza de uma vez todas as fórmulas dos slides que ainda não estão no
+    cache de images_folder, para que render_latex_as_image apenas leia o cache.
+    Com usar_dvipng, tenta primeiro o lote LaTeX + dvipng; o que sobrar é
+    renderizado com matplotlib em paralelo. Fórmulas que falharem aqui
+    continuam sendo renderizadas uma a uma durante a montagem dos slides.
+
+    Args:
+        slides (list): Slides do JSON
+        images_folder (Path): Pasta de imagens de fórmulas
+        usar_dvipng (bool): Se True, usa LaTeX + dvipng (quando instalados)
+
+    Returns:
+        int: Número de fórmulas pré-renderizadas
+    """
+    pendentes = []
+    vistas = set()
+    for slide_data in slides:
+        for bullet in slide_data.get("slide_bullets", []):
+            if not detectar_latex(bullet):
+                continue
+            _, formula = separar_texto_e_latex(bullet)
+            if not formula:
+                continue
+            latex_limpo = _limpar_latex(formula)
+            if latex_limpo in vistas or _caminho_cache_formula(images_folder, latex_limpo).exists():
+                continue
+            if usar_dvipng and _caminho_cache_formula(images_folder, latex_limpo, RENDERIZADOR_DVIPNG).exists():
+                continue
+            vistas.add(latex_limpo)
+            pendentes.append(latex_limpo)
+
+    if not pendentes:
+        return 0
+
+    renderizadas_dvipng = _renderizar_lote_dvipng(pendentes) if usar_dvipng else {}
+    if renderizadas_dvipng:
+        print(f"  {len(renderizadas_dvipng)} fórmula(s) renderizada(s) em lote (dvipng)")
+
+    restantes = [latex_limpo for latex_limpo in pendentes if latex_limpo not in renderizadas_dvipng]
+    renderizadas_processos = _renderizar_lote_processos(restantes)
+    if renderizadas_processos:
+        print(f"  {len(renderizadas_processos)} fórmula(s) renderizada(s) em paralelo (matplotlib)")
+
+    (images_folder / ".cache").mkdir(parents=True, exist_ok=True)
+    for renderizador, renderizadas in ((RENDERIZADOR_DVIPNG, renderizadas_dvipng),
+                                       (RENDERIZADOR_MATPLOTLIB, renderizadas_processos)):
+        for latex_limpo, dados_png in renderizadas.items():
+            _caminho_cache_formula(images_folder, latex_limpo, renderizador).write_bytes(dados_png)
+
+    return len(renderizadas_dvipng) + len(renderizadas_processos)
+
+
+@lru_cache(maxsize=512)
+def _renderizar_latex_png(latex_limpo):
+    """
+    Renderiza LaTeX (sem delimitadores $) com matplotlib e retorna o PNG.
+    Memoizado: cada fórmula distinta é renderizada uma única vez por processo.
 
+    Args:
+        latex_limpo (str): Conteúdo LaTeX sem os delimitadores $
+
+    Returns:
+        bytes: Imagem PNG transparente
+    """
+    # Configuração do matplotlib para renderização matemática
+    _obter_plt().rcParams.update({
+        'text.usetex': False,
+        'mathtext.fontset': 'cm',
+        'mathtext.default': 'regular',
+        'font.size': 14
+    })
+
+    # Reaproveita a figura persistente (evita criar figura/eixos a cada fórmula)
+    fig, ax = _obter_figura_latex()
+
+    # Renderiza LaTeX - o matplotlib usa $ para delimitar math mode
+    # Adiciona os $ de volta para o matplotlib processar
+    ax.text(0.5, 0.5,
+           f'${latex_limpo}$',
+           fontsize=36,
+           ha='center',
+           va='center',
+           transform=ax.transAxes)
+
+    # Remove margens
+    fig.tight_layout(pad=0.5)
+
+    # Salva em buffer (a figura não é fechada: é reutilizada na próxima fórmula)
+    img_buffer = io.BytesIO()
+    fig.savefig(img_buffer,
+                format='png',
+                transparent=True,
+                bbox_inches='tight',
+                pad_inches=0.3,
+                dpi=150)
+    return img_buffer.getvalue()
+
+
+def render_latex_as_image(latex_str, filepath, images_folder, usar_dvipng=False):
+    """
+    Renderiza uma string LaTeX como imagem PNG transparente (buffer em memória).
+    Fórmulas já renderizadas são reaproveitadas da memória ou de
+    images_folder/.cache/ (chave: hash do LaTeX e do renderizador), sem passar
+    pelo matplotlib.
+
+    Args:
+        latex_str (str): String LaTeX (com ou sem delimitadores $)
+        filepath (Path): Nome da imagem de depuração (só com PPTX_DEBUG_FORMULAS)
+        images_folder (Path): Pasta onde salvar imagens de fórmulas
+        usar_dvipng (bool): Se True, usa a versão dvipng da fórmula quando
+            pré-renderizada por pre_renderizar_formulas
+
+    Returns:
+        tuple: (io.BytesIO com a imagem PNG, renderizador que a gerou)
+    """
+    try:
         # Remove os delimitadores '$' para processar
-        latex_limpo = latex_str.strip()
-        # Remove $ externo, mantém conteúdo
-        if latex_limpo.startswith('$$') and latex_limpo.endswith('$$'):
-            latex_limpo = latex_limpo[2:-2].strip()
-        elif latex_limpo.startswith('$') and latex_limpo.endswith('$'):
-            latex_limpo = latex_limpo[1:-1].strip()
-
-        print(f"    [DEBUG] Renderizando LaTeX: {latex_limpo}")
-
-        # Configuração do matplotlib para renderização matemática
-        plt.rcParams.update({
-            'text.usetex': False,
-            'mathtext.fontset': 'cm',
-            'mathtext.default': 'regular',
-            'font.size': 14
-        })
-
-        # Cria figura
-        fig, ax = plt.subplots(figsize=(12, 2), dpi=150)
-        ax.axis('off')
-
-        # Renderiza LaTeX - o matplotlib usa $ para delimitar math mode
-        # Adiciona os $ de volta para o matplotlib processar
-        ax.text(0.5, 0.5,
-               f'${latex_limpo}$',
-               fontsize=36,
-               ha='center',
-               va='center',
-               transform=ax.transAxes)
-
-        # Remove margens
-        fig.patch.set_alpha(0)  # Transparente
-        plt.tight_layout(pad=0.5)
-
-        # Salva em buffer
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer,
-                   format='png',
-                   transparent=True,
-                   bbox_inches='tight',
-                   pad_inches=0.3,
-                   dpi=150)
-        plt.close(fig)
-        img_buffer.seek(0)
-
-        # Salva também em arquivo para debug
-        image_path = images_folder / f"{filepath.stem}.png"
-        with open(image_path, 'wb') as f:
-            f.write(img_buffer.getvalue())
-        print(f"    [DEBUG] Imagem salva: {image_path}")
-        img_buffer.seek(0)
-
-        return img_buffer
+        latex_limpo = _limpar_latex(latex_str)
+
+        # Cache em disco das fórmulas renderizadas (também alimentado por pre_renderizar_formulas)
+        renderizador = RENDERIZADOR_MATPLOTLIB
+        cache_path = _caminho_cache_formula(images_folder, latex_limpo)
+        if usar_dvipng:
+            cache_dvipng = _caminho_cache_formula(images_folder, latex_limpo, RENDERIZADOR_DVIPNG)
+            if cache_dvipng.exists():
+                renderizador, cache_path = RENDERIZADOR_DVIPNG, cache_dvipng
+
+        if cache_path.exists():
+            dados_png = cache_path.read_bytes()
+        else:
+            dados_png = _renderizar_latex_png(latex_limpo)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(dados_png)
+
+        # Cópia nomeada por fórmula, só para depuração (PPTX_DEBUG_FORMULAS=1)
+        if os.environ.get("PPTX_DEBUG_FORMULAS"):
+            image_path = images_folder / f"{filepath.stem}.png"
+            image_path.write_bytes(dados_png)
+            print(f"    [DEBUG] Imagem salva: {image_path}")
+
+        return io.BytesIO(dados_png), renderizador
 
     except Exception as e:
         print(f"    ERRO ao renderizar LaTeX '{latex_str}': {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Falha ao renderizar LaTeX")
         raise
 
 
@@ -142,8 +444,7 @@ def carregar_slides_json(json_path):
     Returns:
         dict: Dados dos slides
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return carregar_json(json_path)
 
 
 def criar_template_padrao():
@@ -160,6 +461,23 @@ def criar_template_padrao():
     return prs
 
 
+def _indexar_placeholders(slide):
+    """
+    Mapeia idx -> placeholder do slide em uma única passada
+    (mantém o primeiro placeholder de cada idx, como a busca linear).
+
+    Args:
+        slide (Slide): Slide do python-pptx
+
+    Returns:
+        dict: {idx: placeholder}
+    """
+    placeholders = {}
+    for ph in slide.placeholders:
+        placeholders.setdefault(ph.placeholder_format.idx, ph)
+    return placeholders
+
+
 def adicionar_slide_abertura(prs, slide_data):
     """
     Adiciona slide de ABERTURA usando Layout 0 (SOMENTE para o primeiro slide).
@@ -181,24 +499,18 @@ def adicionar_slide_abertura(prs, slide_data):
     bullets = slide_data.get("slide_bullets", [])
 
     try:
+        placeholders = _indexar_placeholders(slide)
+
         # Placeholder idx=0: Título
         if titulo:
-            ph_titulo = None
-            for ph in slide.placeholders:
-                if ph.placeholder_format.idx == 0:
-                    ph_titulo = ph
-                    break
+            ph_titulo = placeholders.get(0)
             if ph_titulo and ph_titulo.has_text_frame:
                 # Capitaliza apenas a primeira letra
-                titulo_formatado = titulo[0].upper() + titulo[1:].lower() if titulo else ""
+                titulo_formatado = titulo.capitalize()
                 ph_titulo.text = titulo_formatado
 
         # Placeholder idx=1: Conteúdo (frase introdutória + bullets)
-        ph_conteudo = None
-        for ph in slide.placeholders:
-            if ph.placeholder_format.idx == 1:
-                ph_conteudo = ph
-                break
+        ph_conteudo = placeholders.get(1)
 
         if ph_conteudo and ph_conteudo.has_text_frame:
             text_frame = ph_conteudo.text_frame
@@ -233,7 +545,7 @@ def adicionar_slide_abertura(prs, slide_data):
     return slide
 
 
-def adicionar_slide_conteudo(prs, slide_data, output_dir=None):
+def adicionar_slide_conteudo(prs, slide_data, output_dir=None, usar_dvipng=False):
     """
     Adiciona slide de CONTEÚDO usando Layout 1 (usado para TODOS os slides exceto o primeiro).
     Suporta renderização de fórmulas matemáticas em LaTeX.
@@ -247,6 +559,7 @@ def adicionar_slide_conteudo(prs, slide_data, output_dir=None):
         prs (Presentation): Objeto de apresentação PowerPoint
         slide_data (dict): Dados do slide (titulo_conceito, frase_introdutoria, slide_bullets)
         output_dir (Path): Diretório de output para salvar imagens de fórmulas
+        usar_dvipng (bool): Se True, usa as fórmulas pré-renderizadas com dvipng
 
     Returns:
         Slide: Slide adicionado
@@ -263,28 +576,22 @@ def adicionar_slide_conteudo(prs, slide_data, output_dir=None):
     # - Placeholder com idx=2: Texto/bullets
 
     try:
+        placeholders = _indexar_placeholders(slide)
+
         # Placeholder idx=10: Título do conceito
-        ph_titulo = None
-        for ph in slide.placeholders:
-            if ph.placeholder_format.idx == 10:
-                ph_titulo = ph
-                break
+        ph_titulo = placeholders.get(10)
 
         if ph_titulo and ph_titulo.has_text_frame:
             if titulo_conceito:
                 # Capitaliza apenas a primeira letra
-                titulo_formatado = titulo_conceito[0].upper() + titulo_conceito[1:].lower() if titulo_conceito else ""
+                titulo_formatado = titulo_conceito.capitalize()
                 ph_titulo.text = titulo_formatado
             else:
                 # Preenche com espaço para evitar placeholder vazio
                 ph_titulo.text = " "
 
         # Placeholder idx=1: Conteúdo principal (frase introdutória)
-        ph_conteudo = None
-        for ph in slide.placeholders:
-            if ph.placeholder_format.idx == 1:
-                ph_conteudo = ph
-                break
+        ph_conteudo = placeholders.get(1)
 
         if ph_conteudo and ph_conteudo.has_text_frame:
             if frase_intro:
@@ -295,15 +602,16 @@ def adicionar_slide_conteudo(prs, slide_data, output_dir=None):
                 ph_conteudo.text = " "
 
         # Placeholder idx=2: Bullets (texto ou LaTeX)
-        ph_bullets = None
-        for ph in slide.placeholders:
-            if ph.placeholder_format.idx == 2:
-                ph_bullets = ph
-                break
+        ph_bullets = placeholders.get(2)
 
         if ph_bullets and ph_bullets.has_text_frame:
-            # Verifica se há LaTeX nos bullets
-            tem_latex = any(detectar_latex(bullet) for bullet in bullets)
+            # Separa texto/fórmula de cada bullet uma única vez (regex só onde há '$');
+            # partes é None para bullets sem LaTeX
+            bullets_partes = [
+                (bullet, separar_texto_e_latex(bullet) if detectar_latex(bullet) else None)
+                for bullet in bullets
+            ]
+            tem_latex = any(partes is not None for _, partes in bullets_partes)
 
             if tem_latex:
                 # Modo LaTeX: usa posicionamento manual com imagens
@@ -323,10 +631,10 @@ def adicionar_slide_conteudo(prs, slide_data, output_dir=None):
                 left = ph_bullets.left
                 bullet_counter = 0
 
-                for bullet in bullets:
-                    if detectar_latex(bullet):
-                        # Separa texto de fórmula
-                        texto_antes, formula = separar_texto_e_latex(bullet)
+                for bullet, partes in bullets_partes:
+                    if partes is not None:
+                        # Texto e fórmula já separados
+                        texto_antes, formula = partes
 
                         # Adiciona texto antes (se houver)
                         if texto_antes:
@@ -340,9 +648,12 @@ def adicionar_slide_conteudo(prs, slide_data, output_dir=None):
                         if formula:
                             try:
                                 filepath = Path(f"formula_{bullet_counter}")
-                                img_buffer = render_latex_as_image(formula, filepath, images_folder)
+                                img_buffer, renderizador = render_latex_as_image(
+                                    formula, filepath, images_folder, usar_dvipng=usar_dvipng
+                                )
+                                largura = _largura_formula(img_buffer.getvalue(), renderizador)
                                 # Posiciona imagem um pouco à direita (indentação)
-                                pic = slide.shapes.add_picture(img_buffer, left + Inches(0.3), top, width=Inches(5.5))
+                                pic = slide.shapes.add_picture(img_buffer, left + Inches(0.3), top, width=largura)
                                 top += pic.height + Inches(0.2)
                                 bullet_counter += 1
                             except Exception as e:
@@ -385,7 +696,7 @@ def adicionar_slide_conteudo(prs, slide_data, output_dir=None):
     return slide
 
 
-def gerar_apresentacao_powerpoint(slides_json_path, template_path=None, output_dir=None):
+def gerar_apresentacao_powerpoint(slides_json_path, template_path=None, output_dir=None, usar_dvipng=False):
     """
     Gera uma apresentação PowerPoint a partir do arquivo JSON de slides.
 
@@ -393,6 +704,9 @@ def gerar_apresentacao_powerpoint(slides_json_path, template_path=None, output_d
         slides_json_path (Path): Caminho para o arquivo JSON de slides
         template_path (Path): Caminho para template PowerPoint (opcional)
         output_dir (Path, optional): Diretório de output customizado. Padrão: "output/"
+        usar_dvipng (bool): Se True, pré-renderiza as fórmulas em lote com
+            LaTeX + dvipng (quando instalados); as demais são pré-renderizadas
+            com matplotlib em paralelo
 
     Returns:
         Path: Caminho do arquivo PowerPoint gerado
@@ -422,17 +736,22 @@ def gerar_apresentacao_powerpoint(slides_json_path, template_path=None, output_d
         if total_slides_template > 0:
             print(f"  Template tem {total_slides_template} slide(s) - removendo todos para começar limpo...")
 
-            # Remove todos os slides do fim para o início
-            for idx in reversed(range(len(prs.slides))):
-                rId = prs.slides._sldIdLst[idx].rId
-                prs.part.drop_rel(rId)
-                del prs.slides._sldIdLst[idx]
+            # Remove as relações de todos os slides e depois esvazia a lista de uma vez
+            sld_id_lst = prs.slides._sldIdLst
+            sld_ids = list(sld_id_lst)
+            for sld_id in sld_ids:
+                prs.part.drop_rel(sld_id.rId)
+            for sld_id in sld_ids:
+                sld_id_lst.remove(sld_id)
 
             print(f"  OK - Template limpo, iniciando com 0 slides")
     else:
         print("Criando apresentação com template padrão")
         prs = criar_template_padrao()
 
+    images_folder = Path(output_dir or "output") / "imagens_formulas"
+    pre_renderizar_formulas(slides, images_folder, usar_dvipng=usar_dvipng)
+
     print(f"Gerando {len(slides)} slides...")
 
     # Adicionar slides à apresentação
@@ -452,7 +771,7 @@ def gerar_apresentacao_powerpoint(slides_json_path, template_path=None, output_d
         else:
             # Layout 1: Todos os demais slides
             print(f"  Slide {i+1}/{len(slides)}: CONTEUDO [Layout 1] - {titulo[:40]}... ({timestamp:.2f}s)")
-            adicionar_slide_conteudo(prs, slide_data, output_dir=output_dir)
+            adicionar_slide_conteudo(prs, slide_data, output_dir=output_dir, usar_dvipng=usar_dvipng)
 
     # Define diretório de output
     if output_dir is None:
@@ -2,15 +2,113 @@
 Módulo para converter slides PowerPoint em imagens PNG.
 """
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import count, repeat
 from pathlib import Path
-from pptx import Presentation
-from pptx.util import Inches
+import atexit
 import os
+import queue
+import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
+
+try:
+    import fitz  # PyMuPDF (opcional): rasterização do PDF sem processos externos
+except ImportError:
+    fitz = None
+
+
+# PowerPoint.Application único, aberto na primeira exportação e reutilizado pelas
+# seguintes. Vive numa thread dedicada (COM STA), que recebe as exportações por
+# uma fila e as executa uma por vez; o LibreOffice usa um perfil por thread e
+# pode rodar em paralelo.
+_powerpoint = None
+_fila_powerpoint = None
+_thread_powerpoint_ativa = None
+_lock_powerpoint = threading.Lock()
+
+
+# Servidores LibreOffice persistentes (unoserver), iniciados sob demanda e
+# reutilizados pelas exportações seguintes, evitando subir um soffice novo por
+# apresentação. Cada thread de exportação usa sempre a mesma instância; a
+# instância k escuta em UNOSERVER_PORTA + 2k (e o soffice interno na porta seguinte).
+UNOSERVER_HOST = "127.0.0.1"
+UNOSERVER_PORTA = 2003
+UNOSERVER_INSTANCIAS = min(os.cpu_count() or 1, 4)
+_unoservers = {}  # porta -> subprocess.Popen
+_lock_unoserver = threading.Lock()
+_instancia_da_thread = threading.local()
+_contador_instancias = count()
+
+# Perfis LibreOffice por thread (soffice headless), removidos ao sair
+_perfis_libreoffice = set()
+
+
+# Partes de slide dentro do pacote OOXML (ppt/slides/slide1.xml, ...)
+_PADRAO_PARTE_SLIDE = re.compile(r"ppt/slides/slide\d+\.xml")
+
+
+def contar_slides(pptx_path):
+    """
+    Conta os slides de um PowerPoint lendo apenas o diretório do zip (.pptx),
+    sem carregar o XML de cada slide.
+
+    Args:
+        pptx_path (Path): Caminho para o arquivo PowerPoint
+
+    Returns:
+        int: Número de slides
+    """
+    with zipfile.ZipFile(pptx_path) as pacote:
+        return sum(1 for nome in pacote.namelist() if _PADRAO_PARTE_SLIDE.fullmatch(nome))
 
 
-def exportar_slides_como_imagens(pptx_path, output_folder, width=1920, height=1080):
+def _imagens_atualizadas(output_folder, total_slides, pptx_path, width, height):
+    """
+    Verifica se output_folder já tem slide_0..slide_{N-1}.png gerados a partir
+    da versão atual do PowerPoint: todas mais novas que o .pptx e com a
+    resolução pedida (lida do cabeçalho do primeiro PNG).
+
+    Returns:
+        list: Caminhos das imagens reaproveitáveis, ou None se for preciso exportar
+    """
+    if total_slides == 0:
+        return None
+
+    esperados = {f"slide_{i}.png" for i in range(total_slides)}
+    mtimes = {}
+    try:
+        with os.scandir(output_folder) as entradas:
+            for entrada in entradas:
+                if entrada.name in esperados:
+                    mtimes[entrada.name] = entrada.stat().st_mtime
+        mtime_pptx = pptx_path.stat().st_mtime
+
+        if len(mtimes) != total_slides or min(mtimes.values()) <= mtime_pptx:
+            return None
+
+        # Cabeçalho PNG: assinatura (8) + tamanho/tipo do IHDR (8) + largura (4) + altura (4)
+        with open(output_folder / "slide_0.png", 'rb') as f:
+            cabecalho = f.read(24)
+    except OSError:
+        return None
+
+    if int.from_bytes(cabecalho[16:20], "big") != width or int.from_bytes(cabecalho[20:24], "big") != height:
+        return None
+
+    return [output_folder / f"slide_{i}.png" for i in range(total_slides)]
+
+
+def exportar_slides_como_imagens(pptx_path, output_folder, width=1920, height=1080, forcar=False):
     """
     Exporta cada slide de uma apresentação PowerPoint como imagem PNG.
+    Se a pasta já tiver as imagens de todos os slides, mais novas que o
+    PowerPoint e na mesma resolução, elas são reaproveitadas sem nova exportação.
 
     NOTA: Esta função usa COM automation (Windows) ou conversão manual.
     Para conversão automática completa, é necessário ter PowerPoint instalado.
@@ -20,6 +118,7 @@ def exportar_slides_como_imagens(pptx_path, output_folder, width=1920, height=10
         output_folder (Path): Pasta onde salvar as imagens
         width (int): Largura da imagem em pixels
         height (int): Altura da imagem em pixels
+        forcar (bool): Se True, exporta mesmo que as imagens estejam atualizadas
 
     Returns:
         list: Lista de caminhos das imagens geradas
@@ -35,122 +134,306 @@ def exportar_slides_como_imagens(pptx_path, output_folder, width=1920, height=10
     print(f"Exportando slides de {pptx_path.name} para imagens...")
 
     # Verifica quantos slides existem
-    prs = Presentation(pptx_path)
-    total_slides = len(prs.slides)
+    total_slides = contar_slides(pptx_path)
+
+    if not forcar:
+        image_paths = _imagens_atualizadas(output_folder, total_slides, pptx_path, width, height)
+        if image_paths is not None:
+            print(f"OK {total_slides} imagens já atualizadas em {output_folder.name}/, reaproveitando")
+            return image_paths
 
     print(f"Total de slides a exportar: {total_slides}")
 
-    # Tenta usar COM automation no Windows
+    # Tenta usar COM automation no Windows (na thread do PowerPoint, uma por vez)
     try:
-        return _exportar_com_powerpoint_windows(pptx_path, output_folder, width, height, total_slides)
+        return _executar_na_thread_powerpoint(
+            _exportar_com_powerpoint_windows, pptx_path, output_folder, width, height, total_slides
+        )
     except Exception as e:
         print(f"Aviso: Não foi possível usar PowerPoint COM automation: {e}")
         print("Tentando método alternativo com LibreOffice/conversão manual...")
-        return _exportar_com_libreoffice(pptx_path, output_folder, total_slides)
+        return _exportar_com_libreoffice(pptx_path, output_folder, total_slides, width, height)
 
 
-def _exportar_com_powerpoint_windows(pptx_path, output_folder, width, height, total_slides):
+def _aguardar_liberacao_arquivo(caminho, timeout=5):
     """
-    Exporta slides usando PowerPoint COM automation (Windows apenas).
-    Requer PowerPoint instalado.
+    Espera até o arquivo poder ser aberto para escrita (lock do Windows liberado),
+    testando a cada 50 ms em vez de uma pausa fixa.
 
-    IMPORTANTE: Usa SaveAs com formato PNG para evitar bug do Export() que duplica slides.
+    Returns:
+        bool: True se o arquivo foi liberado dentro do timeout
     """
-    import win32com.client
-    import pythoncom
-    import time
-    import shutil
+    limite = time.monotonic() + timeout
+    while True:
+        try:
+            with open(caminho, 'r+b'):
+                return True
+        except PermissionError:
+            if time.monotonic() >= limite:
+                return False
+            time.sleep(0.05)
+        except OSError:
+            return True  # Arquivo inexistente/inacessível por outro motivo: nada a esperar
+
+
+def _thread_powerpoint(fila):
+    """
+    Laço da thread dedicada ao PowerPoint: inicializa o COM (STA) uma única vez
+    e executa as tarefas da fila, na ordem. None encerra a thread e o PowerPoint.
+    """
+    global _powerpoint
 
-    # CRÍTICO: Inicializa COM para esta thread
-    # Necessário pois pode ter sido desligado anteriormente
     try:
+        import pythoncom
         pythoncom.CoInitialize()
-    except:
-        pass  # Já estava inicializado
+    except ImportError:
+        pythoncom = None  # Fora do Windows: as tarefas falham ao importar win32com
+
+    while True:
+        tarefa = fila.get()
+        if tarefa is None:
+            break
+        funcao, args, futuro = tarefa
+        try:
+            futuro.set_result(funcao(*args))
+        except BaseException as e:
+            futuro.set_exception(e)
+
+    if _powerpoint is not None:
+        try:
+            _powerpoint.Quit()
+        except Exception:
+            pass
+        _powerpoint = None
 
-    # Inicializa PowerPoint
-    powerpoint = win32com.client.Dispatch("PowerPoint.Application")
-    powerpoint.Visible = 1
+    if pythoncom is not None:
+        pythoncom.CoUninitialize()
 
-    # Abre apresentação
-    presentation = powerpoint.Presentations.Open(str(pptx_path.absolute()), WithWindow=False)
 
-    # Aguarda o PowerPoint carregar completamente
-    time.sleep(1)
+def _encerrar_thread_powerpoint(timeout=30):
+    """
+    Fecha o PowerPoint compartilhado e encerra sua thread (registrado no atexit).
+    """
+    global _fila_powerpoint, _thread_powerpoint_ativa
 
-    image_paths = []
+    with _lock_powerpoint:
+        if _fila_powerpoint is None:
+            return
+        _fila_powerpoint.put(None)
+        _thread_powerpoint_ativa.join(timeout)
+        _fila_powerpoint = None
+        _thread_powerpoint_ativa = None
+
+
+atexit.register(_encerrar_thread_powerpoint)
+
+
+def _executar_na_thread_powerpoint(funcao, *args):
+    """
+    Executa funcao(*args) na thread do PowerPoint e aguarda o resultado.
+    Objetos COM do PowerPoint só podem ser usados pela thread que os criou;
+    a fila também garante uma exportação por vez.
+    """
+    global _fila_powerpoint, _thread_powerpoint_ativa
+
+    with _lock_powerpoint:
+        if _fila_powerpoint is None:
+            _fila_powerpoint = queue.Queue()
+            _thread_powerpoint_ativa = threading.Thread(
+                target=_thread_powerpoint, args=(_fila_powerpoint,), name="powerpoint-com", daemon=True
+            )
+            _thread_powerpoint_ativa.start()
+        futuro = Future()
+        _fila_powerpoint.put((funcao, args, futuro))
+
+    return futuro.result()
+
+
+def _obter_powerpoint():
+    """
+    Retorna o PowerPoint.Application compartilhado, criando-o na primeira
+    chamada (ou de novo, se o processo foi fechado). Só na thread do PowerPoint.
+    """
+    global _powerpoint
+
+    import win32com.client
 
+    if _powerpoint is not None:
+        try:
+            _powerpoint.Version  # Ainda responde?
+            return _powerpoint
+        except Exception:
+            _powerpoint = None
+
+    # Inicializa PowerPoint com early binding (wrappers gerados da typelib, sem
+    # IDispatch::GetIDsOfNames a cada chamada). Cache do gencache corrompido ou
+    # sem permissão de escrita: volta ao late binding.
     try:
-        # Debug: verificar total de slides no COM
-        com_total_slides = presentation.Slides.Count
-        print(f"  DEBUG: PowerPoint COM reporta {com_total_slides} slides")
+        powerpoint = win32com.client.gencache.EnsureDispatch("PowerPoint.Application")
+    except Exception:
+        powerpoint = win32com.client.Dispatch("PowerPoint.Application")
+    # Sem janela nem diálogos: Slide.Export não precisa da interface visível.
+    # Algumas versões do PowerPoint recusam Visible = 0 via COM; nesse caso fica visível.
+    try:
+        powerpoint.Visible = 0
+    except Exception:
+        powerpoint.Visible = 1
+    try:
+        powerpoint.DisplayAlerts = 1  # ppAlertsNone
+    except Exception:
+        pass
 
-        if com_total_slides != total_slides:
-            print(f"  AVISO: Divergência! python-pptx={total_slides}, COM={com_total_slides}")
-            print(f"  Usando valor do COM: {com_total_slides}")
-            total_slides = com_total_slides
+    _powerpoint = powerpoint
+    return powerpoint
 
-        # SOLUÇÃO: Usar indexação 0-based (PowerPoint COM aceita Slides[0])
-        # Bug identificado: range(1, N+1) pula Slides[0] e acessa Slides[N] que duplica o último
-        print(f"  Exportando slides com indexação 0-based (Slides[0] até Slides[{total_slides-1}])...")
 
-        # Fecha apresentação inicial
-        presentation.Close()
+# Formato ppSaveAsPNG de Presentation.SaveAs: uma imagem por slide numa pasta
+PP_SAVE_AS_PNG = 18
 
-        # CORREÇÃO: Usar range(0, total_slides) ao invés de range(1, total_slides+1)
-        for i in range(0, total_slides):
-            # Reabre apresentação para cada slide (força refresh completo)
-            print(f"  Abrindo apresentação para slide COM[{i}]...")
-            pres = powerpoint.Presentations.Open(str(pptx_path.absolute()), WithWindow=False)
-            time.sleep(0.5)
 
-            image_path = output_folder / f"slide_{i}.png"
+def _resolucao_saveas_png(powerpoint, presentation):
+    """
+    Calcula a resolução em que Presentation.SaveAs(ppSaveAsPNG) exporta os
+    slides: tamanho do slide (pontos) na resolução ExportBitmapResolution do
+    registro do PowerPoint (padrão 96 dpi).
 
-            # Delete arquivo anterior se existir
-            if image_path.exists():
-                image_path.unlink()
+    Returns:
+        tuple: (largura, altura) em pixels, ou None se não for possível determinar
+    """
+    import winreg
 
-            # Exporta usando indexação 0-based
-            pres.Slides[i].Export(
-                str(image_path.absolute()),
-                "PNG",
-                width,
-                height
-            )
+    dpi = 96
+    chave = rf"Software\Microsoft\Office\{powerpoint.Version}\PowerPoint\Options"
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, chave) as opcoes:
+            dpi = winreg.QueryValueEx(opcoes, "ExportBitmapResolution")[0]
+    except OSError:
+        pass
+
+    try:
+        page_setup = presentation.PageSetup
+        return (round(page_setup.SlideWidth * dpi / 72), round(page_setup.SlideHeight * dpi / 72))
+    except Exception:
+        return None
 
-            time.sleep(0.3)
 
-            # Fecha apresentação
-            pres.Close()
+def _exportar_com_saveas_png(presentation, output_folder, total_slides):
+    """
+    Exporta todos os slides numa única chamada COM (SaveAs ppSaveAsPNG) e
+    renomeia as imagens (Slide1.PNG, Slide2.PNG, ...) para slide_0.png, slide_1.png, ...
 
-            # Verifica resultado
-            if image_path.exists():
-                size_kb = image_path.stat().st_size / 1024
-                print(f"    COM Slides[{i}] -> slide_{i}.png ({size_kb:.1f} KB)")
-                image_paths.append(image_path)
-            else:
-                print(f"    ERRO: Slide {i} nao foi criado!")
+    Returns:
+        list: Caminhos das imagens exportadas
+    """
+    pasta_saveas = output_folder / "_saveas_png"
+    shutil.rmtree(pasta_saveas, ignore_errors=True)
 
-        # presentation já foi fechado no loop
-        presentation = None
+    presentation.SaveAs(str(pasta_saveas.absolute()), PP_SAVE_AS_PNG)
 
+    image_paths = []
+    linhas_log = []
+    try:
+        with os.scandir(pasta_saveas) as entradas:
+            # Nome do arquivo varia com o idioma do Office; só o número final importa
+            numerados = {}
+            for entrada in entradas:
+                m = re.search(r"(\d+)\.png$", entrada.name, re.IGNORECASE)
+                if m:
+                    numerados[int(m.group(1))] = entrada.path
+
+        for numero in range(1, total_slides + 1):
+            origem = numerados.get(numero)
+            if origem is None:
+                linhas_log.append(f"    ERRO: Slide {numero - 1} nao foi criado!")
+                continue
+            image_path = output_folder / f"slide_{numero - 1}.png"
+            os.replace(origem, image_path)
+            image_paths.append(image_path)
+
+        linhas_log.append(f"    COM SaveAs(ppSaveAsPNG) -> {len(image_paths)} imagens")
+        print("\n".join(linhas_log))
     finally:
-        # Fecha apresentação e PowerPoint
-        if presentation:
-            try:
-                presentation.Close()
-            except:
-                pass
+        shutil.rmtree(pasta_saveas, ignore_errors=True)
 
+    return image_paths
+
+
+def _exportar_com_powerpoint_windows(pptx_path, output_folder, width, height, total_slides):
+    """
+    Exporta slides usando PowerPoint COM automation (Windows apenas).
+    Requer PowerPoint instalado. Deve rodar na thread do PowerPoint
+    (ver _executar_na_thread_powerpoint).
+
+    A apresentação é aberta uma única vez. Se a resolução padrão de exportação
+    do PowerPoint já for a pedida, todos os slides saem num único SaveAs;
+    senão, cada slide é exportado com Slides.Item(i), o acessor 1-based do COM.
+    A imagem de destino é apagada antes de cada exportação, para que um arquivo
+    de uma execução anterior não passe por slide exportado (causa do antigo
+    "último slide duplicado").
+    """
+    powerpoint = _obter_powerpoint()
+
+    # Abre apresentação (uma única vez para todos os slides)
+    presentation = powerpoint.Presentations.Open(str(pptx_path.absolute()), WithWindow=False)
+
+    image_paths = []
+
+    try:
+        com_total_slides = presentation.Slides.Count
+
+        if com_total_slides != total_slides:
+            print(f"  AVISO: Divergência! pptx={total_slides}, COM={com_total_slides}")
+            print(f"  Usando valor do COM: {com_total_slides}")
+            total_slides = com_total_slides
+
+        if _resolucao_saveas_png(powerpoint, presentation) == (width, height):
+            # Resolução padrão de exportação já é a pedida: todos os slides num único SaveAs
+            image_paths = _exportar_com_saveas_png(presentation, output_folder, total_slides)
+        else:
+            # Coleção e método resolvidos uma única vez fora do loop
+            obter_slide = presentation.Slides.Item
+            linhas_log = []  # Impressas de uma vez ao final, não uma por slide
+
+            for i in range(1, total_slides + 1):
+                image_path = output_folder / f"slide_{i - 1}.png"
+
+                # Delete arquivo anterior se existir
+                if image_path.exists():
+                    image_path.unlink()
+
+                obter_slide(i).Export(
+                    str(image_path.absolute()),
+                    "PNG",
+                    width,
+                    height
+                )
+
+                # Verifica resultado (um único stat)
+                try:
+                    size_kb = image_path.stat().st_size / 1024
+                except FileNotFoundError:
+                    linhas_log.append(f"    ERRO: Slide {i - 1} nao foi criado!")
+                    continue
+
+                linhas_log.append(f"    COM Slides.Item({i}) -> {image_path.name} ({size_kb:.1f} KB)")
+                image_paths.append(image_path)
+
+            if linhas_log:
+                print("\n".join(linhas_log))
+
+            # Solta a referência à coleção antes de liberar o COM no finally
+            del obter_slide
+
+    finally:
+        # Fecha só a apresentação: o PowerPoint continua aberto para as próximas
         try:
-            powerpoint.Quit()
+            presentation.Close()
         except:
             pass
 
         # CRÍTICO: Liberar recursos COM do Windows
         # Sem isso, arquivos .pptx ficam bloqueados
         import gc
-        import time
 
         # Força liberação de objetos COM
         del presentation
@@ -159,63 +442,339 @@ def _exportar_com_powerpoint_windows(pptx_path, output_folder, width, height, to
         # Força garbage collection
         gc.collect()
 
-        # Aguarda sistema liberar arquivos (Windows leva tempo)
-        time.sleep(0.5)
-
-        # NÃO chamar CoUninitialize() aqui!
-        # Deixar COM ativo para próximas chamadas na mesma thread
+        # Aguarda o Windows liberar o .pptx (retorna assim que o arquivo abre para escrita)
+        _aguardar_liberacao_arquivo(pptx_path)
 
     print(f"\nOK {len(image_paths)} slides exportados com sucesso")
     return image_paths
 
 
-def _exportar_com_libreoffice(pptx_path, output_folder, total_slides):
+def _encerrar_unoserver(porta):
     """
-    Exporta slides usando LibreOffice (alternativa multiplataforma).
-    Requer LibreOffice instalado.
+    Encerra o servidor LibreOffice persistente de uma porta.
+    """
+    processo = _unoservers.pop(porta, None)
+
+    if processo is not None and processo.poll() is None:
+        processo.terminate()
+        try:
+            processo.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+
+
+def _encerrar_unoservers():
+    """
+    Encerra todos os servidores LibreOffice persistentes (registrado no atexit).
     """
-    import subprocess
+    for porta in list(_unoservers):
+        _encerrar_unoserver(porta)
+
+
+atexit.register(_encerrar_unoservers)
+
+
+def _porta_unoserver_da_thread():
+    """
+    Retorna a porta da instância unoserver atribuída à thread atual.
+
+    Returns:
+        int: Porta XML-RPC da instância
+    """
+    if not hasattr(_instancia_da_thread, "porta"):
+        instancia = next(_contador_instancias) % UNOSERVER_INSTANCIAS
+        _instancia_da_thread.porta = UNOSERVER_PORTA + 2 * instancia
+    return _instancia_da_thread.porta
+
+
+def _obter_unoserver(timeout=30, reiniciar=False):
+    """
+    Garante a instância unoserver da thread atual em execução, iniciando-a (ou
+    reiniciando-a, se morreu ou se reiniciar=True).
+
+    Args:
+        timeout (int): Segundos de espera até a porta abrir
+        reiniciar (bool): Se True, encerra a instância atual antes
+
+    Returns:
+        int: Porta do servidor aceitando conexões, ou None se o unoserver não
+             está instalado ou não subiu a tempo
+    """
+    if not (shutil.which("unoserver") and shutil.which("unoconvert")):
+        return None
+
+    porta = _porta_unoserver_da_thread()
+
+    with _lock_unoserver:
+        if reiniciar:
+            _encerrar_unoserver(porta)
+
+        processo = _unoservers.get(porta)
+        if processo is not None and processo.poll() is None:
+            return porta
+
+        print(f"Iniciando servidor LibreOffice persistente (unoserver, porta {porta})...")
+        # O unoserver cria um perfil LibreOffice temporário próprio para cada instância
+        processo = subprocess.Popen(
+            [
+                "unoserver",
+                "--interface", UNOSERVER_HOST,
+                "--port", str(porta),
+                "--uno-port", str(porta + 1)
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        _unoservers[porta] = processo
+
+        # Aguarda a porta abrir
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            if processo.poll() is not None:
+                break
+            try:
+                with socket.create_connection((UNOSERVER_HOST, porta), timeout=1):
+                    return porta
+            except OSError:
+                time.sleep(0.2)
+
+        print("Aviso: unoserver não respondeu, usando soffice por chamada")
+        _encerrar_unoserver(porta)
+        return None
 
-    # Caminho absoluto do arquivo
-    pptx_abs = pptx_path.absolute()
-    output_abs = output_folder.absolute()
 
-    # Comando LibreOffice para exportar como PNG
+def _perfil_libreoffice():
+    """
+    Retorna a URI de um perfil de usuário LibreOffice exclusivo da thread atual.
+    Cada soffice com perfil próprio roda como instância independente, sem
+    esbarrar no lock de instância única de outra conversão em andamento.
+
+    Returns:
+        str: URI file:// do diretório do perfil
+    """
+    pasta = Path(tempfile.gettempdir()) / f"lo_perfil_{threading.get_ident()}"
+    _perfis_libreoffice.add(pasta)
+    return pasta.as_uri()
+
+
+def _remover_perfis_libreoffice():
+    """
+    Remove os perfis LibreOffice criados pelas threads (registrado no atexit).
+    """
+    for pasta in list(_perfis_libreoffice):
+        shutil.rmtree(pasta, ignore_errors=True)
+    _perfis_libreoffice.clear()
+
+
+atexit.register(_remover_perfis_libreoffice)
+
+
+def _converter_com_libreoffice(pptx_abs, output_abs, formato, destino):
+    """
+    Converte a apresentação com o unoserver persistente, se disponível, ou com
+    um soffice headless usando o perfil da thread.
+
+    Args:
+        pptx_abs (Path): Caminho absoluto do PowerPoint
+        output_abs (Path): Pasta de saída (absoluta)
+        formato (str): Formato de saída do LibreOffice ("pdf", "png")
+        destino (Path): Arquivo que o soffice geraria em --outdir
+    """
     # --headless: roda sem interface
-    # --convert-to png: converte para PNG
+    # --convert-to: formato de saída
     # --outdir: diretório de saída
-
     cmd = [
         "soffice",
+        f"-env:UserInstallation={_perfil_libreoffice()}",
         "--headless",
-        "--convert-to", "png",
+        "--convert-to", formato,
         "--outdir", str(output_abs),
         str(pptx_abs)
     ]
 
+    porta = _obter_unoserver()
+
+    # Servidor que parou de responder: reinicia uma vez antes de cair no soffice
+    for tentativa in range(2):
+        if porta is None:
+            break
+        cmd_unoserver = [
+            "unoconvert",
+            "--host", UNOSERVER_HOST,
+            "--port", str(porta),
+            "--convert-to", formato,
+            str(pptx_abs),
+            str(destino)
+        ]
+        try:
+            result = subprocess.run(cmd_unoserver, capture_output=True, text=True, timeout=60)
+            if result.returncode == 0:
+                return
+        except subprocess.TimeoutExpired:
+            pass
+        if tentativa == 0:
+            print("Aviso: unoserver falhou na conversão, reiniciando...")
+            porta = _obter_unoserver(reiniciar=True)
+
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    except FileNotFoundError:
+        raise Exception("LibreOffice não encontrado. Instale LibreOffice ou use Windows com PowerPoint instalado.")
 
-        if result.returncode != 0:
-            raise Exception(f"LibreOffice falhou: {result.stderr}")
+    if result.returncode != 0:
+        raise Exception(f"LibreOffice falhou: {result.stderr}")
 
-        # LibreOffice cria arquivos com nomes diferentes
-        # Renomeia para o padrão esperado (slide_0.png, slide_1.png, etc.)
-        image_paths = []
-        for i in range(total_slides):
-            # Nome gerado pelo LibreOffice (geralmente: nome_do_arquivo_i.png)
-            libreoffice_name = output_folder / f"{pptx_path.stem}_{i}.png"
-            target_name = output_folder / f"slide_{i}.png"
 
-            if libreoffice_name.exists():
-                libreoffice_name.rename(target_name)
-                image_paths.append(target_name)
-                print(f"  Slide {i+1}/{total_slides} exportado: {target_name.name}")
+def _pasta_temporaria_rapida():
+    """
+    Retorna /dev/shm (memória compartilhada, tmpfs) quando existir, para
+    arquivos intermediários que não precisam ir para o disco.
 
-        return image_paths
+    Returns:
+        str: Caminho da pasta, ou None para a pasta temporária padrão do sistema
+    """
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return None
+
+
+def _rasterizar_pagina_pdf(pdf_path, pagina, image_path, width, height):
+    """
+    Rasteriza uma página (1-based) do PDF em PNG, com o PyMuPDF quando
+    instalado (em processo, sem subir um executável por página) ou com o pdftoppm.
+
+    Returns:
+        bool: True se a imagem foi criada
+    """
+    if fitz is not None:
+        # Um documento por chamada: objetos do MuPDF não são compartilhados entre threads
+        with fitz.open(pdf_path) as doc:
+            page = doc[pagina - 1]
+            matriz = fitz.Matrix(width / page.rect.width, height / page.rect.height)
+            page.get_pixmap(matrix=matriz).save(str(image_path))
+        return image_path.exists()
+
+    cmd = [
+        "pdftoppm", "-png", "-singlefile",
+        "-f", str(pagina), "-l", str(pagina),
+        "-scale-to-x", str(width), "-scale-to-y", str(height),
+        str(pdf_path),
+        str(image_path.with_suffix(""))
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    return result.returncode == 0 and image_path.exists()
+
+
+def _converter_para_pdf(pptx_path, pasta_pdf):
+    """
+    Converte a apresentação inteira para PDF com o LibreOffice.
+
+    Args:
+        pptx_path (Path): Caminho para o arquivo PowerPoint
+        pasta_pdf (Path): Pasta onde gravar o PDF
+
+    Returns:
+        Path: Caminho do PDF gerado
+    """
+    pdf_path = pasta_pdf / f"{pptx_path.stem}.pdf"
+    _converter_com_libreoffice(pptx_path.absolute(), pasta_pdf.absolute(), "pdf", pdf_path)
+
+    if not pdf_path.exists():
+        raise Exception(f"LibreOffice não gerou o PDF: {pdf_path.name}")
+
+    return pdf_path
+
+
+def _exportar_com_libreoffice(pptx_path, output_folder, total_slides, width=1920, height=1080):
+    """
+    Exporta slides usando LibreOffice (alternativa multiplataforma).
+    Requer LibreOffice instalado. Se o unoserver estiver disponível, reutiliza
+    um único processo LibreOffice para todas as exportações.
+
+    Com o PyMuPDF ou o pdftoppm (poppler) instalado, a apresentação é
+    convertida uma única vez para PDF e as páginas são rasterizadas em paralelo.
+    """
+    if fitz is None and not shutil.which("pdftoppm"):
+        return _exportar_png_com_libreoffice(
+            pptx_path, pptx_path.absolute(), output_folder, output_folder.absolute(), total_slides
+        )
+
+    # O PDF é só intermediário: vai para a memória (tmpfs) quando disponível
+    with tempfile.TemporaryDirectory(prefix="pptx_pdf_", dir=_pasta_temporaria_rapida()) as pasta_pdf:
+        pdf_path = _converter_para_pdf(pptx_path, Path(pasta_pdf))
+
+        image_paths = [output_folder / f"slide_{i}.png" for i in range(total_slides)]
+
+        num_workers = min(os.cpu_count() or 1, 5, max(total_slides, 1))
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            criadas = list(executor.map(
+                _rasterizar_pagina_pdf,
+                repeat(pdf_path),
+                range(1, total_slides + 1),
+                image_paths,
+                repeat(width),
+                repeat(height)
+            ))
+
+    exportadas = []
+    linhas_log = []  # Impressas de uma vez ao final, não uma por slide
+    for i, (image_path, criada) in enumerate(zip(image_paths, criadas)):
+        if criada:
+            exportadas.append(image_path)
+            linhas_log.append(f"  Slide {i+1}/{total_slides} exportado: {image_path.name}")
+        else:
+            linhas_log.append(f"  ERRO: Slide {i} nao foi criado!")
+
+    if linhas_log:
+        print("\n".join(linhas_log))
+
+    return exportadas
+
+
+def _exportar_png_com_libreoffice(pptx_path, pptx_abs, output_folder, output_abs, total_slides):
+    """
+    Exportação direta para PNG pelo LibreOffice (sem pdftoppm disponível).
+    """
+    # Mesmo arquivo de saída que o soffice geraria em --outdir
+    _converter_com_libreoffice(pptx_abs, output_abs, "png", output_abs / f"{pptx_path.stem}.png")
+
+    # LibreOffice cria arquivos com nomes diferentes
+    # Renomeia para o padrão esperado (slide_0.png, slide_1.png, etc.)
+    image_paths = []
+    linhas_log = []  # Impressas de uma vez ao final, não uma por slide
+    for i in range(total_slides):
+        # Nome gerado pelo LibreOffice (geralmente: nome_do_arquivo_i.png)
+        libreoffice_name = output_folder / f"{pptx_path.stem}_{i}.png"
+        target_name = output_folder / f"slide_{i}.png"
+
+        # Um único syscall por arquivo (sem exists() antes); os.replace também
+        # sobrescreve um slide_i.png de execução anterior, inclusive no Windows
+        try:
+            os.replace(libreoffice_name, target_name)
+        except FileNotFoundError:
+            continue
+
+        image_paths.append(target_name)
+        linhas_log.append(f"  Slide {i+1}/{total_slides} exportado: {target_name.name}")
+
+    if linhas_log:
+        print("\n".join(linhas_log))
 
+    return image_paths
+
+
+def _nomes_na_pasta(output_folder):
+    """
+    Lê os nomes dos arquivos de uma pasta numa única listagem (sem um stat por arquivo).
+
+    Returns:
+        set: Nomes dos arquivos (vazio se a pasta não existir)
+    """
+    try:
+        with os.scandir(output_folder) as entradas:
+            return {entrada.name for entrada in entradas if entrada.is_file()}
     except FileNotFoundError:
-        raise Exception("LibreOffice não encontrado. Instale LibreOffice ou use Windows com PowerPoint instalado.")
+        return set()
 
 
 def verificar_imagens_exportadas(output_folder, total_slides):
@@ -229,13 +788,8 @@ def verificar_imagens_exportadas(output_folder, total_slides):
     Returns:
         tuple: (sucesso: bool, imagens_faltando: list)
     """
-    output_folder = Path(output_folder)
-    imagens_faltando = []
-
-    for i in range(total_slides):
-        image_path = output_folder / f"slide_{i}.png"
-        if not image_path.exists():
-            imagens_faltando.append(i)
+    nomes = _nomes_na_pasta(output_folder)
+    imagens_faltando = [i for i in range(total_slides) if f"slide_{i}.png" not in nomes]
 
     sucesso = len(imagens_faltando) == 0
 
@@ -250,10 +804,15 @@ def listar_imagens_exportadas(output_folder):
         output_folder (Path): Pasta com as imagens
 
     Returns:
-        list: Lista ordenada de caminhos das imagens
+        list: Lista de caminhos das imagens, em ordem numérica (slide_2 antes de slide_10)
     """
     output_folder = Path(output_folder)
 
-    images = sorted(output_folder.glob("slide_*.png"))
+    indices = []
+    for nome in _nomes_na_pasta(output_folder):
+        if nome.startswith("slide_") and nome.endswith(".png"):
+            numero = nome[len("slide_"):-len(".png")]
+            if numero.isdigit():
+                indices.append(int(numero))
 
-    return images
+    return [output_folder / f"slide_{i}.png" for i in sorted(indices)]
@@ -2,6 +2,8 @@
 Módulo de prompts para chunking e geração de slides.
 """
 
+from types import MappingProxyType
+
 # Prompt para conversão de fórmulas matemáticas para LaTeX
 MATH_CONVERSION_PROMPT = """Você é um assistente especialista em matemática e LaTeX. Sua tarefa é analisar um texto
 transcrito de uma aula de matemática e converter todas as expressões, equações e fórmulas
@@ -395,3 +397,11 @@ Retorne APENAS um objeto JSON. Note que a saída pode conter uma `frase_introdut
 - Se não houver redundância, mantenha frase_introdutoria vazia
 - Para resoluções matemáticas: PRESERVE TODOS OS PASSOS, não resuma
 """
+
+
+# Prompt de geração de slide por tipo de chunk (montado uma única vez, somente leitura)
+SLIDE_PROMPTS_POR_TIPO = MappingProxyType({
+    "introducao": SLIDE_INTRO_PROMPT,
+    "conceito": SLIDE_CONCEITO_PROMPT,
+    "exemplo": SLIDE_EXEMPLO_PROMPT
+})
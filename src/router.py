@@ -2,8 +2,45 @@
 Módulo para detectar tipo de conteúdo (matemática ou não) e rotear processamento.
 """
 
-import json
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
+from src.cache import calcular_hash_texto, ler_cache, salvar_cache
+from src.json_utils import ler_json_texto
+
+
+# Classificação binária com saída curta: o modelo menor basta na maioria dos casos.
+# Quando ele aponta "matematica" sem atingir a confiança que ativa o modo
+# matemático (ver deve_processar_matematica), a amostra é refeita no maior.
+MODELO_ROUTER = "gpt-4o-mini"
+MODELO_ROUTER_FALLBACK = "gpt-4o"
+CONFIANCA_MINIMA_MATEMATICA = 0.7
+
+
+# Pré-filtro local: sem nenhum destes indícios (dígitos, símbolos ou vocabulário
+# matemático, incluindo os indicadores do prompt abaixo) o texto é classificado
+# como "geral" sem consultar o LLM
+_INDICIO_MATEMATICO = re.compile(
+    r"\d|[=+*/^×÷∫∑√π]"
+    r"|\b[xy]\b"
+    r"|equa[çc]|inequa|fun[çc][ãa]o|f[óo]rmula|vari[áa]ve|calcul|c[áa]lculo|resolv"
+    r"|vezes|dividid|quadrad|cubo|raiz|pot[êe]ncia|expoente|fra[çc][ãa]o|porcent|logaritm"
+    r"|deriv|integra|limite|teorema|matri[zc]|vetor|polin[ôo]mi|seno|cosseno|tangente"
+    r"|delta|sigma|\bpi\b|[áa]lgebra|geometri|estat[íi]stic|probabilidad|n[úu]mero",
+    re.IGNORECASE
+)
+
+
+# Termos que só aparecem em fala matemática. Com MIN_INDICIOS_FORTES termos
+# distintos na amostra, o texto é classificado como "matematica" sem o LLM
+_INDICIO_FORTE = re.compile(
+    r"\b(equa[çc][ãa]o|inequa[çc][ãa]o|f[óo]rmula|ao quadrado|ao cubo|raiz quadrada|raiz c[úu]bica"
+    r"|dividido por|elevado a|derivada|integral|logaritmo|delta|polin[ôo]mio"
+    r"|denominador|numerador|coeficiente)\b",
+    re.IGNORECASE
+)
+MIN_INDICIOS_FORTES = 3
 
 
 CONTENT_TYPE_DETECTION_PROMPT = """Você é um especialista em análise de conteúdo educacional.
@@ -44,13 +81,42 @@ Analisar uma transcrição de áudio educacional e determinar se o conteúdo é
 """
 
 
-def detectar_tipo_conteudo(client: OpenAI, texto_transcricao: str) -> dict:
+def _classificar_amostra(client: OpenAI, amostra: str, modelo: str) -> dict:
     """
-    Detecta se o conteúdo é matemático ou geral usando GPT-4o.
+    Envia a amostra ao LLM de classificação e normaliza a resposta.
+
+    Returns:
+        dict: {"tipo_conteudo", "confianca", "justificativa"}
+    """
+    response = client.chat.completions.create(
+        model=modelo,
+        messages=[
+            {"role": "system", "content": CONTENT_TYPE_DETECTION_PROMPT},
+            {"role": "user", "content": amostra}
+        ],
+        temperature=0.1,
+        response_format={"type": "json_object"}
+    )
+
+    resultado = ler_json_texto(response.choices[0].message.content)
+
+    return {
+        "tipo_conteudo": resultado.get("tipo_conteudo", "geral"),
+        "confianca": resultado.get("confianca", 0.0),
+        "justificativa": resultado.get("justificativa", "")
+    }
+
+
+def detectar_tipo_conteudo(client: OpenAI, texto_transcricao: str, usar_cache: bool = True) -> dict:
+    """
+    Detecta se o conteúdo é matemático ou geral usando GPT-4o-mini (GPT-4o
+    quando a resposta vem com confiança baixa).
+    Resultados bem-sucedidos são guardados no cache em disco.
 
     Args:
         client (OpenAI): Cliente OpenAI configurado
         texto_transcricao (str): Texto da transcrição completa
+        usar_cache (bool): Se True, consulta e alimenta o cache
 
     Returns:
         dict: {
@@ -61,35 +127,53 @@ def detectar_tipo_conteudo(client: OpenAI, texto_transcricao: str) -> dict:
     """
     print("\n[ROUTER] Detectando tipo de conteúdo...")
 
-    try:
-        # Usa apenas os primeiros 2000 caracteres para análise (suficiente)
-        amostra = texto_transcricao[:2000]
+    # Usa apenas os primeiros 2000 caracteres para análise (suficiente)
+    amostra = texto_transcricao[:2000]
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": CONTENT_TYPE_DETECTION_PROMPT},
-                {"role": "user", "content": amostra}
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"}
-        )
+    if not _INDICIO_MATEMATICO.search(amostra):
+        print("✓ Tipo detectado (pré-filtro): GERAL (nenhum indício matemático)")
+        return {
+            "tipo_conteudo": "geral",
+            "confianca": 1.0,
+            "justificativa": "Nenhum número, símbolo ou termo matemático na amostra"
+        }
 
-        resultado = json.loads(response.choices[0].message.content)
+    # Sem acentos, para que "equação" e "equacao" contem como o mesmo termo
+    indicios_fortes = {
+        unicodedata.normalize("NFKD", m.lower()).encode("ascii", "ignore").decode()
+        for m in _INDICIO_FORTE.findall(amostra)
+    }
+    if len(indicios_fortes) >= MIN_INDICIOS_FORTES:
+        print(f"✓ Tipo detectado (pré-filtro): MATEMATICA ({', '.join(sorted(indicios_fortes))})")
+        return {
+            "tipo_conteudo": "matematica",
+            "confianca": 0.9,
+            "justificativa": f"{len(indicios_fortes)} termos matemáticos distintos na amostra"
+        }
 
-        tipo = resultado.get("tipo_conteudo", "geral")
-        confianca = resultado.get("confianca", 0.0)
-        justificativa = resultado.get("justificativa", "")
+    chave = calcular_hash_texto(amostra, MODELO_ROUTER) if usar_cache else None
+    if chave:
+        deteccao = ler_cache(chave, "deteccao")
+        if deteccao is not None:
+            print(f"✓ Tipo detectado (cache): {deteccao['tipo_conteudo'].upper()}")
+            return deteccao
 
-        print(f"✓ Tipo detectado: {tipo.upper()}")
-        print(f"  Confiança: {confianca:.2f}")
-        print(f"  Justificativa: {justificativa}")
+    try:
+        deteccao = _classificar_amostra(client, amostra, MODELO_ROUTER)
 
-        return {
-            "tipo_conteudo": tipo,
-            "confianca": confianca,
-            "justificativa": justificativa
-        }
+        # Resposta incerta do modelo menor: confirma com o modelo maior
+        if deteccao["tipo_conteudo"] == "matematica" and deteccao["confianca"] < CONFIANCA_MINIMA_MATEMATICA:
+            print(f"  Confiança baixa ({deteccao['confianca']:.2f}), confirmando com {MODELO_ROUTER_FALLBACK}...")
+            deteccao = _classificar_amostra(client, amostra, MODELO_ROUTER_FALLBACK)
+
+        print(f"✓ Tipo detectado: {deteccao['tipo_conteudo'].upper()}")
+        print(f"  Confiança: {deteccao['confianca']:.2f}")
+        print(f"  Justificativa: {deteccao['justificativa']}")
+
+        if chave:
+            salvar_cache(chave, "deteccao", deteccao)
+
+        return deteccao
 
     except Exception as e:
         print(f"⚠ ERRO ao detectar tipo de conteúdo: {e}")
@@ -101,6 +185,34 @@ def detectar_tipo_conteudo(client: OpenAI, texto_transcricao: str) -> dict:
         }
 
 
+def detectar_tipos_de_varios_textos(client: OpenAI, textos: list, usar_cache: bool = True,
+                                    max_simultaneas: int = 8) -> list:
+    """
+    Detecta o tipo de conteúdo de várias transcrições com as requisições ao
+    LLM em voo simultaneamente (no máximo max_simultaneas por vez).
+
+    Args:
+        client (OpenAI): Cliente OpenAI configurado (pool de conexões compartilhado)
+        textos (list): Textos das transcrições (None para transcrições ausentes)
+        usar_cache (bool): Se True, consulta e alimenta o cache
+        max_simultaneas (int): Limite de requisições simultâneas
+
+    Returns:
+        list: Resultado de detectar_tipo_conteudo() por texto, na mesma ordem
+              (None para os textos ausentes)
+    """
+    def _detectar(texto):
+        if texto is None:
+            return None
+        return detectar_tipo_conteudo(client, texto, usar_cache)
+
+    if not textos:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(len(textos), max_simultaneas)) as executor:
+        return list(executor.map(_detectar, textos))
+
+
 def deve_processar_matematica(deteccao: dict) -> bool:
     """
     Decide se deve ativar o processamento matemático baseado na detecção.
@@ -117,4 +229,4 @@ def deve_processar_matematica(deteccao: dict) -> bool:
     # Ativa processamento matemático se:
     # 1. Tipo detectado é "matematica" E
     # 2. Confiança >= 0.7
-    return tipo == "matematica" and confianca >= 0.7
+    return tipo == "matematica" and confianca >= CONFIANCA_MINIMA_MATEMATICA
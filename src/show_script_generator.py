@@ -4,8 +4,16 @@ Cria eventos SHOW_SLIDE com timestamps sincronizados.
 """
 
 import json
+import os
+import sys
+from operator import itemgetter
 from pathlib import Path
 
+from src.json_utils import carregar_json, salvar_json
+
+
+ACAO_SHOW_SLIDE = "SHOW_SLIDE"
+
 
 def gerar_show_script(slides_json_path, output_path=None):
     """
@@ -32,8 +40,7 @@ def gerar_show_script(slides_json_path, output_path=None):
     print(f"Gerando script de apresentação a partir de {slides_json_path.name}...")
 
     # Carregar slides
-    with open(slides_json_path, 'r', encoding='utf-8') as f:
-        dados = json.load(f)
+    dados = carregar_json(slides_json_path)
 
     slides = dados.get("slides", [])
 
@@ -42,15 +49,18 @@ def gerar_show_script(slides_json_path, output_path=None):
 
     # Gerar eventos SHOW_SLIDE
     show_script = []
+    linhas_log = []  # Impressas de uma vez ao final, não uma por evento
 
     for i, slide in enumerate(slides):
         timestamp = slide.get("timestamp_inicio", 0.0)
-        tipo = slide.get("tipo", "")
+        # Poucos tipos distintos: interning faz todos os eventos do mesmo tipo
+        # compartilharem uma única string em vez de uma cópia por slide lido do JSON
+        tipo = sys.intern(slide.get("tipo", ""))
         titulo = slide.get("slide_title", "Sem Título")
 
         evento = {
             "timestamp": timestamp,
-            "action": "SHOW_SLIDE",
+            "action": ACAO_SHOW_SLIDE,
             "slide_index": i,
             "metadata": {
                 "tipo": tipo,
@@ -60,8 +70,9 @@ def gerar_show_script(slides_json_path, output_path=None):
 
         show_script.append(evento)
 
-        print(f"  Evento {i+1}: SHOW_SLIDE aos {timestamp:.2f}s - {titulo[:40]}...")
+        linhas_log.append(f"  Evento {i+1}: SHOW_SLIDE aos {timestamp:.2f}s - {titulo[:40]}...")
 
+    print("\n".join(linhas_log))
     print(f"\nOK {len(show_script)} eventos gerados")
 
     # Salvar script se caminho fornecido
@@ -69,14 +80,42 @@ def gerar_show_script(slides_json_path, output_path=None):
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(show_script, f, ensure_ascii=False, indent=2)
+        # Escrita atômica: um crash no meio não deixa JSON parcial no lugar do script
+        tmp_path = output_path.with_suffix(".json.tmp")
+        salvar_json(tmp_path, show_script)
+        os.replace(tmp_path, output_path)
 
         print(f"OK Script de apresentação salvo em: {output_path}")
 
     return show_script
 
 
+def obter_show_script(slides_json_path, show_script_path):
+    """
+    Reaproveita o show_script.json se ele for mais recente que o arquivo de
+    slides; caso contrário, gera um novo (ver gerar_show_script).
+
+    Args:
+        slides_json_path (Path): Caminho para o arquivo *_slides.json
+        show_script_path (Path): Caminho do show_script.json
+
+    Returns:
+        list: Lista de eventos do script de apresentação
+    """
+    slides_json_path = Path(slides_json_path)
+    show_script_path = Path(show_script_path)
+
+    try:
+        if show_script_path.stat().st_mtime >= slides_json_path.stat().st_mtime:
+            show_script = carregar_json(show_script_path)
+            print(f"OK Script de apresentação reaproveitado (slides sem alterações): {show_script_path}")
+            return show_script
+    except (OSError, json.JSONDecodeError):
+        pass  # Inexistente ou inválido: gera novamente
+
+    return gerar_show_script(slides_json_path, show_script_path)
+
+
 def calcular_duracoes_slides(show_script, duracao_total_audio):
     """
     Calcula a duração de cada slide baseado nos timestamps.
@@ -88,23 +127,15 @@ def calcular_duracoes_slides(show_script, duracao_total_audio):
     Returns:
         list: Lista de tuplas (slide_index, timestamp_inicio, duracao)
     """
-    duracoes = []
+    inicios = [evento["timestamp"] for evento in show_script]
 
-    for i, evento in enumerate(show_script):
-        timestamp_inicio = evento["timestamp"]
-        slide_index = evento["slide_index"]
+    # Cada slide dura até o início do próximo (o último, até o fim do áudio)
+    fins = inicios[1:] + [duracao_total_audio]
 
-        # Calcula duração até o próximo slide (ou até o fim do áudio)
-        if i + 1 < len(show_script):
-            timestamp_fim = show_script[i + 1]["timestamp"]
-        else:
-            timestamp_fim = duracao_total_audio
-
-        duracao = timestamp_fim - timestamp_inicio
-
-        duracoes.append((slide_index, timestamp_inicio, duracao))
-
-    return duracoes
+    return [
+        (evento["slide_index"], inicio, fim - inicio)
+        for evento, inicio, fim in zip(show_script, inicios, fins)
+    ]
 
 
 def validar_show_script(show_script):
@@ -130,55 +161,58 @@ def validar_show_script(show_script):
         erros.append("Script de apresentação está vazio")
         return False, erros
 
-    # CORREÇÃO 1: Remover eventos com timestamp 0.0 inválidos (exceto o primeiro)
+    # CORREÇÕES 1 e 2 em uma única passada: remove eventos com timestamp 0.0
+    # inválidos (exceto o primeiro) e conta os que estão fora de ordem
     eventos_validos = []
+    num_desordenados = 0
+    timestamp_anterior = None
     for i, evento in enumerate(show_script):
         timestamp = evento.get("timestamp", 0.0)
         # Mantém primeiro evento mesmo com 0.0, remove outros com 0.0
-        if i == 0 or timestamp > 0.0:
-            eventos_validos.append(evento)
-        else:
+        if i > 0 and timestamp <= 0.0:
             print(f"  Aviso: Removendo evento {i} com timestamp inválido (0.0)")
+            continue
 
-    show_script[:] = eventos_validos
+        if timestamp_anterior is not None and timestamp < timestamp_anterior:
+            num_desordenados += 1
+
+        eventos_validos.append(evento)
+        timestamp_anterior = timestamp
 
-    # CORREÇÃO 2: Ordenar eventos por timestamp
-    eventos_desordenados = []
-    for i in range(1, len(show_script)):
-        if show_script[i]["timestamp"] < show_script[i-1]["timestamp"]:
-            eventos_desordenados.append(i)
+    show_script[:] = eventos_validos
 
-    if eventos_desordenados:
-        print(f"  Aviso: Corrigindo {len(eventos_desordenados)} evento(s) fora de ordem")
-        show_script.sort(key=lambda x: x["timestamp"])
+    # Só ordena (e renumera) quando algum evento está de fato fora de ordem
+    if num_desordenados:
+        print(f"  Aviso: Corrigindo {num_desordenados} evento(s) fora de ordem")
+        show_script.sort(key=itemgetter("timestamp"))
         # Recalcular slide_index após ordenação
         for i, evento in enumerate(show_script):
             evento["slide_index"] = i
 
-    # Verifica ordem dos timestamps (após correção)
+    # Verifica ordem dos timestamps (após correção) e estrutura dos eventos
+    # na mesma passada; erros de estrutura continuam listados depois
+    erros_estrutura = []
     timestamps_anteriores = -1
     for i, evento in enumerate(show_script):
         timestamp = evento.get("timestamp")
 
         if timestamp is None:
             erros.append(f"Evento {i} não tem timestamp")
-            continue
-
-        if timestamp < timestamps_anteriores:
-            erros.append(f"Evento {i}: timestamp {timestamp} ainda está fora de ordem")
-
-        timestamps_anteriores = timestamp
+        else:
+            if timestamp < timestamps_anteriores:
+                erros.append(f"Evento {i}: timestamp {timestamp} ainda está fora de ordem")
+            timestamps_anteriores = timestamp
 
-    # Verifica estrutura dos eventos
-    for i, evento in enumerate(show_script):
         if "action" not in evento:
-            erros.append(f"Evento {i} não tem campo 'action'")
+            erros_estrutura.append(f"Evento {i} não tem campo 'action'")
 
         if "slide_index" not in evento:
-            erros.append(f"Evento {i} não tem campo 'slide_index'")
+            erros_estrutura.append(f"Evento {i} não tem campo 'slide_index'")
 
-        if evento.get("action") != "SHOW_SLIDE":
-            erros.append(f"Evento {i}: action desconhecida '{evento.get('action')}'")
+        if evento.get("action") != ACAO_SHOW_SLIDE:
+            erros_estrutura.append(f"Evento {i}: action desconhecida '{evento.get('action')}'")
+
+    erros.extend(erros_estrutura)
 
     valido = len(erros) == 0
 
@@ -197,24 +231,26 @@ def exibir_preview_show_script(show_script, duracao_audio=None):
     print("PREVIEW DO SCRIPT DE APRESENTAÇÃO")
     print("=" * 70)
 
+    # Colunas extraídas uma única vez; com duração do áudio, timestamp e
+    # slide_index já vêm de calcular_duracoes_slides, sem reler cada evento
+    titulos = [evento.get("metadata", {}).get("titulo", "N/A") for evento in show_script]
     if duracao_audio:
-        duracoes = calcular_duracoes_slides(show_script, duracao_audio)
+        linhas_eventos = calcular_duracoes_slides(show_script, duracao_audio)
     else:
-        duracoes = None
+        linhas_eventos = [(evento["slide_index"], evento["timestamp"], None) for evento in show_script]
 
-    for i, evento in enumerate(show_script):
-        timestamp = evento["timestamp"]
-        slide_index = evento["slide_index"]
-        titulo = evento.get("metadata", {}).get("titulo", "N/A")
-
-        print(f"\n[Evento {i+1}] SHOW_SLIDE")
-        print(f"  Timestamp: {timestamp:.2f}s")
-        print(f"  Slide: #{slide_index}")
-        print(f"  Título: {titulo}")
-
-        if duracoes:
-            _, _, duracao = duracoes[i]
-            print(f"  Duração: {duracao:.2f}s")
+    linhas = []  # Impressas de uma vez, não quatro prints por evento
+    for i, ((slide_index, timestamp, duracao), titulo) in enumerate(zip(linhas_eventos, titulos), 1):
+        linhas.append(f"\n[Evento {i}] {ACAO_SHOW_SLIDE}")
+        linhas.append(f"  Timestamp: {timestamp:.2f}s")
+        linhas.append(f"  Slide: #{slide_index}")
+        linhas.append(f"  Título: {titulo}")
+
+        if duracao is not None:
+            linhas.append(f"  Duração: {duracao:.2f}s")
+
+    if linhas:
+        print("\n".join(linhas))
 
     print("\n" + "=" * 70)
     print(f"Total de eventos: {len(show_script)}")
@@ -3,19 +3,35 @@ Módulo para enriquecimento e refinamento de conteúdo dos slides.
 Melhora a clareza, redação e estrutura dos bullets usando o texto original.
 """
 
-import json
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from src.prompts import SLIDE_ENRICH_AND_REFINE_PROMPT
+from src.cache import calcular_hash_texto, ler_cache, salvar_cache
+from src.json_utils import ler_json_texto, json_para_texto
+from src.transcription import completar_chat_em_stream
 
 
-def enriquecer_conteudo_slide(client, slide):
+MODELO_ENRIQUECIMENTO = "gpt-4o"
+TEMPERATURA_ENRIQUECIMENTO = 0.3
+
+# Montados uma única vez, não a cada slide
+_MENSAGEM_SISTEMA_ENRIQUECIMENTO = {"role": "system", "content": SLIDE_ENRICH_AND_REFINE_PROMPT}
+# A chave do cache inclui o prompt: editar o prompt invalida as entradas
+_EXTRA_CACHE_ENRIQUECIMENTO = (
+    f"{MODELO_ENRIQUECIMENTO}|{TEMPERATURA_ENRIQUECIMENTO}|{SLIDE_ENRICH_AND_REFINE_PROMPT}"
+)
+
+
+def enriquecer_conteudo_slide(client, slide, usar_cache=True):
     """
     Enriquece e refina o conteúdo de um único slide.
     Melhora a redação, clareza e estrutura usando o texto original do chunk.
+    Respostas do LLM são guardadas no cache em disco.
 
     Args:
         client (OpenAI): Cliente OpenAI configurado
         slide (dict): Slide com texto_original_chunk, slide_title e slide_bullets
+        usar_cache (bool): Se True, consulta e alimenta o cache
 
     Returns:
         dict: Slide com conteúdo refinado e enriquecido
@@ -35,64 +51,82 @@ def enriquecer_conteudo_slide(client, slide):
         "slide_bullets_iniciais": bullets_iniciais
     }
 
-    # Envia para GPT-4o
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": SLIDE_ENRICH_AND_REFINE_PROMPT},
-            {"role": "user", "content": json.dumps(dados_para_refinar, ensure_ascii=False)}
-        ],
-        temperature=0.3,
-        response_format={"type": "json_object"}
-    )
+    mensagem_usuario = json_para_texto(dados_para_refinar)
+
+    chave = None
+    resultado = None
+    if usar_cache:
+        chave = calcular_hash_texto(mensagem_usuario, _EXTRA_CACHE_ENRIQUECIMENTO)
+        resultado = ler_cache(chave, "enriquecimento")
+
+    if resultado is None:
+        # Envia para GPT-4o
+        conteudo = completar_chat_em_stream(
+            client,
+            model=MODELO_ENRIQUECIMENTO,
+            messages=[
+                _MENSAGEM_SISTEMA_ENRIQUECIMENTO,
+                {"role": "user", "content": mensagem_usuario}
+            ],
+            temperature=TEMPERATURA_ENRIQUECIMENTO,
+            response_format={"type": "json_object"}
+        )
 
-    # Parse da resposta
-    resultado = json.loads(response.choices[0].message.content)
+        # Parse da resposta
+        resultado = ler_json_texto(conteudo)
 
-    # Cria slide refinado com conteúdo enriquecido
-    slide_refinado = slide.copy()
-    slide_refinado["slide_title"] = resultado.get("slide_title", titulo_inicial)
-    slide_refinado["slide_bullets"] = resultado.get("slide_bullets", bullets_iniciais)
-    slide_refinado["frase_introdutoria"] = resultado.get("frase_introdutoria", "")
+        if chave:
+            salvar_cache(chave, "enriquecimento", resultado)
 
-    return slide_refinado
+    # Cria slide refinado com conteúdo enriquecido
+    return {
+        **slide,
+        "slide_title": resultado.get("slide_title", titulo_inicial),
+        "slide_bullets": resultado.get("slide_bullets", bullets_iniciais),
+        "frase_introdutoria": resultado.get("frase_introdutoria", ""),
+    }
 
 
-def enriquecer_todos_slides(client, slides):
+def enriquecer_todos_slides(client, slides, max_simultaneas=8, usar_cache=True):
     """
-    Enriquece o conteúdo de todos os slides.
+    Enriquece o conteúdo de todos os slides, com as requisições ao LLM
+    em voo simultaneamente (no máximo max_simultaneas por vez).
 
     Args:
-        client (OpenAI): Cliente OpenAI configurado
+        client (OpenAI): Cliente OpenAI configurado (pool de conexões compartilhado)
         slides (list): Lista de slides gerados
+        max_simultaneas (int): Limite de requisições simultâneas
+        usar_cache (bool): Se True, consulta e alimenta o cache
 
     Returns:
-        list: Lista de slides com conteúdo enriquecido
+        list: Lista de slides com conteúdo enriquecido, na mesma ordem
     """
     print("\n[ENRIQUECIMENTO DE CONTEÚDO] Refinando slides...")
 
     slides_enriquecidos = []
     total_slides = len(slides)
 
-    for i, slide in enumerate(slides, 1):
-        tipo = slide.get("tipo", "")
-        titulo = slide.get("slide_title", "")[:50]
+    if slides:
+        with ThreadPoolExecutor(max_workers=min(total_slides, max_simultaneas)) as executor:
+            resultados = executor.map(lambda slide: enriquecer_conteudo_slide(client, slide, usar_cache), slides)
 
-        print(f"  Refinando slide {i}/{total_slides}: {tipo} - {titulo}...", end="")
+            # map() devolve na ordem de entrada: o progresso sai na ordem dos slides
+            linhas_log = []  # Impressas de uma vez ao final, não uma por slide
+            for i, (slide, slide_enriquecido) in enumerate(zip(slides, resultados), 1):
+                tipo = slide.get("tipo", "")
+                titulo = slide.get("slide_title", "")[:50]
+                slides_enriquecidos.append(slide_enriquecido)
 
-        slide_enriquecido = enriquecer_conteudo_slide(client, slide)
-        slides_enriquecidos.append(slide_enriquecido)
+                # Verifica se houve mudanças significativas
+                teve_mudanca = (
+                    slide_enriquecido["slide_title"] != slide["slide_title"] or
+                    slide_enriquecido.get("frase_introdutoria", "") != ""
+                )
 
-        # Verifica se houve mudanças significativas
-        teve_mudanca = (
-            slide_enriquecido["slide_title"] != slide["slide_title"] or
-            slide_enriquecido.get("frase_introdutoria", "") != ""
-        )
+                status = "OK (refinado)" if teve_mudanca else "OK"
+                linhas_log.append(f"  Refinando slide {i}/{total_slides}: {tipo} - {titulo}... {status}")
 
-        if teve_mudanca:
-            print(" OK (refinado)")
-        else:
-            print(" OK")
+            print("\n".join(linhas_log))
 
     print(f"\nOK {len(slides_enriquecidos)} slides refinados")
 
@@ -110,11 +144,9 @@ def limpar_metadados_enriquecimento(slides):
     Returns:
         list: Slides sem metadados de enriquecimento
     """
-    slides_limpos = []
-    for slide in slides:
-        slide_limpo = slide.copy()
-        # Remove texto original (não necessário no output final)
-        if "texto_original_chunk" in slide_limpo:
-            del slide_limpo["texto_original_chunk"]
-        slides_limpos.append(slide_limpo)
-    return slides_limpos
+    # Cada slide é reconstruído uma única vez, já sem o texto original
+    # (não necessário no output final), em vez de copy() seguido de del
+    return [
+        {chave: valor for chave, valor in slide.items() if chave != "texto_original_chunk"}
+        for slide in slides
+    ]
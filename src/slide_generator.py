@@ -2,111 +2,323 @@
 Módulo para geração de slides a partir de chunks de transcrição.
 """
 
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from openai import OpenAI
-from src.prompts import SLIDE_INTRO_PROMPT, SLIDE_CONCEITO_PROMPT, SLIDE_EXEMPLO_PROMPT
+from src.prompts import SLIDE_PROMPTS_POR_TIPO
+from src.cache import calcular_hash_texto, ler_cache, salvar_cache
+from src.json_utils import ler_json_texto, json_para_texto, salvar_json
+from src.transcription import completar_chat_em_stream
 
 
-def gerar_slide_para_chunk(client, chunk):
+MODELO_SLIDES = "gpt-4o"
+TEMPERATURA_SLIDES = 0.4
+
+# Montados uma única vez por tipo, não a cada chunk
+_MENSAGEM_USUARIO_SLIDE = "Segmento de transcrição:\n\n{}".format
+_MENSAGEM_SISTEMA_POR_TIPO = {
+    tipo: {"role": "system", "content": prompt}
+    for tipo, prompt in SLIDE_PROMPTS_POR_TIPO.items()
+}
+# A chave do cache inclui o prompt: editar um prompt invalida suas entradas
+_EXTRA_CACHE_POR_TIPO = {
+    tipo: f"{MODELO_SLIDES}|{TEMPERATURA_SLIDES}|{prompt}"
+    for tipo, prompt in SLIDE_PROMPTS_POR_TIPO.items()
+}
+
+
+def _preparar_requisicao_slide(chunk):
     """
-    Gera um slide (título + bullets) para um chunk de texto.
-    Usa prompts específicos baseados no tipo do chunk.
+    Valida o tipo do chunk e monta a mensagem do usuário.
 
     Args:
-        client (OpenAI): Cliente OpenAI configurado
         chunk (dict): Chunk com texto e metadados
 
     Returns:
-        dict: Slide gerado com título e bullets, ou None se despedida
+        tuple: (tipo, mensagem_usuario), ou None se o chunk não gera slide
     """
     tipo = chunk["tipo"]
-    texto = chunk["texto"]
 
     # Despedida não gera slide
     if tipo == "despedida":
         return None
 
-    # Seleciona o prompt apropriado baseado no tipo
-    prompt_map = {
-        "introducao": SLIDE_INTRO_PROMPT,
-        "conceito": SLIDE_CONCEITO_PROMPT,
-        "exemplo": SLIDE_EXEMPLO_PROMPT
-    }
-
-    prompt = prompt_map.get(tipo)
-    if not prompt:
+    # Só tipos com prompt próprio geram slide
+    if tipo not in _MENSAGEM_SISTEMA_POR_TIPO:
         print(f"\n  Aviso: Tipo desconhecido '{tipo}', ignorando...")
         return None
 
-    # Envia para GPT
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": f"Segmento de transcrição:\n\n{texto}"}
+    return tipo, _MENSAGEM_USUARIO_SLIDE(chunk["texto"])
+
+
+def _chave_cache_slide(tipo, mensagem_usuario):
+    return calcular_hash_texto(mensagem_usuario, _EXTRA_CACHE_POR_TIPO[tipo])
+
+
+def _corpo_requisicao_slide(tipo, mensagem_usuario):
+    """
+    Parâmetros de chat.completions para gerar um slide (mesmos na chamada
+    direta e no Batch API).
+    """
+    return {
+        "model": MODELO_SLIDES,
+        "messages": [
+            _MENSAGEM_SISTEMA_POR_TIPO[tipo],
+            {"role": "user", "content": mensagem_usuario}
         ],
-        temperature=0.4,
-        response_format={"type": "json_object"}
-    )
+        "temperature": TEMPERATURA_SLIDES,
+        "response_format": {"type": "json_object"}
+    }
 
-    # Parse da resposta
-    slide_content = json.loads(response.choices[0].message.content)
 
+def _montar_slide(chunk, slide_content):
     # Monta o slide completo com metadados + limites do chunk original
-    slide = {
+    return {
         "timestamp_inicio": chunk["timestamp_inicio"],
-        "tipo": tipo,
+        "tipo": chunk["tipo"],
         "titulo_conceito": chunk.get("titulo_conceito"),
         "slide_title": slide_content["slide_title"],  # Mantido para referência (não é exibido no Layout 1)
         "slide_bullets": slide_content["slide_bullets"],
-        "texto_original_chunk": texto,  # Adicionado: texto original para enriquecimento
+        "texto_original_chunk": chunk["texto"],  # Adicionado: texto original para enriquecimento
         "chunk_palavra_inicio": chunk["palavra_inicio"],
         "chunk_palavra_fim": chunk["palavra_fim"]
     }
 
-    return slide
-
 
-def gerar_slides(client, chunks_com_texto):
+def gerar_slide_para_chunk(client, chunk, usar_cache=True):
     """
-    Gera slides para todos os chunks.
+    Gera um slide (título + bullets) para um chunk de texto.
+    Usa prompts específicos baseados no tipo do chunk.
+    Respostas do LLM são guardadas no cache em disco.
 
     Args:
         client (OpenAI): Cliente OpenAI configurado
-        chunks_com_texto (list): Lista de chunks com texto
+        chunk (dict): Chunk com texto e metadados
+        usar_cache (bool): Se True, consulta e alimenta o cache
 
     Returns:
-        list: Lista de slides gerados
+        dict: Slide gerado com título e bullets, ou None se despedida
     """
-    print("\nGerando slides a partir dos chunks...")
+    requisicao = _preparar_requisicao_slide(chunk)
+    if requisicao is None:
+        return None
+
+    tipo, mensagem_usuario = requisicao
+
+    chave = None
+    slide_content = None
+    if usar_cache:
+        chave = _chave_cache_slide(tipo, mensagem_usuario)
+        slide_content = ler_cache(chave, "slide")
+
+    if slide_content is None:
+        # Envia para GPT
+        conteudo = completar_chat_em_stream(client, **_corpo_requisicao_slide(tipo, mensagem_usuario))
+
+        # Parse da resposta
+        slide_content = ler_json_texto(conteudo)
+
+        if chave:
+            salvar_cache(chave, "slide", slide_content)
+
+    return _montar_slide(chunk, slide_content)
 
+
+def _listar_slides_gerados(chunks_com_texto, resultados):
+    """
+    Reúne os slides na ordem dos chunks e imprime o progresso de cada um.
+
+    Args:
+        chunks_com_texto (list): Lista de chunks com texto
+        resultados (dict): Slide gerado (ou None) por posição do chunk (1-based)
+
+    Returns:
+        list: Lista de slides gerados, na ordem dos chunks
+    """
     slides = []
     total_chunks = len(chunks_com_texto)
 
+    linhas_log = []  # Impressas de uma vez ao final, não uma por chunk
     for i, chunk in enumerate(chunks_com_texto, 1):
         tipo = chunk['tipo']
         titulo = chunk.get('titulo_conceito', 'N/A')
 
         if tipo == "despedida":
-            print(f"  Processando chunk {i}/{total_chunks}: {tipo} (ignorado)")
+            linhas_log.append(f"  Processando chunk {i}/{total_chunks}: {tipo} (ignorado)")
             continue
 
-        print(f"  Processando chunk {i}/{total_chunks}: {tipo} - {titulo}", end="")
-
-        slide = gerar_slide_para_chunk(client, chunk)
+        slide = resultados.get(i)
 
         if slide:
             slides.append(slide)
-            print(f" OK")
+            linhas_log.append(f"  Processando chunk {i}/{total_chunks}: {tipo} - {titulo} OK")
         else:
-            print(f" (erro)")
+            linhas_log.append(f"  Processando chunk {i}/{total_chunks}: {tipo} - {titulo} (erro)")
+
+    if linhas_log:
+        print("\n".join(linhas_log))
 
     print(f"\nOK {len(slides)} slides gerados")
 
     return slides
 
 
+def _gerar_slides_em_paralelo(client, pendentes, max_simultaneas, usar_cache):
+    """
+    Gera os slides dos chunks pendentes pela chamada direta, com no máximo
+    max_simultaneas requisições ao LLM em voo por vez.
+
+    Args:
+        client (OpenAI): Cliente OpenAI configurado
+        pendentes (list): Lista de (posição, chunk)
+        max_simultaneas (int): Limite de requisições simultâneas
+        usar_cache (bool): Se True, consulta e alimenta o cache
+
+    Returns:
+        dict: {posição: slide}
+    """
+    if not pendentes:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(pendentes), max_simultaneas)) as executor:
+        gerados = executor.map(lambda item: gerar_slide_para_chunk(client, item[1], usar_cache), pendentes)
+        return {i: slide for (i, _), slide in zip(pendentes, gerados)}
+
+
+def gerar_slides(client, chunks_com_texto, max_simultaneas=8, usar_cache=True):
+    """
+    Gera slides para todos os chunks, com as requisições ao LLM em voo
+    simultaneamente (no máximo max_simultaneas por vez).
+
+    Args:
+        client (OpenAI): Cliente OpenAI configurado (pool de conexões compartilhado)
+        chunks_com_texto (list): Lista de chunks com texto
+        max_simultaneas (int): Limite de requisições simultâneas
+        usar_cache (bool): Se True, consulta e alimenta o cache
+
+    Returns:
+        list: Lista de slides gerados, na ordem dos chunks
+    """
+    print("\nGerando slides a partir dos chunks...")
+
+    # Despedida não gera slide: nem chega a ser enviada ao executor
+    pendentes = [
+        (i, chunk) for i, chunk in enumerate(chunks_com_texto, 1)
+        if chunk['tipo'] != "despedida"
+    ]
+
+    resultados = _gerar_slides_em_paralelo(client, pendentes, max_simultaneas, usar_cache)
+
+    return _listar_slides_gerados(chunks_com_texto, resultados)
+
+
+def gerar_slides_batch(client, chunks_com_texto, usar_cache=True, intervalo_consulta=30, max_simultaneas=8):
+    """
+    Gera slides para todos os chunks pelo Batch API da OpenAI: as requisições
+    vão em um único arquivo JSONL, com custo reduzido e sem disputar o limite
+    de requisições por minuto, em troca de uma espera de minutos a horas.
+    Chunks já presentes no cache não são enviados. Se o lote não for concluído,
+    os slides que faltarem são gerados pela chamada direta, em paralelo como
+    em gerar_slides.
+
+    Args:
+        client (OpenAI): Cliente OpenAI configurado
+        chunks_com_texto (list): Lista de chunks com texto
+        usar_cache (bool): Se True, consulta e alimenta o cache
+        intervalo_consulta (float): Segundos entre consultas ao status do lote
+        max_simultaneas (int): Limite de requisições simultâneas da chamada direta
+
+    Returns:
+        list: Lista de slides gerados, na ordem dos chunks
+    """
+    print("\nGerando slides a partir dos chunks (Batch API)...")
+
+    resultados = {}
+    requisicoes = {}  # custom_id -> (posição, chunk, chave do cache)
+    linhas_jsonl = []
+
+    for i, chunk in enumerate(chunks_com_texto, 1):
+        requisicao = _preparar_requisicao_slide(chunk)
+        if requisicao is None:
+            continue
+
+        tipo, mensagem_usuario = requisicao
+        chave = _chave_cache_slide(tipo, mensagem_usuario) if usar_cache else None
+        if chave:
+            slide_content = ler_cache(chave, "slide")
+            if slide_content is not None:
+                resultados[i] = _montar_slide(chunk, slide_content)
+                continue
+
+        custom_id = str(i)
+        requisicoes[custom_id] = (i, chunk, chave)
+        linhas_jsonl.append(json_para_texto({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _corpo_requisicao_slide(tipo, mensagem_usuario)
+        }))
+
+    if linhas_jsonl:
+        print(f"  Enviando lote com {len(linhas_jsonl)} requisições ({len(resultados)} do cache)...")
+        arquivo = client.files.create(
+            file=("batch_slides.jsonl", ("\n".join(linhas_jsonl) + "\n").encode("utf-8")),
+            purpose="batch"
+        )
+        lote = client.batches.create(
+            input_file_id=arquivo.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"  Lote criado: {lote.id}")
+
+        while lote.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(intervalo_consulta)
+            lote = client.batches.retrieve(lote.id)
+            contagem = lote.request_counts
+            if contagem is not None:
+                print(f"  Status do lote: {lote.status} ({contagem.completed}/{contagem.total})")
+
+        respostas_invalidas = 0
+        if lote.output_file_id:
+            for linha in client.files.content(lote.output_file_id).text.splitlines():
+                if not linha.strip():
+                    continue
+                item = ler_json_texto(linha)
+                custom_id = item.get("custom_id")
+                resposta = item.get("response") or {}
+                if custom_id not in requisicoes:
+                    continue
+                if resposta.get("status_code") != 200:
+                    respostas_invalidas += 1
+                    continue
+
+                i, chunk, chave = requisicoes.pop(custom_id)
+                try:
+                    slide_content = ler_json_texto(resposta["body"]["choices"][0]["message"]["content"])
+                except (KeyError, IndexError, ValueError):
+                    # Recoloca para ser gerado pela chamada direta abaixo
+                    requisicoes[custom_id] = (i, chunk, chave)
+                    respostas_invalidas += 1
+                    continue
+
+                if chave:
+                    salvar_cache(chave, "slide", slide_content)
+                resultados[i] = _montar_slide(chunk, slide_content)
+
+        if requisicoes:
+            # Falhas contadas pelo lote (arquivo de erros) e respostas sem slide utilizável
+            contagem = lote.request_counts
+            falhas_lote = contagem.failed if contagem is not None else 0
+            print(f"  Aviso: lote terminou com status '{lote.status}': {len(requisicoes)} de "
+                  f"{len(linhas_jsonl)} requisição(ões) sem slide ({falhas_lote} com falha no lote, "
+                  f"{respostas_invalidas} com resposta inválida); gerando-os diretamente...")
+            restantes = [(i, chunk) for i, chunk, _ in requisicoes.values()]
+            resultados.update(_gerar_slides_em_paralelo(client, restantes, max_simultaneas, usar_cache))
+
+    return _listar_slides_gerados(chunks_com_texto, resultados)
+
+
 def salvar_slides(slides, json_transcricao_path, output_dir=None):
     """
     Salva os slides em um arquivo JSON.
@@ -141,8 +353,7 @@ def salvar_slides(slides, json_transcricao_path, output_dir=None):
     }
 
     # Salva o arquivo
-    with open(slides_path, 'w', encoding='utf-8') as f:
-        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    salvar_json(slides_path, resultado)
 
     print(f"\nOK Slides salvos em: {slides_path}")
 
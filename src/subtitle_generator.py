@@ -2,9 +2,33 @@
 Módulo para gerar legendas sincronizadas a partir da transcrição Whisper.
 """
 
-import json
+from functools import lru_cache
 from pathlib import Path
 
+from src.json_utils import carregar_json
+
+
+@lru_cache(maxsize=4)
+def _carregar_palavras_em_cache(caminho, mtime_ns, tamanho):
+    # mtime e tamanho fazem parte da chave: se o arquivo mudar, é relido
+    return tuple(carregar_json(caminho).get("palavras", []))
+
+
+def _carregar_palavras(transcricao_json_path):
+    """
+    Lê as palavras de um JSON de transcrição. O resultado é compartilhado entre
+    chamadas (gerar_legendas_srt e criar_legendas_para_moviepy no mesmo job
+    fazem o parse uma única vez) enquanto o arquivo não for alterado.
+
+    Args:
+        transcricao_json_path (Path): Caminho para o JSON de transcrição
+
+    Returns:
+        tuple: Palavras com timestamps (não devem ser modificadas)
+    """
+    info = transcricao_json_path.stat()
+    return _carregar_palavras_em_cache(str(transcricao_json_path.resolve()), info.st_mtime_ns, info.st_size)
+
 
 def gerar_legendas_srt(transcricao_json_path, output_path=None, max_palavras_por_legenda=10):
     """
@@ -26,10 +50,7 @@ def gerar_legendas_srt(transcricao_json_path, output_path=None, max_palavras_por
     print(f"Gerando legendas a partir de {transcricao_json_path.name}...")
 
     # Carregar transcrição
-    with open(transcricao_json_path, 'r', encoding='utf-8') as f:
-        dados = json.load(f)
-
-    palavras = dados.get("palavras", [])
+    palavras = _carregar_palavras(transcricao_json_path)
 
     if not palavras:
         raise ValueError("Nenhuma palavra encontrada no arquivo de transcrição")
@@ -55,7 +76,7 @@ def gerar_legendas_srt(transcricao_json_path, output_path=None, max_palavras_por
     return conteudo_srt
 
 
-def agrupar_palavras_em_legendas(palavras, max_palavras=10, max_duracao=5.0):
+def agrupar_palavras_em_legendas(palavras, max_palavras=10, max_duracao=5.0, como_tuplas=False):
     """
     Agrupa palavras em legendas com número limitado de palavras e duração.
 
@@ -63,54 +84,60 @@ def agrupar_palavras_em_legendas(palavras, max_palavras=10, max_duracao=5.0):
         palavras (list): Lista de palavras com timestamps
         max_palavras (int): Máximo de palavras por legenda
         max_duracao (float): Duração máxima de uma legenda em segundos
+        como_tuplas (bool): Se True, devolve tuplas (inicio, fim, texto) em vez
+            de dicts (formato do moviepy, sem representação intermediária)
 
     Returns:
-        list: Lista de legendas {texto, inicio, fim}
+        list: Lista de legendas {texto, inicio, fim} ou de tuplas (inicio, fim, texto)
     """
     legendas = []
-    grupo_atual = []
-    timestamp_inicio_grupo = None
+    textos = [palavra["palavra"] for palavra in palavras]
+    total = len(palavras)
 
-    for palavra in palavras:
-        texto = palavra["palavra"]
-        inicio = palavra["inicio"]
-        fim = palavra["fim"]
+    # Cada grupo é só um intervalo [inicio_idx, i] da lista: o texto é montado
+    # com um único join por legenda, sem lista temporária palavra a palavra
+    inicio_idx = 0
+    timestamp_inicio_grupo = None
 
+    for i, palavra in enumerate(palavras):
         # Inicia novo grupo se necessário
-        if not grupo_atual:
-            timestamp_inicio_grupo = inicio
+        if timestamp_inicio_grupo is None:
+            timestamp_inicio_grupo = palavra["inicio"]
 
-        grupo_atual.append(texto)
-        timestamp_fim_grupo = fim
+        timestamp_fim_grupo = palavra["fim"]
 
         # Verifica se deve finalizar o grupo
-        duracao_grupo = timestamp_fim_grupo - timestamp_inicio_grupo
         deve_finalizar = (
-            len(grupo_atual) >= max_palavras or
-            duracao_grupo >= max_duracao
+            i - inicio_idx + 1 >= max_palavras or
+            timestamp_fim_grupo - timestamp_inicio_grupo >= max_duracao
         )
 
         if deve_finalizar:
-            # Cria legenda
-            legenda = {
-                "texto": " ".join(grupo_atual),
-                "inicio": timestamp_inicio_grupo,
-                "fim": timestamp_fim_grupo
-            }
-            legendas.append(legenda)
+            texto = " ".join(textos[inicio_idx:i + 1])
+            if como_tuplas:
+                legendas.append((timestamp_inicio_grupo, timestamp_fim_grupo, texto))
+            else:
+                legendas.append({
+                    "texto": texto,
+                    "inicio": timestamp_inicio_grupo,
+                    "fim": timestamp_fim_grupo
+                })
 
             # Reseta grupo
-            grupo_atual = []
+            inicio_idx = i + 1
             timestamp_inicio_grupo = None
 
     # Adiciona último grupo se houver
-    if grupo_atual:
-        legenda = {
-            "texto": " ".join(grupo_atual),
-            "inicio": timestamp_inicio_grupo,
-            "fim": timestamp_fim_grupo
-        }
-        legendas.append(legenda)
+    if inicio_idx < total:
+        texto = " ".join(textos[inicio_idx:])
+        if como_tuplas:
+            legendas.append((timestamp_inicio_grupo, palavras[-1]["fim"], texto))
+        else:
+            legendas.append({
+                "texto": texto,
+                "inicio": timestamp_inicio_grupo,
+                "fim": palavras[-1]["fim"]
+            })
 
     return legendas
 
@@ -134,24 +161,13 @@ def gerar_conteudo_srt(legendas):
     Returns:
         str: Conteúdo do arquivo SRT
     """
-    linhas = []
-
-    for i, legenda in enumerate(legendas, 1):
-        # Número da legenda
-        linhas.append(str(i))
-
-        # Timestamps
-        inicio_str = formatar_timestamp_srt(legenda["inicio"])
-        fim_str = formatar_timestamp_srt(legenda["fim"])
-        linhas.append(f"{inicio_str} --> {fim_str}")
-
-        # Texto
-        linhas.append(legenda["texto"])
-
-        # Linha em branco (separador)
-        linhas.append("")
-
-    return "\n".join(linhas)
+    # Um bloco por legenda (número, timestamps, texto), separados por linha em branco
+    return "\n".join(
+        f"{i}\n"
+        f"{formatar_timestamp_srt(legenda['inicio'])} --> {formatar_timestamp_srt(legenda['fim'])}\n"
+        f"{legenda['texto']}\n"
+        for i, legenda in enumerate(legendas, 1)
+    )
 
 
 def formatar_timestamp_srt(segundos):
@@ -164,10 +180,12 @@ def formatar_timestamp_srt(segundos):
     Returns:
         str: Timestamp formatado (ex: "00:01:23,450")
     """
-    horas = int(segundos // 3600)
-    minutos = int((segundos % 3600) // 60)
-    segs = int(segundos % 60)
-    milissegundos = int((segundos - int(segundos)) * 1000)
+    # Tudo em milissegundos inteiros: um único arredondamento evita que
+    # valores como 1.999999 virem "00:00:01,999" por truncamento de float
+    milissegundos = int(round(segundos * 1000))
+    horas, milissegundos = divmod(milissegundos, 3_600_000)
+    minutos, milissegundos = divmod(milissegundos, 60_000)
+    segs, milissegundos = divmod(milissegundos, 1000)
 
     return f"{horas:02d}:{minutos:02d}:{segs:02d},{milissegundos:03d}"
 
@@ -186,24 +204,13 @@ def criar_legendas_para_moviepy(transcricao_json_path, max_palavras_por_legenda=
     transcricao_json_path = Path(transcricao_json_path)
 
     # Carregar transcrição
-    with open(transcricao_json_path, 'r', encoding='utf-8') as f:
-        dados = json.load(f)
-
-    palavras = dados.get("palavras", [])
+    palavras = _carregar_palavras(transcricao_json_path)
 
     if not palavras:
         raise ValueError("Nenhuma palavra encontrada no arquivo de transcrição")
 
-    # Agrupar palavras em legendas
-    legendas = agrupar_palavras_em_legendas(palavras, max_palavras_por_legenda)
-
-    # Converter para formato moviepy: (inicio, fim, texto)
-    legendas_moviepy = [
-        (leg["inicio"], leg["fim"], leg["texto"])
-        for leg in legendas
-    ]
-
-    return legendas_moviepy
+    # Agrupar palavras já no formato moviepy: (inicio, fim, texto)
+    return agrupar_palavras_em_legendas(palavras, max_palavras_por_legenda, como_tuplas=True)
 
 
 def exibir_preview_legendas(legendas, max_preview=10):
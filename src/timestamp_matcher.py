@@ -3,13 +3,61 @@ Módulo para sincronização determinística de timestamps.
 Faz matching preciso entre conteúdo dos slides e timestamps das palavras.
 """
 
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
+from functools import lru_cache
+import heapq
+from operator import itemgetter
 import re
 
+try:
+    # RapidFuzz (C++): a similaridade de fuzz.ratio (Indel, via maior subsequência
+    # comum) não é a do difflib (Ratcliff/Obershelp), mas nunca é menor que ela;
+    # serve de pré-filtro rápido, e a pontuação final continua sendo a do difflib
+    from rapidfuzz.fuzz import ratio as _rapidfuzz_ratio
+    from rapidfuzz.fuzz import partial_ratio_alignment as _rapidfuzz_alinhamento_parcial
+    from rapidfuzz.process import extract_iter as _rapidfuzz_extract_iter
+except ImportError:
+    # Fallback: difflib (biblioteca padrão)
+    _rapidfuzz_ratio = None
+    _rapidfuzz_alinhamento_parcial = None
+    _rapidfuzz_extract_iter = None
 
+# Similaridade a partir da qual uma janela é considerada perfeita o bastante
+# para encerrar a busca (quando não há filtros de ordem temporal ou contexto)
+SIMILARIDADE_PARADA = 0.99
+
+# Folga (em pontos de 0 a 100) do corte do pré-filtro RapidFuzz abaixo do limiar
+FOLGA_PRE_FILTRO = 1e-6
+
+# Quantas ocorrências (as de maior similaridade) são separadas de início para a
+# validação de contexto; a ordenação completa só ocorre se todas falharem
+PROFUNDIDADE_CONTEXTO = 10
+
+_CHAVE_SIMILARIDADE = itemgetter(1)
+
+# Chave, no cache de janelas de um trecho, do texto completo desse trecho
+# (as demais chaves são os tamanhos das janelas)
+_CHAVE_TEXTO_AUDIO = "texto"
+
+# Métodos cujo resultado, obtido com um timestamp mínimo menor, continua válido
+# para um mínimo maior se o timestamp encontrado o respeitar (a ocorrência
+# escolhida segue sendo a melhor do subconjunto que resta após o filtro)
+_METODOS_MONOTONOS = frozenset({"primeiro_bullet", "titulo", "segundo_bullet"})
+
+# Campos usados só durante a sincronização, removidos antes do output final
+_CHAVES_INTERNAS_SINCRONIZACAO = frozenset({"sync_metadata", "chunk_palavra_inicio", "chunk_palavra_fim"})
+
+_PADRAO_PONTUACAO = re.compile(r'[^\w\s]')
+
+
+@lru_cache(maxsize=100_000)
 def normalizar_texto(texto):
     """
     Normaliza texto para comparação: lowercase, remove pontuação, espaços extras.
+    Memoizado: as mesmas palavras da transcrição são normalizadas uma única vez
+    ao sincronizar todos os slides.
 
     Args:
         texto (str): Texto a normalizar
@@ -18,23 +66,71 @@ def normalizar_texto(texto):
         str: Texto normalizado
     """
     texto = texto.lower()
-    texto = re.sub(r'[^\w\s]', '', texto)
-    texto = re.sub(r'\s+', ' ', texto)
-    return texto.strip()
+    # Caso mais comum (uma palavra da transcrição, sem pontuação): isalnum()
+    # aceita exatamente os caracteres de \w exceto "_", e nada teria a remover
+    if texto.isalnum():
+        return texto
+    # split() + join colapsa e apara os espaços numa única passada em C
+    return " ".join(_PADRAO_PONTUACAO.sub('', texto).split())
+
+
+def normalizar_palavras(palavras_com_timestamps):
+    """
+    Normaliza todas as palavras de um array com timestamps.
+
+    Args:
+        palavras_com_timestamps (list): Array de palavras com timestamps
+
+    Returns:
+        list: Palavras normalizadas, na mesma ordem do array
+    """
+    return [normalizar_texto(p["palavra"]) for p in palavras_com_timestamps]
+
 
+def extrair_inicios(palavras_com_timestamps):
+    """
+    Extrai a coluna de timestamps de início de um array de palavras, para
+    consultas repetidas sem acessar o dict de cada palavra.
+
+    Args:
+        palavras_com_timestamps (list): Array de palavras com timestamps
+
+    Returns:
+        list: Timestamps de início (float), na mesma ordem do array
+    """
+    return list(map(itemgetter("inicio"), palavras_com_timestamps))
+
+
+def _primeiro_indice_a_partir_de(inicios_audio, timestamp_minimo):
+    """
+    Busca binária pelo primeiro índice com início >= timestamp_minimo.
+    Os timestamps das palavras da transcrição são crescentes, então todos os
+    índices a partir dele respeitam a ordem temporal.
 
+    Args:
+        inicios_audio (list): Timestamps de início (ordem crescente)
+        timestamp_minimo (float): Timestamp mínimo aceitável
+
+    Returns:
+        int: Índice de corte (len(inicios_audio) se nenhum for válido)
+    """
+    return bisect_left(inicios_audio, timestamp_minimo)
+
+
+@lru_cache(maxsize=4096)
 def extrair_palavras_normalizadas(texto):
     """
-    Extrai lista de palavras normalizadas de um texto.
+    Extrai as palavras normalizadas de um texto. Memoizado: bullets e títulos
+    são buscados novamente a cada estratégia de sincronização.
 
     Args:
         texto (str): Texto completo
 
     Returns:
-        list: Lista de palavras normalizadas
+        tuple: Palavras normalizadas (imutável, compartilhada entre chamadas)
     """
-    texto_norm = normalizar_texto(texto)
-    return texto_norm.split()
+    # Mesmo resultado de normalizar_texto(texto).split(), sem o join intermediário
+    return tuple(_PADRAO_PONTUACAO.sub('', texto.lower()).split())
 
 
 def calcular_similaridade(texto1, texto2):
@@ -51,7 +147,71 @@ def calcular_similaridade(texto1, texto2):
     return SequenceMatcher(None, texto1, texto2).ratio()
 
 
-def verificar_conceito_no_contexto(indice, titulo_conceito, palavras_com_timestamps, janela_contexto=50):
+def _pontuar_janelas(busca_texto, janelas, threshold, similaridade_parada=None):
+    """
+    Compara o texto buscado com cada janela e mantém as que atingem o limiar.
+
+    Args:
+        busca_texto (str): Texto normalizado buscado
+        janelas (list): Textos das janelas, na ordem do áudio
+        threshold (float): Limiar de similaridade
+        similaridade_parada (float): Se informado, interrompe a varredura na
+            primeira janela com similaridade >= este valor
+
+    Returns:
+        list: Lista de tuplas (indice, similaridade), na ordem das janelas
+    """
+    ocorrencias = []
+
+    if _rapidfuzz_extract_iter is not None:
+        # Pré-filtro com todas as janelas em uma única chamada ao C++: uma janela
+        # abaixo do limiar no RapidFuzz também fica abaixo no difflib (a folga
+        # absorve arredondamentos), então só as que passam são pontuadas abaixo
+        candidatas = (
+            indice for _, _, indice in _rapidfuzz_extract_iter(
+                busca_texto, janelas, scorer=_rapidfuzz_ratio,
+                processor=None, score_cutoff=max(0.0, threshold * 100 - FOLGA_PRE_FILTRO)
+            )
+        )
+    else:
+        candidatas = range(len(janelas))
+
+    for indice in candidatas:
+        matcher = SequenceMatcher(None, janelas[indice], busca_texto)
+        # real_quick_ratio/quick_ratio são limites superiores baratos de ratio()
+        if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+            continue
+        similaridade = matcher.ratio()
+        if similaridade >= threshold:
+            ocorrencias.append((indice, similaridade))
+            if similaridade_parada is not None and similaridade >= similaridade_parada:
+                break
+    return ocorrencias
+
+
+@lru_cache(maxsize=256)
+def _preparar_conceito(titulo_conceito):
+    """
+    Normaliza o conceito e compila (uma vez por titulo_conceito) a regex que
+    encontra suas palavras em sequência, com até 2 palavras quaisquer entre
+    cada uma delas. Uma aula tem poucas dezenas de conceitos distintos, mas
+    centenas de validações de contexto.
+
+    Args:
+        titulo_conceito (str): Conceito esperado, como vem do slide
+
+    Returns:
+        tuple: (conceito normalizado, re.Pattern para buscar no texto do
+               contexto, com palavras separadas por espaço)
+    """
+    conceito_norm = normalizar_texto(titulo_conceito)
+    separador = r'(?: [^ ]*){0,2} '
+    corpo = separador.join(re.escape(palavra) for palavra in conceito_norm.split())
+    return conceito_norm, re.compile(r'(?:^| )' + corpo + r'(?= |$)')
+
+
+def verificar_conceito_no_contexto(indice, titulo_conceito, palavras_com_timestamps, janela_contexto=50,
+                                   palavras_audio_norm=None):
     """
     Verifica se o titulo_conceito aparece próximo ao índice encontrado.
     Verifica que as palavras do conceito aparecem em sequência (não separadas).
@@ -61,6 +221,7 @@ def verificar_conceito_no_contexto(indice, titulo_conceito, palavras_com_timesta
         titulo_conceito (str): Conceito esperado (ex: "romance realista", "conto")
         palavras_com_timestamps (list): Array de palavras com timestamps
         janela_contexto (int): Número de palavras antes e depois para verificar
+        palavras_audio_norm (list): Palavras do array já normalizadas (opcional)
 
     Returns:
         bool: True se o conceito aparece no contexto, False caso contrário
@@ -68,57 +229,118 @@ def verificar_conceito_no_contexto(indice, titulo_conceito, palavras_com_timesta
     if not titulo_conceito:
         return True  # Se não tem conceito específico, aceita qualquer contexto
 
-    # Normaliza o titulo_conceito
-    conceito_norm = normalizar_texto(titulo_conceito)
-    palavras_conceito = conceito_norm.split()
+    # Normaliza o titulo_conceito (palavras já separadas por um único espaço)
+    conceito_completo, padrao_proximo = _preparar_conceito(titulo_conceito)
 
     # Define janela de busca
     inicio_janela = max(0, indice - janela_contexto)
     fim_janela = min(len(palavras_com_timestamps), indice + janela_contexto)
 
     # Extrai texto do contexto
-    contexto_palavras = [normalizar_texto(palavras_com_timestamps[i]["palavra"])
-                         for i in range(inicio_janela, fim_janela)]
+    if palavras_audio_norm is not None:
+        contexto_palavras = palavras_audio_norm[inicio_janela:fim_janela]
+    else:
+        contexto_palavras = [normalizar_texto(palavras_com_timestamps[i]["palavra"])
+                             for i in range(inicio_janela, fim_janela)]
     contexto_texto = " ".join(contexto_palavras)
 
     # Verifica se o conceito completo aparece como sequência no contexto
-    conceito_completo = " ".join(palavras_conceito)
-
     # Busca com tolerância: aceita até 1 palavra extra entre as palavras do conceito
     if conceito_completo in contexto_texto:
         return True
 
     # Tenta matching com palavras do conceito próximas (máximo 2 palavras de distância)
-    for i in range(len(contexto_palavras)):
-        match_count = 0
-        j = i
-        for palavra_conceito in palavras_conceito:
-            # Procura a próxima palavra do conceito nas próximas 3 posições
-            encontrou = False
-            for k in range(j, min(j + 3, len(contexto_palavras))):
-                if contexto_palavras[k] == palavra_conceito:
-                    match_count += 1
-                    j = k + 1
-                    encontrou = True
-                    break
-            if not encontrou:
-                break
+    return padrao_proximo.search(contexto_texto) is not None
+
 
-        if match_count == len(palavras_conceito):
-            return True
+def _conceito_no_contexto_em_cache(indice, titulo_conceito, palavras_com_timestamps, palavras_audio_norm,
+                                   cache_contexto):
+    """
+    verificar_conceito_no_contexto com memoização por (indice, titulo_conceito).
+    O cache só é válido para um mesmo array de palavras (ex: o chunk de um slide).
+    """
+    if cache_contexto is None:
+        return verificar_conceito_no_contexto(indice, titulo_conceito, palavras_com_timestamps,
+                                              palavras_audio_norm=palavras_audio_norm)
 
-    return False
+    chave = (indice, titulo_conceito)
+    resultado = cache_contexto.get(chave)
+    if resultado is None:
+        resultado = verificar_conceito_no_contexto(indice, titulo_conceito, palavras_com_timestamps,
+                                                   palavras_audio_norm=palavras_audio_norm)
+        cache_contexto[chave] = resultado
+    return resultado
 
 
-def encontrar_todas_ocorrencias(conteudo, palavras_com_timestamps, min_palavras=3, threshold=0.8):
+def encontrar_ocorrencias_exatas(conteudo, palavras_audio_norm, min_palavras=3, cache_janelas=None):
     """
-    Encontra TODAS as ocorrências do conteúdo no array de palavras.
+    Encontra as janelas do array idênticas ao início do conteúdo normalizado,
+    com busca de substring (str.find, em C) no texto completo do áudio.
+
+    Args:
+        conteudo (str): Texto do conteúdo do slide
+        palavras_audio_norm (list): Palavras do array já normalizadas
+        min_palavras (int): Número de palavras comparadas (mesma regra de
+            encontrar_todas_ocorrencias)
+        cache_janelas (dict): Cache do mesmo array usado pelas janelas fuzzy;
+            guarda também o texto completo do áudio (opcional)
+
+    Returns:
+        list: Lista de tuplas (indice, 1.0), em ordem crescente de índice
+    """
+    palavras_busca = extrair_palavras_normalizadas(conteudo)
+    min_palavras = min(min_palavras, len(palavras_busca))
+    if min_palavras == 0:
+        return []
+
+    busca_texto = " ".join(palavras_busca[:min_palavras])
+    texto_audio = None if cache_janelas is None else cache_janelas.get(_CHAVE_TEXTO_AUDIO)
+    if texto_audio is None:
+        texto_audio = " ".join(palavras_audio_norm)
+        if cache_janelas is not None:
+            cache_janelas[_CHAVE_TEXTO_AUDIO] = texto_audio
+    tamanho_busca = len(busca_texto)
+    tamanho_audio = len(texto_audio)
+
+    ocorrencias = []
+    indice_palavra = 0
+    pos_anterior = 0
+    pos = texto_audio.find(busca_texto)
+    while pos != -1:
+        fim = pos + tamanho_busca
+        # Só conta se começar e terminar em fronteira de palavra
+        if (pos == 0 or texto_audio[pos - 1] == " ") and (fim == tamanho_audio or texto_audio[fim] == " "):
+            # Cada separador antes da posição corresponde a uma palavra anterior
+            indice_palavra += texto_audio.count(" ", pos_anterior, pos)
+            pos_anterior = pos
+            if " ".join(palavras_audio_norm[indice_palavra:indice_palavra + min_palavras]) == busca_texto:
+                ocorrencias.append((indice_palavra, 1.0))
+        pos = texto_audio.find(busca_texto, pos + 1)
+
+    return ocorrencias
+
+
+def encontrar_todas_ocorrencias(conteudo, palavras_com_timestamps, min_palavras=3, threshold=0.8,
+                                palavras_audio_norm=None, similaridade_parada=None, cache_janelas=None,
+                                ordenar=True):
+    """
+    Encontra TODAS as ocorrências do conteúdo no array de palavras
+    (ou só até a primeira quase perfeita, com similaridade_parada).
 
     Args:
         conteudo (str): Texto do conteúdo do slide
         palavras_com_timestamps (list): Array de palavras com timestamps
         min_palavras (int): Mínimo de palavras para considerar um match
         threshold (float): Limiar de similaridade
+        palavras_audio_norm (list): Palavras do array já normalizadas (opcional;
+            evita normalizar o mesmo array a cada busca)
+        similaridade_parada (float): Se informado, a varredura termina na primeira
+            janela com similaridade >= este valor (útil quando só a melhor
+            ocorrência interessa e não há filtros posteriores)
+        cache_janelas (dict): Janelas já montadas para este mesmo array, por
+            tamanho (opcional; compartilhado entre buscas e slides)
+        ordenar (bool): Se False, devolve as ocorrências na ordem do áudio, para
+            quem só precisa das melhores (ver _selecionar_ocorrencia)
 
     Returns:
         list: Lista de tuplas (indice, similaridade) ordenadas por similaridade
@@ -131,26 +353,31 @@ def encontrar_todas_ocorrencias(conteudo, palavras_com_timestamps, min_palavras=
     if min_palavras == 0:
         return []
 
-    palavras_audio_norm = [normalizar_texto(p["palavra"]) for p in palavras_com_timestamps]
+    if palavras_audio_norm is None:
+        palavras_audio_norm = normalizar_palavras(palavras_com_timestamps)
 
-    ocorrencias = []
+    busca_texto = " ".join(palavras_busca[:min_palavras])
+    janelas = None if cache_janelas is None else cache_janelas.get(min_palavras)
+    if janelas is None:
+        janelas = [
+            " ".join(palavras_audio_norm[i:i + min_palavras])
+            for i in range(len(palavras_audio_norm) - min_palavras + 1)
+        ]
+        if cache_janelas is not None:
+            cache_janelas[min_palavras] = janelas
 
-    for i in range(len(palavras_audio_norm) - min_palavras + 1):
-        janela = palavras_audio_norm[i:i + min_palavras]
-        janela_texto = " ".join(janela)
-        busca_texto = " ".join(palavras_busca[:min_palavras])
-        similaridade = calcular_similaridade(janela_texto, busca_texto)
-
-        if similaridade >= threshold:
-            ocorrencias.append((i, similaridade))
+    ocorrencias = _pontuar_janelas(busca_texto, janelas, threshold, similaridade_parada)
 
     # Ordena por similaridade (maior primeiro)
-    ocorrencias.sort(key=lambda x: x[1], reverse=True)
+    if ordenar:
+        ocorrencias.sort(key=_CHAVE_SIMILARIDADE, reverse=True)
 
     return ocorrencias
 
 
-def encontrar_inicio_conteudo_no_array(conteudo, palavras_com_timestamps, min_palavras=3, threshold=0.8, titulo_conceito=None, timestamp_minimo=None):
+def encontrar_inicio_conteudo_no_array(conteudo, palavras_com_timestamps, min_palavras=3, threshold=0.8, titulo_conceito=None, timestamp_minimo=None,
+                                       palavras_audio_norm=None, cache_contexto=None, inicios_audio=None,
+                                       cache_janelas=None):
     """
     Encontra o índice da primeira palavra do conteúdo no array de palavras.
     Usa matching fuzzy, validação de contexto e ordem temporal.
@@ -162,50 +389,202 @@ def encontrar_inicio_conteudo_no_array(conteudo, palavras_com_timestamps, min_pa
         threshold (float): Limiar de similaridade (0.0 a 1.0)
         titulo_conceito (str): Conceito esperado para validação de contexto
         timestamp_minimo (float): Timestamp mínimo aceitável (ordem cronológica)
+        palavras_audio_norm (list): Palavras do array já normalizadas (opcional)
+        cache_contexto (dict): Resultados da validação de contexto já calculados
+            para este mesmo array (opcional; compartilhado entre buscas)
+        inicios_audio (list): Timestamps de início do array, de extrair_inicios (opcional)
+        cache_janelas (dict): Janelas já montadas para este mesmo array (opcional)
 
     Returns:
         tuple: (indice_encontrado, similaridade) ou (None, 0.0) se não encontrar
     """
+    if palavras_audio_norm is None:
+        palavras_audio_norm = normalizar_palavras(palavras_com_timestamps)
+    if inicios_audio is None and timestamp_minimo is not None:
+        inicios_audio = extrair_inicios(palavras_com_timestamps)
+
+    # Caminho rápido: janelas idênticas ao conteúdo (similaridade 1.0) são as
+    # primeiras da lista ordenada; se alguma passar pelos filtros, é ela que
+    # seria escolhida, sem precisar pontuar todas as janelas
+    if threshold <= 1.0:
+        exatas = encontrar_ocorrencias_exatas(conteudo, palavras_audio_norm, min_palavras, cache_janelas)
+        resultado = _selecionar_ocorrencia(exatas, palavras_com_timestamps, titulo_conceito,
+                                           timestamp_minimo, palavras_audio_norm, cache_contexto,
+                                           inicios_audio)
+        if resultado[0] is not None:
+            return resultado
+
+    # Sem filtros, só a melhor ocorrência interessa: uma janela quase perfeita
+    # encerra a varredura. Com filtros, todas são necessárias, pois as melhores
+    # podem ser descartadas por ordem temporal ou contexto
+    sem_filtros = not titulo_conceito and timestamp_minimo is None
+    similaridade_parada = SIMILARIDADE_PARADA if sem_filtros else None
+
     # Encontra todas as ocorrências possíveis
-    ocorrencias = encontrar_todas_ocorrencias(conteudo, palavras_com_timestamps, min_palavras, threshold)
+    ocorrencias = encontrar_todas_ocorrencias(conteudo, palavras_com_timestamps, min_palavras, threshold,
+                                              palavras_audio_norm, similaridade_parada, cache_janelas,
+                                              ordenar=False)
+
+    return _selecionar_ocorrencia(ocorrencias, palavras_com_timestamps, titulo_conceito,
+                                  timestamp_minimo, palavras_audio_norm, cache_contexto,
+                                  inicios_audio)
+
+
+def _selecionar_ocorrencia(ocorrencias, palavras_com_timestamps, titulo_conceito, timestamp_minimo,
+                           palavras_audio_norm, cache_contexto=None, inicios_audio=None):
+    """
+    Aplica os filtros de ordem temporal e de contexto às ocorrências.
+
+    Args:
+        ocorrencias (list): Tuplas (indice, similaridade); empates de similaridade
+            são resolvidos pela ordem da lista
+        palavras_com_timestamps (list): Array de palavras com timestamps
+        titulo_conceito (str): Conceito esperado para validação de contexto
+        timestamp_minimo (float): Timestamp mínimo aceitável (ordem cronológica)
+        palavras_audio_norm (list): Palavras do array já normalizadas
+        cache_contexto (dict): Memoização da validação de contexto (opcional)
+        inicios_audio (list): Timestamps de início do array (opcional)
 
+    Returns:
+        tuple: (indice_encontrado, similaridade) ou (None, 0.0) se nenhuma passar
+    """
     if not ocorrencias:
         return (None, 0.0)
 
     # FILTRO 1: Ordem temporal - remove ocorrências antes do timestamp_minimo
+    # (um único corte por busca binária; depois, só comparação de índices)
     if timestamp_minimo is not None:
-        ocorrencias_validas = []
-        for indice, similaridade in ocorrencias:
-            timestamp_ocorrencia = palavras_com_timestamps[indice]["inicio"]
-            if timestamp_ocorrencia >= timestamp_minimo:
-                ocorrencias_validas.append((indice, similaridade))
-        ocorrencias = ocorrencias_validas
+        if inicios_audio is None:
+            inicios_audio = extrair_inicios(palavras_com_timestamps)
+        corte = _primeiro_indice_a_partir_de(inicios_audio, timestamp_minimo)
+        ocorrencias = [(indice, similaridade) for indice, similaridade in ocorrencias if indice >= corte]
 
         if not ocorrencias:
             return (None, 0.0)
 
-    # FILTRO 2: Validação de contexto (se tem titulo_conceito)
+    # FILTRO 2: Validação de contexto (se tem titulo_conceito), da maior para a
+    # menor similaridade. As PROFUNDIDADE_CONTEXTO melhores saem de um heap
+    # (O(n log k)); o restante só é ordenado se nenhuma delas passar
     if titulo_conceito:
-        for indice, similaridade in ocorrencias:
-            if verificar_conceito_no_contexto(indice, titulo_conceito, palavras_com_timestamps):
-                return (indice, similaridade)
-        # Se nenhuma ocorrência passou na validação de contexto, retorna None
+        candidatas = heapq.nlargest(PROFUNDIDADE_CONTEXTO, ocorrencias, key=_CHAVE_SIMILARIDADE)
+        inicio = 0
+        while True:
+            for indice, similaridade in candidatas[inicio:]:
+                if _conceito_no_contexto_em_cache(indice, titulo_conceito, palavras_com_timestamps,
+                                                  palavras_audio_norm, cache_contexto):
+                    return (indice, similaridade)
+            if len(candidatas) == len(ocorrencias):
+                # Se nenhuma ocorrência passou na validação de contexto, retorna None
+                return (None, 0.0)
+            inicio = len(candidatas)
+            candidatas = sorted(ocorrencias, key=_CHAVE_SIMILARIDADE, reverse=True)
+
+    # Se não tem titulo_conceito, retorna a melhor similaridade (já filtrada por timestamp);
+    # max() devolve a primeira entre as empatadas, como a ordenação estável
+    return max(ocorrencias, key=_CHAVE_SIMILARIDADE)
+
+
+def encontrar_alinhamento_parcial(conteudo, palavras_com_timestamps, palavras_audio_norm, threshold=0.75,
+                                  titulo_conceito=None, timestamp_minimo=None, max_palavras=6,
+                                  cache_contexto=None, inicios_audio=None):
+    """
+    Localiza o início do conteúdo com um único alinhamento parcial (RapidFuzz
+    partial_ratio_alignment) contra o texto inteiro do array, em vez de janelas
+    de tamanho fixo. Tolera palavras a mais ou a menos no trecho falado.
+    Requer RapidFuzz; sem ele, retorna (None, 0.0).
+
+    Args:
+        conteudo (str): Texto do conteúdo do slide
+        palavras_com_timestamps (list): Array de palavras com timestamps
+        palavras_audio_norm (list): Palavras do array já normalizadas
+        threshold (float): Limiar de similaridade (0.0 a 1.0)
+        titulo_conceito (str): Conceito esperado para validação de contexto
+        timestamp_minimo (float): Timestamp mínimo aceitável (ordem cronológica)
+        max_palavras (int): Número de palavras iniciais do conteúdo alinhadas
+        cache_contexto (dict): Memoização da validação de contexto (opcional)
+        inicios_audio (list): Timestamps de início do array (opcional)
+
+    Returns:
+        tuple: (indice_encontrado, similaridade) ou (None, 0.0) se não encontrar
+    """
+    if _rapidfuzz_alinhamento_parcial is None:
         return (None, 0.0)
 
-    # Se não tem titulo_conceito, retorna a melhor similaridade (já filtrada por timestamp)
-    return ocorrencias[0]
+    palavras_busca = extrair_palavras_normalizadas(conteudo)[:max_palavras]
+    if not palavras_busca:
+        return (None, 0.0)
 
+    # Ordem temporal: só o trecho a partir do timestamp mínimo é considerado
+    primeiro = 0
+    if timestamp_minimo is not None:
+        if inicios_audio is None:
+            inicios_audio = extrair_inicios(palavras_com_timestamps)
+        primeiro = _primeiro_indice_a_partir_de(inicios_audio, timestamp_minimo)
+        if primeiro == len(inicios_audio):
+            return (None, 0.0)
 
-def sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo=None):
+    texto_audio = " ".join(palavras_audio_norm[primeiro:])
+    alinhamento = _rapidfuzz_alinhamento_parcial(
+        " ".join(palavras_busca), texto_audio,
+        processor=None, score_cutoff=threshold * 100
+    )
+    if alinhamento is None:
+        return (None, 0.0)
+
+    # Posição do alinhamento no texto -> índice da palavra que o contém
+    indice = primeiro + texto_audio.count(" ", 0, alinhamento.dest_start)
+
+    if titulo_conceito and not _conceito_no_contexto_em_cache(
+        indice, titulo_conceito, palavras_com_timestamps, palavras_audio_norm, cache_contexto
+    ):
+        return (None, 0.0)
+
+    return (indice, alinhamento.score / 100.0)
+
+
+def _bullet_abre_o_chunk(bullet, norm_do_chunk, inicios_do_chunk, timestamp_minimo, titulo_conceito,
+                         palavras_do_chunk, cache_contexto, min_palavras=2):
+    """
+    Verifica, sem varrer o chunk, se a primeira palavra do chunk é exatamente
+    onde a estratégia do primeiro bullet chegaria: o início do bullet coincide
+    com as primeiras palavras do chunk e passa pelos filtros de ordem temporal
+    e de contexto. Nesse caso, o caminho exato de encontrar_inicio_conteudo_no_array
+    escolheria o índice 0 (primeira ocorrência exata).
+
+    Returns:
+        bool: True se o índice 0 do chunk é o resultado da estratégia 1
+    """
+    palavras_busca = extrair_palavras_normalizadas(bullet)
+    min_palavras = min(min_palavras, len(palavras_busca))
+    if min_palavras == 0 or not norm_do_chunk:
+        return False
+    if " ".join(norm_do_chunk[:min_palavras]) != " ".join(palavras_busca[:min_palavras]):
+        return False
+    if timestamp_minimo is not None and inicios_do_chunk[0] < timestamp_minimo:
+        return False
+    if titulo_conceito and not _conceito_no_contexto_em_cache(
+        0, titulo_conceito, palavras_do_chunk, norm_do_chunk, cache_contexto
+    ):
+        return False
+    return True
+
+
+def sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo=None, palavras_audio_norm=None,
+                                inicios_audio=None, cache_janelas=None):
     """
     Sincroniza um slide com o áudio, encontrando o timestamp correto.
     Restringe a busca ao contexto do chunk original para evitar matches incorretos.
-    Tenta match com: 1) primeiro bullet, 2) título do slide.
+    Tenta match com: 1) primeiro bullet, 2) título do slide, 3) segundo bullet,
+    4) alinhamento parcial do primeiro bullet (RapidFuzz); senão, usa o início do chunk.
 
     Args:
         slide (dict): Slide com conteúdo gerado
         palavras_com_timestamps (list): Array completo de palavras com timestamps
         timestamp_minimo (float): Timestamp mínimo aceitável (ordem cronológica)
+        palavras_audio_norm (list): Palavras do array completo já normalizadas (opcional)
+        inicios_audio (list): Timestamps de início do array completo, de extrair_inicios (opcional)
+        cache_janelas (dict): Janelas de busca já montadas, por trecho do áudio
+            (opcional; compartilhado entre slides do mesmo áudio)
 
     Returns:
         dict: Slide com timestamp_inicio corrigido e metadados de sincronização
@@ -215,6 +594,11 @@ def sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo
     titulo_conceito = slide.get("titulo_conceito", "")
     tipo_slide = slide.get("tipo", "")
 
+    if palavras_audio_norm is None:
+        palavras_audio_norm = normalizar_palavras(palavras_com_timestamps)
+    if inicios_audio is None:
+        inicios_audio = extrair_inicios(palavras_com_timestamps)
+
     # Verifica se o slide foi corrigido pela validação
     foi_corrigido = slide.get("corrigido_pela_validacao", False)
 
@@ -224,12 +608,16 @@ def sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo
         chunk_inicio = 0
         chunk_fim = len(palavras_com_timestamps) - 1
         palavras_do_chunk = palavras_com_timestamps
+        norm_do_chunk = palavras_audio_norm
+        inicios_do_chunk = inicios_audio
     else:
         # Extrai os limites do chunk original
         chunk_inicio = slide.get("chunk_palavra_inicio", 0)
         chunk_fim = slide.get("chunk_palavra_fim", len(palavras_com_timestamps) - 1)
         # Restringe a busca ao sub-array do chunk original
         palavras_do_chunk = palavras_com_timestamps[chunk_inicio : chunk_fim + 1]
+        norm_do_chunk = palavras_audio_norm[chunk_inicio : chunk_fim + 1]
+        inicios_do_chunk = inicios_audio[chunk_inicio : chunk_fim + 1]
 
     # Para slides tipo EXEMPLO, não valida titulo_conceito no contexto
     # pois o exemplo pode estar distante da definição do conceito
@@ -237,8 +625,27 @@ def sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo
 
     melhor_match = None
 
+    # Todas as estratégias buscam no mesmo array (o chunk): a validação de
+    # contexto de um mesmo índice é calculada uma única vez por slide
+    cache_contexto = {}
+
+    # As janelas de palavras dependem só do trecho e do tamanho: são montadas
+    # uma vez por trecho e reaproveitadas pelas estratégias e pelos demais
+    # slides do mesmo trecho (ex: slides corrigidos, que buscam no áudio todo)
+    if cache_janelas is None:
+        janelas_do_chunk = {}
+    else:
+        janelas_do_chunk = cache_janelas.setdefault((chunk_inicio, chunk_fim), {})
+
     # ESTRATÉGIA 1: Match com primeiro bullet no contexto do chunk
-    if bullets:
+    if bullets and not foi_corrigido and _bullet_abre_o_chunk(
+        bullets[0], norm_do_chunk, inicios_do_chunk, timestamp_minimo,
+        conceito_para_validacao, palavras_do_chunk, cache_contexto
+    ):
+        # Caminho rápido: o chunk começa exatamente pelo primeiro bullet, então o
+        # timestamp guardado já é o correto (mesmo resultado da busca completa)
+        melhor_match = (chunk_inicio, 1.0, "primeiro_bullet")
+    elif bullets:
         primeiro_bullet = bullets[0]
         idx_relativo, sim = encontrar_inicio_conteudo_no_array(
             primeiro_bullet,
@@ -246,7 +653,11 @@ def sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo
             min_palavras=2,  # Reduzido de 3 para 2
             threshold=0.65,  # Reduzido de 0.75 para 0.65
             titulo_conceito=conceito_para_validacao,
-            timestamp_minimo=timestamp_minimo
+            timestamp_minimo=timestamp_minimo,
+            palavras_audio_norm=norm_do_chunk,
+            cache_contexto=cache_contexto,
+            inicios_audio=inicios_do_chunk,
+            cache_janelas=janelas_do_chunk
         )
         if idx_relativo is not None:
             # Converte índice relativo para absoluto
@@ -261,7 +672,11 @@ def sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo
             min_palavras=2,
             threshold=0.7,
             titulo_conceito=conceito_para_validacao,
-            timestamp_minimo=timestamp_minimo
+            timestamp_minimo=timestamp_minimo,
+            palavras_audio_norm=norm_do_chunk,
+            cache_contexto=cache_contexto,
+            inicios_audio=inicios_do_chunk,
+            cache_janelas=janelas_do_chunk
         )
         if idx_relativo is not None:
             idx_absoluto = chunk_inicio + idx_relativo
@@ -276,54 +691,100 @@ def sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo
             min_palavras=2,  # Reduzido de 3 para 2
             threshold=0.65,  # Reduzido de 0.75 para 0.65
             titulo_conceito=conceito_para_validacao,
-            timestamp_minimo=timestamp_minimo
+            timestamp_minimo=timestamp_minimo,
+            palavras_audio_norm=norm_do_chunk,
+            cache_contexto=cache_contexto,
+            inicios_audio=inicios_do_chunk,
+            cache_janelas=janelas_do_chunk
         )
         if idx_relativo is not None:
             idx_absoluto = chunk_inicio + idx_relativo
             melhor_match = (idx_absoluto, sim, "segundo_bullet")
 
-    # ESTRATÉGIA 4 (NOVA): Fallback - usa timestamp_inicio do chunk original
+    # ESTRATÉGIA 4: Alinhamento parcial do primeiro bullet com o chunk inteiro
+    # (pega bullets reescritos pelo LLM que nenhuma janela curta alcançou)
+    if melhor_match is None and bullets:
+        idx_relativo, sim = encontrar_alinhamento_parcial(
+            bullets[0],
+            palavras_do_chunk,  # Busca apenas no chunk
+            norm_do_chunk,
+            threshold=0.75,
+            titulo_conceito=conceito_para_validacao,
+            timestamp_minimo=timestamp_minimo,
+            cache_contexto=cache_contexto,
+            inicios_audio=inicios_do_chunk
+        )
+        if idx_relativo is not None:
+            idx_absoluto = chunk_inicio + idx_relativo
+            melhor_match = (idx_absoluto, sim, "alinhamento_parcial")
+
+    # ESTRATÉGIA 5: Fallback - usa timestamp_inicio do chunk original
     if melhor_match is None:
         # Se não encontrou match, usa o timestamp do início do chunk
-        timestamp_fallback = palavras_com_timestamps[chunk_inicio]["inicio"]
-
-        slide_com_fallback = slide.copy()
-        slide_com_fallback["timestamp_inicio"] = timestamp_fallback
-        slide_com_fallback["sync_metadata"] = {
-            "indice_palavra": chunk_inicio,
-            "palavra_referencia": palavras_com_timestamps[chunk_inicio]["palavra"],
-            "similaridade": 0.0,
-            "metodo_sync": "fallback_chunk_inicio",
-            "timestamp_original": slide.get("timestamp_inicio")
+        timestamp_fallback = inicios_audio[chunk_inicio]
+
+        return {
+            **slide,
+            "timestamp_inicio": timestamp_fallback,
+            "sync_metadata": {
+                "indice_palavra": chunk_inicio,
+                "palavra_referencia": palavras_com_timestamps[chunk_inicio]["palavra"],
+                "similaridade": 0.0,
+                "metodo_sync": "fallback_chunk_inicio",
+                "timestamp_original": slide.get("timestamp_inicio")
+            }
         }
 
-        return slide_com_fallback
-
     # Se encontrou match, atualiza timestamp
     idx_absoluto, similaridade, metodo = melhor_match
-    timestamp_correto = palavras_com_timestamps[idx_absoluto]["inicio"]
-
-    slide_sincronizado = slide.copy()
-    slide_sincronizado["timestamp_inicio"] = timestamp_correto
-    slide_sincronizado["sync_metadata"] = {
-        "indice_palavra": idx_absoluto,
-        "palavra_referencia": palavras_com_timestamps[idx_absoluto]["palavra"],
-        "similaridade": round(similaridade, 3),
-        "metodo_sync": metodo,
-        "timestamp_original": slide.get("timestamp_inicio")
+    timestamp_correto = inicios_audio[idx_absoluto]
+
+    return {
+        **slide,
+        "timestamp_inicio": timestamp_correto,
+        "sync_metadata": {
+            "indice_palavra": idx_absoluto,
+            "palavra_referencia": palavras_com_timestamps[idx_absoluto]["palavra"],
+            "similaridade": round(similaridade, 3),
+            "metodo_sync": metodo,
+            "timestamp_original": slide.get("timestamp_inicio")
+        }
     }
 
-    return slide_sincronizado
+
+def _resultado_especulativo_valido(slide_sync, timestamp_minimo):
+    """
+    Indica se um slide sincronizado sem restrição temporal (timestamp mínimo 0.0)
+    é o mesmo que seria obtido com o timestamp mínimo real.
+
+    Args:
+        slide_sync (dict): Slide sincronizado com timestamp_minimo=0.0
+        timestamp_minimo (float): Timestamp mínimo real (fim da ordem cronológica)
+
+    Returns:
+        bool: True se o resultado pode ser aproveitado
+    """
+    if timestamp_minimo <= 0.0:
+        return True
+    metodo = slide_sync["sync_metadata"]["metodo_sync"]
+    return metodo in _METODOS_MONOTONOS and slide_sync["timestamp_inicio"] >= timestamp_minimo
 
 
-def sincronizar_todos_slides(slides, palavras_com_timestamps):
+def sincronizar_todos_slides(slides, palavras_com_timestamps, max_simultaneas=None):
     """
     Sincroniza todos os slides com o áudio usando ordem temporal.
     Os slides devem aparecer em ordem cronológica no áudio.
 
+    Cada slide é primeiro sincronizado em paralelo sem restrição temporal; a
+    passada em ordem aproveita esses resultados quando já respeitam o timestamp
+    do slide anterior e só refaz a busca (com a restrição) para os demais.
+    O resultado é idêntico ao da sincronização estritamente sequencial.
+
     Args:
         slides (list): Lista de slides gerados
         palavras_com_timestamps (list): Array de palavras com timestamps
+        max_simultaneas (int): Máximo de slides sincronizados ao mesmo tempo
+            (padrão: número de CPUs)
 
     Returns:
         tuple: (slides_sincronizados, estatisticas)
@@ -340,9 +801,26 @@ def sincronizar_todos_slides(slides, palavras_com_timestamps):
 
     timestamp_anterior = 0.0  # Inicia em 0 para o primeiro slide
 
+    # Normalizado uma única vez para todos os slides e estratégias de busca;
+    # os timestamps de início ficam numa coluna à parte, sem lookup no dict
+    palavras_audio_norm = normalizar_palavras(palavras_com_timestamps)
+    inicios_audio = extrair_inicios(palavras_com_timestamps)
+    cache_janelas = {}
+
+    def _sincronizar(slide, timestamp_minimo):
+        return sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo=timestamp_minimo,
+                                           palavras_audio_norm=palavras_audio_norm,
+                                           inicios_audio=inicios_audio, cache_janelas=cache_janelas)
+
+    # Passada especulativa: slides independentes entre si, em paralelo
+    with ThreadPoolExecutor(max_workers=max_simultaneas) as executor:
+        especulativos = list(executor.map(_sincronizar, slides, [0.0] * len(slides)))
+
     for i, slide in enumerate(slides):
         # Sincroniza com restrição temporal: timestamp >= timestamp_anterior
-        slide_sync = sincronizar_slide_com_audio(slide, palavras_com_timestamps, timestamp_minimo=timestamp_anterior)
+        slide_sync = especulativos[i]
+        if not _resultado_especulativo_valido(slide_sync, timestamp_anterior):
+            slide_sync = _sincronizar(slide, timestamp_anterior)
         slides_sincronizados.append(slide_sync)
 
         sync_meta = slide_sync.get("sync_metadata", {})
@@ -394,16 +872,9 @@ def limpar_metadados_sincronizacao(slides):
     Returns:
         list: Slides sem metadados de sincronização
     """
-    slides_limpos = []
-    for slide in slides:
-        slide_limpo = slide.copy()
-        # Remove metadados de sincronização
-        if "sync_metadata" in slide_limpo:
-            del slide_limpo["sync_metadata"]
-        # Remove limites do chunk (usados apenas internamente)
-        if "chunk_palavra_inicio" in slide_limpo:
-            del slide_limpo["chunk_palavra_inicio"]
-        if "chunk_palavra_fim" in slide_limpo:
-            del slide_limpo["chunk_palavra_fim"]
-        slides_limpos.append(slide_limpo)
-    return slides_limpos
+    # Metadados de sincronização e limites do chunk (usados apenas internamente)
+    # ficam de fora; cada slide é reconstruído uma única vez, sem copy() + del
+    return [
+        {chave: valor for chave, valor in slide.items() if chave not in _CHAVES_INTERNAS_SINCRONIZACAO}
+        for slide in slides
+    ]
@@ -2,7 +2,15 @@
 Módulo para transcrição de áudio usando a API Whisper.
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from openai import OpenAI
+from src.audio_utils import calcular_fingerprint_audio
+from src.cache import ler_cache, salvar_cache
+
+
+MODELO_TRANSCRICAO = "whisper-1"
 
 
 def criar_cliente(api_key):
@@ -18,6 +26,50 @@ def criar_cliente(api_key):
     return OpenAI(api_key=api_key)
 
 
+def aquecer_cliente(client):
+    """
+    Dispara em segundo plano uma chamada barata (models.list) para que o
+    handshake TLS e a autenticação ocorram antes da primeira transcrição.
+
+    Args:
+        client (OpenAI): Cliente OpenAI configurado
+
+    Returns:
+        threading.Thread: Thread (daemon) do aquecimento
+    """
+    def _aquecer():
+        try:
+            client.models.list()
+        except Exception:
+            pass  # Falha no aquecimento não impede o processamento
+
+    thread = threading.Thread(target=_aquecer, daemon=True)
+    thread.start()
+    return thread
+
+
+def completar_chat_em_stream(client, **parametros):
+    """
+    Executa uma chamada chat.completions com stream=True e devolve o conteúdo
+    completo da resposta. Os tokens são consumidos à medida que chegam, sem
+    esperar o corpo inteiro em uma única leitura.
+
+    Args:
+        client (OpenAI): Cliente OpenAI configurado
+        **parametros: Argumentos de chat.completions.create (model, messages, ...)
+
+    Returns:
+        str: Conteúdo gerado pelo modelo
+    """
+    partes = []
+    for evento in client.chat.completions.create(stream=True, **parametros):
+        if evento.choices:
+            conteudo = evento.choices[0].delta.content
+            if conteudo:
+                partes.append(conteudo)
+    return "".join(partes)
+
+
 def transcrever_audio(client, audio_file_path):
     """
     Transcreve o arquivo de áudio usando a API Whisper.
@@ -32,9 +84,12 @@ def transcrever_audio(client, audio_file_path):
     print(f"Arquivo selecionado: {audio_file_path.name}")
     print("Enviando arquivo para a API da OpenAI...")
 
-    with open(audio_file_path, "rb") as audio_file:
+    # O handle (e não os bytes ou o Path, que o SDK leria inteiros) é repassado
+    # ao httpx, que envia o multipart lendo o arquivo em blocos; sem buffer do
+    # Python (buffering=0), cada bloco vai do SO direto para o socket
+    with open(audio_file_path, "rb", buffering=0) as audio_file:
         transcript = client.audio.transcriptions.create(
-            model="whisper-1",
+            model=MODELO_TRANSCRICAO,
             file=audio_file,
             response_format="verbose_json",
             timestamp_granularities=["word"]
@@ -76,3 +131,64 @@ def processar_transcricao(transcript):
                     })
 
     return palavras_com_timestamps
+
+
+def obter_palavras_com_timestamps(client, audio_file_path, usar_cache=True):
+    """
+    Transcreve o áudio e extrai as palavras com timestamps, reaproveitando
+    o cache em disco quando o mesmo áudio já foi transcrito.
+
+    Args:
+        client (OpenAI): Cliente OpenAI configurado
+        audio_file_path (Path): Caminho para o arquivo de áudio
+        usar_cache (bool): Se True, consulta e alimenta o cache
+
+    Returns:
+        list: Lista de dicionários com informações de cada palavra
+    """
+    chave = None
+    if usar_cache:
+        chave = calcular_fingerprint_audio(audio_file_path, MODELO_TRANSCRICAO)
+        palavras_com_timestamps = ler_cache(chave, "transcript")
+        if palavras_com_timestamps is not None:
+            print(f"Arquivo selecionado: {audio_file_path.name}")
+            print("Transcrição reaproveitada do cache.")
+            return palavras_com_timestamps
+
+    transcript = transcrever_audio(client, audio_file_path)
+    palavras_com_timestamps = processar_transcricao(transcript)
+
+    if chave and palavras_com_timestamps:
+        salvar_cache(chave, "transcript", palavras_com_timestamps)
+
+    return palavras_com_timestamps
+
+
+def obter_palavras_de_varios_audios(client, audio_paths, usar_cache=True, max_simultaneas=8):
+    """
+    Transcreve um lote de áudios de uma só vez, com as requisições ao Whisper
+    em voo simultaneamente (no máximo max_simultaneas por vez; o tempo total
+    fica próximo ao do áudio mais demorado, em vez da soma de todos).
+
+    Args:
+        client (OpenAI): Cliente OpenAI configurado
+        audio_paths (list): Lista de caminhos (Path) dos áudios
+        usar_cache (bool): Se True, consulta e alimenta o cache
+        max_simultaneas (int): Limite de requisições simultâneas
+
+    Returns:
+        list: Uma lista de palavras com timestamps por áudio, na mesma ordem
+              de audio_paths (None para os áudios cuja transcrição falhou)
+    """
+    if not audio_paths:
+        return []
+
+    def _transcrever(audio_path):
+        try:
+            return obter_palavras_com_timestamps(client, audio_path, usar_cache)
+        except Exception as e:
+            print(f"Aviso: Falha ao transcrever {audio_path.name} em lote: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(len(audio_paths), max_simultaneas)) as executor:
+        return list(executor.map(_transcrever, audio_paths))
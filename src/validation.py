@@ -2,8 +2,9 @@
 Módulo para validação de conteúdo dos slides.
 """
 
-import json
 from openai import OpenAI
+from src.json_utils import ler_json_texto, json_para_texto
+from src.timestamp_matcher import normalizar_texto
 
 
 CONTENT_VALIDATION_PROMPT = """Você é um validador especialista de conteúdo educacional.
@@ -121,6 +122,36 @@ Corrigir os slides com erros de conteúdo usando APENAS o texto original da tran
 """
 
 
+def _verificar_fidelidade_local(slide, transcricao_norm):
+    """
+    Verificação local e barata de fidelidade de um slide: todos os bullets
+    aparecem literalmente (após normalização) no texto da transcrição e o
+    título contém o titulo_conceito (quando o slide tem um).
+
+    Args:
+        slide (dict): Slide gerado
+        transcricao_norm (str): Texto da transcrição já normalizado
+
+    Returns:
+        bool: True se o slide passa na verificação local
+    """
+    bullets = slide.get("slide_bullets") or []
+    if not bullets:
+        return False
+
+    # Slides de introdução/despedida vêm com titulo_conceito null: sem
+    # conceito, não há correspondência de título a verificar
+    conceito = normalizar_texto(slide.get("titulo_conceito") or "")
+    if conceito and conceito not in normalizar_texto(slide.get("slide_title") or ""):
+        return False
+
+    for bullet in bullets:
+        bullet_norm = normalizar_texto(bullet)
+        if not bullet_norm or f" {bullet_norm} " not in transcricao_norm:
+            return False
+    return True
+
+
 def validar_conteudo(client, texto_transcricao, slides):
     """
     Valida se o conteúdo dos slides está fiel ao texto original.
@@ -135,6 +166,19 @@ def validar_conteudo(client, texto_transcricao, slides):
     """
     print("\n[VALIDAÇÃO DE CONTEÚDO] Verificando fidelidade ao texto original...")
 
+    # Se todos os slides têm bullets copiados literalmente do texto e título
+    # de acordo com o conceito, não há o que o LLM apontar: evita enviar a
+    # transcrição inteira só para receber "conteudo_valido": true
+    transcricao_norm = f" {normalizar_texto(texto_transcricao)} "
+    if slides and all(_verificar_fidelidade_local(slide, transcricao_norm) for slide in slides):
+        print("OK Conteudo de todos os slides esta correto! (verificacao local)")
+        return {
+            "conteudo_valido": True,
+            "erros_conteudo": [],
+            "slides_corretos": list(range(len(slides))),
+            "slides_com_erro_conteudo": []
+        }
+
     dados_validacao = {
         "texto_original": texto_transcricao,
         "slides": slides
@@ -144,13 +188,13 @@ def validar_conteudo(client, texto_transcricao, slides):
         model="gpt-4o",
         messages=[
             {"role": "system", "content": CONTENT_VALIDATION_PROMPT},
-            {"role": "user", "content": json.dumps(dados_validacao, ensure_ascii=False)}
+            {"role": "user", "content": json_para_texto(dados_validacao)}
         ],
         temperature=0.1,
         response_format={"type": "json_object"}
     )
 
-    resultado = json.loads(response.choices[0].message.content)
+    resultado = ler_json_texto(response.choices[0].message.content)
 
     if resultado.get("conteudo_valido", False):
         print("OK Conteudo de todos os slides esta correto!")
@@ -192,26 +236,31 @@ def corrigir_conteudo_slides(client, texto_transcricao, slides, erros_conteudo):
         model="gpt-4o",
         messages=[
             {"role": "system", "content": CONTENT_CORRECTION_PROMPT},
-            {"role": "user", "content": json.dumps(dados_correcao, ensure_ascii=False)}
+            {"role": "user", "content": json_para_texto(dados_correcao)}
         ],
         temperature=0.2,
         response_format={"type": "json_object"}
     )
 
-    resultado = json.loads(response.choices[0].message.content)
+    resultado = ler_json_texto(response.choices[0].message.content)
     slides_corrigidos_dict = resultado.get("slides_corrigidos", [])
 
-    # Aplica correções aos slides originais
-    slides_finais = [slide.copy() for slide in slides]
+    # Aplica correções aos slides originais: só os slides corrigidos ganham um
+    # dict novo; os demais são os mesmos objetos da lista original
+    slides_finais = list(slides)
 
     for correcao in slides_corrigidos_dict:
         idx = correcao.get("slide_index")
         if idx is not None and 0 <= idx < len(slides_finais):
+            slide = slides_finais[idx]
             # CORRIGIDO: Atualiza apenas os campos de conteúdo, preservando timestamps e metadados
-            slides_finais[idx]["slide_title"] = correcao.get("slide_title", slides_finais[idx]["slide_title"])
-            slides_finais[idx]["slide_bullets"] = correcao.get("slide_bullets", slides_finais[idx]["slide_bullets"])
-            # Marca que este slide foi corrigido - sync deve buscar no áudio completo, não no chunk
-            slides_finais[idx]["corrigido_pela_validacao"] = True
+            slides_finais[idx] = {
+                **slide,
+                "slide_title": correcao.get("slide_title", slide["slide_title"]),
+                "slide_bullets": correcao.get("slide_bullets", slide["slide_bullets"]),
+                # Marca que este slide foi corrigido - sync deve buscar no áudio completo, não no chunk
+                "corrigido_pela_validacao": True
+            }
             # Preserva: timestamp_inicio, tipo, titulo_conceito, chunk_palavra_inicio, chunk_palavra_fim
             print(f"  OK Slide {idx} corrigido: {correcao.get('slide_title', 'sem titulo')}")
 
@@ -3,15 +3,199 @@ Módulo para renderização de vídeo com moviepy.
 Combina imagens de slides, áudio e legendas sincronizadas.
 """
 
-try:
-    # moviepy 2.x (nova API)
-    from moviepy import ImageClip, AudioFileClip, CompositeVideoClip, TextClip, concatenate_videoclips
-except ImportError:
-    # moviepy 1.x (API antiga)
-    from moviepy.editor import ImageClip, AudioFileClip, CompositeVideoClip, TextClip, concatenate_videoclips
-
+import importlib.util
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import islice, zip_longest
 from pathlib import Path
-import json
+
+from src.audio_utils import obter_duracao_audio
+from src.json_utils import carregar_json
+from src.video_renderer_ffmpeg import (
+    NOME_ARQUIVO_LEGENDAS, PARAMETROS_ENCODER_HARDWARE, PARAMETROS_MP4,
+    detectar_encoders_hardware, escolher_parametros_x264, escrever_legendas_srt,
+    ffmpeg_disponivel, filtro_legendas, filtro_subtitles_disponivel,
+    obter_threads_x264, renderizar_video_ffmpeg
+)
+
+
+# Legendas PIL: fonte, contorno e área reservada na parte inferior do vídeo
+TAMANHO_FONTE_LEGENDA = 40
+FONTES_LEGENDA = [
+    "arial.ttf",  # Windows - Arial
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",  # Linux - DejaVu Sans
+    "/System/Library/Fonts/Helvetica.ttc",  # macOS - Helvetica
+]
+CONTORNO_LEGENDA = 2
+MARGEM_LEGENDA = CONTORNO_LEGENDA + 2  # Folga em volta do texto na imagem recortada
+ALTURA_FAIXA_LEGENDA = 150
+DISTANCIA_FAIXA_LEGENDA = 180  # Do topo da faixa até a base do vídeo
+
+# Abaixo disso, iniciar processos (cada um importa PIL e numpy) custa mais do que renderizar
+MIN_LEGENDAS_PROCESSOS = 16
+
+# Quadros idênticos ao anterior (slide parado, sem troca de legenda) são
+# descartados pelo ffmpeg antes do encoder; a saída passa a ter taxa de
+# quadros variável, e cada quadro mantido dura até o próximo.
+# Vem depois do filtro de legendas, para que trocas de legenda não se percam.
+# Um quadro é mantido ao menos a cada INTERVALO_MAXIMO_DESCARTE segundos
+# (mpdecimate max) e o último é repetido por 2x esse intervalo (tpad): sem
+# isso, o vídeo terminaria no primeiro quadro do último slide
+INTERVALO_MAXIMO_DESCARTE = 1
+PARAMETROS_DESCARTE_REPETIDOS = ["-vsync", "vfr"]
+
+# Legendas seguidas com o mesmo texto separadas por até isso (segundos) viram um só clip
+INTERVALO_MAXIMO_LEGENDAS_IGUAIS = 1.0
+
+
+# A partir deste número de slides distintos, as imagens são decodificadas uma
+# única vez para um arquivo .npy mapeado em memória: com ImageClip(caminho),
+# cada slide fica decodificado na RAM durante toda a renderização (~6 MB em
+# 1080p; centenas de slides somam gigabytes), enquanto as páginas do mmap são
+# lidas sob demanda e podem ser descartadas pelo sistema
+MIN_SLIDES_MMAP = 100
+
+# moviepy é importado só na primeira renderização (import custoso: numpy,
+# imageio, proglog...); estimar tempo ou verificar dependências não o carrega
+_moviepy = None
+
+
+def _obter_moviepy():
+    """
+    Importa o moviepy na primeira chamada e retorna o módulo com as classes
+    de clipes (moviepy 2.x ou moviepy.editor no 1.x).
+
+    Returns:
+        module: Módulo com ImageClip, AudioFileClip, ColorClip, CompositeVideoClip,
+            TextClip, VideoClip e concatenate_videoclips
+    """
+    global _moviepy
+
+    if _moviepy is None:
+        try:
+            # moviepy 2.x (nova API)
+            from moviepy import ImageClip  # noqa: F401
+            import moviepy as modulo
+        except ImportError:
+            # moviepy 1.x (API antiga)
+            import moviepy.editor as modulo
+        _moviepy = modulo
+
+    return _moviepy
+
+
+def _imagem_na_resolucao(image_path, resolucao, pasta_cache):
+    """
+    Devolve uma versão da imagem do slide já na resolução do vídeo, gerada uma
+    única vez por slide (e reaproveitada entre renderizações enquanto a imagem
+    original não mudar), para que o moviepy não precise redimensionar.
+
+    Args:
+        image_path (Path): Imagem original do slide
+        resolucao (tuple): Resolução do vídeo (largura, altura)
+        pasta_cache (Path): Pasta das imagens redimensionadas desta resolução
+
+    Returns:
+        Path: Imagem na resolução pedida (a original, se já estiver nela)
+    """
+    from PIL import Image
+
+    caminho_cache = pasta_cache / image_path.name
+    if caminho_cache.exists() and caminho_cache.stat().st_mtime_ns >= image_path.stat().st_mtime_ns:
+        return caminho_cache
+
+    with Image.open(image_path) as img:
+        if img.size == tuple(resolucao):
+            return image_path
+        # Pillow >= 9.1 expõe os filtros em Image.Resampling
+        lanczos = getattr(Image, "Resampling", Image).LANCZOS
+        redimensionada = img.resize(tuple(resolucao), lanczos)
+
+    pasta_cache.mkdir(parents=True, exist_ok=True)
+    redimensionada.save(caminho_cache)
+    return caminho_cache
+
+
+def _empilhar_slides_em_mmap(imagens, resolucao, caminho_pilha):
+    """
+    Decodifica as imagens dos slides para um único arquivo .npy e o reabre
+    mapeado em memória (somente leitura).
+
+    Args:
+        imagens (list): Imagens já na resolução do vídeo
+        resolucao (tuple): Resolução do vídeo (largura, altura)
+        caminho_pilha (Path): Arquivo .npy a criar
+
+    Returns:
+        numpy.memmap: Pilha (slides, altura, largura, 3) em uint8
+    """
+    from PIL import Image
+    import numpy as np
+
+    largura, altura = resolucao
+    caminho_pilha.parent.mkdir(parents=True, exist_ok=True)
+    pilha = np.lib.format.open_memmap(
+        caminho_pilha, mode="w+", dtype=np.uint8, shape=(len(imagens), altura, largura, 3)
+    )
+    for k, imagem in enumerate(imagens):
+        with Image.open(imagem) as img:
+            pilha[k] = np.asarray(img.convert("RGB"))
+    pilha.flush()
+    del pilha
+
+    return np.load(caminho_pilha, mmap_mode="r")
+
+
+def _filtro_descarte_repetidos(fps):
+    """
+    Filtro que descarta quadros repetidos (ver INTERVALO_MAXIMO_DESCARTE).
+
+    Args:
+        fps (int): Frames por segundo do vídeo
+
+    Returns:
+        str: Filtros para a cadeia -vf
+    """
+    return (f"mpdecimate=max={fps * INTERVALO_MAXIMO_DESCARTE},"
+            f"tpad=stop_mode=clone:stop_duration={2 * INTERVALO_MAXIMO_DESCARTE}")
+
+
+def _adicionar_audio(video_path, audio_path, output_path, duracao, ffmpeg_bin="ffmpeg"):
+    """
+    Junta o vídeo (mudo) renderizado pelo moviepy com o áudio original em uma
+    única chamada do ffmpeg: o vídeo é copiado e o áudio codificado em AAC.
+    A saída é cortada na duração do áudio (o vídeo termina com folga, ver
+    _filtro_descarte_repetidos).
+
+    Args:
+        video_path (Path): Vídeo sem áudio
+        audio_path (Path): Arquivo de áudio original
+        output_path (Path): Caminho do vídeo final
+        duracao (float): Duração do áudio em segundos
+        ffmpeg_bin (str): Executável do ffmpeg
+
+    Raises:
+        RuntimeError: Se o ffmpeg falhar
+    """
+    cmd = [
+        ffmpeg_bin, "-y", "-hide_banner", "-loglevel", "error",
+        "-i", str(video_path),
+        "-i", str(audio_path),
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "copy", "-c:a", "aac", "-t", f"{duracao:.3f}",
+    ] + PARAMETROS_MP4 + [str(output_path)]
+
+    try:
+        subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg falhou: {e.stderr.strip()}")
 
 
 def renderizar_video(
@@ -21,10 +205,14 @@ def renderizar_video(
     output_path,
     legendas_moviepy=None,
     resolucao=(1920, 1080),
-    fps=24
+    fps=24,
+    usar_ffmpeg_direto=False
 ):
     """
     Renderiza o vídeo final com slides sincronizados, áudio e legendas.
+    Com usar_ffmpeg_direto, delega a renderização inteira (inclusive legendas)
+    a uma única chamada do ffmpeg; o moviepy fica como fallback se o ffmpeg
+    não estiver no PATH.
 
     Args:
         show_script_path (Path): Caminho para o show_script.json
@@ -34,10 +222,30 @@ def renderizar_video(
         legendas_moviepy (list): Lista de legendas [(inicio, fim, texto)]
         resolucao (tuple): Resolução do vídeo (largura, altura)
         fps (int): Frames por segundo
+        usar_ffmpeg_direto (bool): Se True, renderiza com ffmpeg (concat + subtitles)
 
     Returns:
         Path: Caminho do vídeo renderizado
     """
+    if usar_ffmpeg_direto:
+        if ffmpeg_disponivel():
+            return renderizar_video_ffmpeg(
+                show_script_path=show_script_path,
+                audio_path=audio_path,
+                images_folder=images_folder,
+                output_path=output_path,
+                resolucao=resolucao,
+                fps=fps,
+                legendas=legendas_moviepy
+            )
+        print("AVISO: ffmpeg não encontrado no PATH, usando moviepy")
+
+    mp = _obter_moviepy()
+    try:
+        from moviepy.config import FFMPEG_BINARY
+    except ImportError:
+        FFMPEG_BINARY = "ffmpeg"
+
     show_script_path = Path(show_script_path)
     audio_path = Path(audio_path)
     images_folder = Path(images_folder)
@@ -59,18 +267,29 @@ def renderizar_video(
 
     # Carregar show script
     print(f"\nCarregando script de apresentação: {show_script_path.name}")
-    with open(show_script_path, 'r', encoding='utf-8') as f:
-        show_script = json.load(f)
+    show_script = carregar_json(show_script_path)
 
-    # Carregar áudio
-    print(f"Carregando áudio: {audio_path.name}")
-    audio_clip = AudioFileClip(str(audio_path))
-    duracao_audio = audio_clip.duration
+    # Áudio: só a duração (metadados via ffprobe). O moviepy não decodifica o
+    # áudio: o vídeo é renderizado mudo e o ffmpeg acrescenta o áudio no fim
+    print(f"Lendo duração do áudio: {audio_path.name}")
+    duracao_audio = obter_duracao_audio(audio_path)
     print(f"  Duração do áudio: {duracao_audio:.2f}s")
 
     # Criar clipes de vídeo para cada slide
     print(f"\nCriando clipes de vídeo para {len(show_script)} slides...")
-    clips = []
+    # (slide_index, duracao) de cada clipe, em ordem; None = trecho de tela preta
+    trechos = []
+    num_slides = 0
+
+    # Os clipes são encadeados (slides nunca se sobrepõem): cada um começa onde
+    # o anterior terminou. Trechos sem slide (ex: imagem ausente) viram tela
+    # preta, como no fundo da composição, para não adiantar os slides seguintes
+    fim_anterior = 0.0
+
+    # Imagens redimensionadas ficam em uma subpasta por resolução
+    largura, altura = resolucao
+    pasta_redimensionadas = images_folder / ".resized" / f"{largura}x{altura}"
+    imagens_prontas = {}
 
     # Se o primeiro slide não começa em 0, estender para cobrir desde o início
     primeiro_timestamp = show_script[0]["timestamp"] if show_script else 0
@@ -78,103 +297,188 @@ def renderizar_video(
         print(f"\nAviso: Primeiro slide começa em {primeiro_timestamp:.2f}s")
         print(f"Estendendo primeiro slide para cobrir desde 0.0s (evitar tela preta)")
 
-    for i, evento in enumerate(show_script):
+    # Cada evento é visitado junto com o seguinte (o último, com o fim do áudio)
+    proximos = islice(show_script, 1, None)
+    fim_do_audio = {"timestamp": duracao_audio}
+
+    linhas_log = []  # Impressas de uma vez ao final, não uma por slide
+    for i, (evento, proximo) in enumerate(zip_longest(show_script, proximos, fillvalue=fim_do_audio)):
         timestamp_inicio = evento["timestamp"]
         slide_index = evento["slide_index"]
 
         # Se é o primeiro slide e não começa em 0, ajustar para começar em 0
         if i == 0 and timestamp_inicio > 0.1:
             timestamp_inicio = 0.0
-            print(f"  Ajuste: Slide {slide_index} agora inicia em 0.0s")
+            linhas_log.append(f"  Ajuste: Slide {slide_index} agora inicia em 0.0s")
 
         # Determinar duração do clipe
-        if i + 1 < len(show_script):
-            timestamp_fim = show_script[i + 1]["timestamp"]
-        else:
-            timestamp_fim = duracao_audio
+        timestamp_fim = proximo["timestamp"]
 
         duracao = timestamp_fim - timestamp_inicio
 
         # Ignorar clipes com duração inválida
         if duracao <= 0:
-            print(f"  Aviso: Slide {slide_index} tem duração inválida ({duracao:.2f}s), ignorando...")
+            linhas_log.append(f"  Aviso: Slide {slide_index} tem duração inválida ({duracao:.2f}s), ignorando...")
             continue
 
         # Caminho da imagem do slide
         image_path = images_folder / f"slide_{slide_index}.png"
 
         if not image_path.exists():
-            print(f"  Aviso: Imagem não encontrada para slide {slide_index}: {image_path.name}")
+            linhas_log.append(f"  Aviso: Imagem não encontrada para slide {slide_index}: {image_path.name}")
             continue
 
-        # Criar clipe de imagem
-        clip = ImageClip(str(image_path), duration=duracao)
-
-        # MoviePy 2.x usa with_* ao invés de set_*
-        clip = clip.with_start(timestamp_inicio)
-        clip = clip.with_position("center")
+        # Imagem já na resolução do vídeo (slides exportados em 1920x1080 só são
+        # redimensionados em outras resoluções, ex: --fast), uma vez por slide
+        imagem_pronta = imagens_prontas.get(slide_index)
+        if imagem_pronta is None:
+            imagem_pronta = _imagem_na_resolucao(image_path, resolucao, pasta_redimensionadas)
+            imagens_prontas[slide_index] = imagem_pronta
+
+        if timestamp_inicio > fim_anterior:
+            trechos.append((None, timestamp_inicio - fim_anterior))
+
+        # Se o slide anterior passou do início deste (timestamps fora de ordem),
+        # este começa onde aquele terminou, mantendo o fim no lugar certo
+        duracao_clip = timestamp_fim - max(timestamp_inicio, fim_anterior)
+        if duracao_clip <= 0:
+            linhas_log.append(f"  Aviso: Slide {slide_index} encoberto pelo slide anterior, ignorando...")
+            continue
 
-        # Redimensionar para resolução desejada se necessário
-        clip = clip.resized(resolucao)
+        trechos.append((slide_index, duracao_clip))
+        num_slides += 1
+        fim_anterior = timestamp_fim
 
-        clips.append(clip)
+        linhas_log.append(f"  Slide {slide_index}: {timestamp_inicio:.2f}s -> {timestamp_fim:.2f}s (duracao: {duracao:.2f}s)")
 
-        print(f"  Slide {slide_index}: {timestamp_inicio:.2f}s -> {timestamp_fim:.2f}s (duracao: {duracao:.2f}s)")
+    if linhas_log:
+        print("\n".join(linhas_log))
 
-    if not clips:
+    if not num_slides:
         raise ValueError("Nenhum clipe foi criado. Verifique as imagens dos slides.")
 
-    print(f"\nOK {len(clips)} clipes criados")
-
-    # Compor vídeo com CompositeVideoClip para respeitar os timestamps
-    print("\nCompondo vídeo...")
-    video = CompositeVideoClip(clips, size=resolucao)
-
-    # Adicionar áudio
-    print("Adicionando áudio...")
-    video_com_audio = video.with_audio(audio_clip)
-
-    # Adicionar legendas se fornecidas
-    if legendas_moviepy:
-        print(f"Adicionando {len(legendas_moviepy)} legendas...")
-        video_com_audio = adicionar_legendas(video_com_audio, legendas_moviepy, resolucao)
-
-    # Renderizar vídeo final
-    print(f"\nRenderizando vídeo final para '{output_path.name}'...")
-    print(f"  Resolução: {resolucao[0]}x{resolucao[1]}")
-    print(f"  FPS: {fps}")
-    print(f"  Codec: libx264")
-    print("\nEste processo pode levar alguns minutos...\n")
-
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # MoviePy 2.x mudou os parâmetros de write_videofile
-    # Otimizações para renderização mais rápida:
-    # - preset='ultrafast': Compressão mais rápida (arquivo maior, mas render 5-10x mais rápido)
-    # - threads=4: Usa múltiplos threads para codificação paralela
-    # - logger='bar': Barra de progresso limpa
-    video_com_audio.write_videofile(
-        str(output_path),
-        fps=fps,
-        codec='libx264',
-        audio_codec='aac',
-        temp_audiofile='temp-audio.m4a',
-        remove_temp=True,
-        preset='ultrafast',  # Opções: ultrafast, superfast, veryfast, faster, fast, medium, slow, slower, veryslow
-        threads=4,  # Número de threads para codificação paralela
-        logger='bar'  # Barra de progresso limpa
-    )
-
-    # Fechar clipes para liberar recursos
-    video_com_audio.close()
-    audio_clip.close()
+    # Imagem de cada slide: caminho (decodificado pelo ImageClip) ou, com
+    # muitos slides distintos, uma fatia da pilha mapeada em memória
+    caminho_pilha = None
+    if len(imagens_prontas) >= MIN_SLIDES_MMAP:
+        print(f"\nDecodificando {len(imagens_prontas)} slides para um arquivo mapeado em memória...")
+        caminho_pilha = pasta_redimensionadas / f"pilha_{os.getpid()}.npy"
+        pilha = _empilhar_slides_em_mmap(list(imagens_prontas.values()), resolucao, caminho_pilha)
+        fontes = {slide_index: pilha[k] for k, slide_index in enumerate(imagens_prontas)}
+    else:
+        fontes = {slide_index: str(imagem) for slide_index, imagem in imagens_prontas.items()}
+
+    pasta_legendas = None
+    video_final = None
+    video_sem_audio_path = output_path.with_name(f"{output_path.stem}.sem_audio{output_path.suffix}")
+    try:
+        clips = [
+            mp.ColorClip(resolucao, color=(0, 0, 0), duration=duracao_clip) if slide_index is None
+            else mp.ImageClip(fontes[slide_index], duration=duracao_clip)
+            for slide_index, duracao_clip in trechos
+        ]
+
+        print(f"\nOK {num_slides} clipes criados")
+
+        # Encadear os clipes: cada quadro vem de um único clipe, sem a busca por
+        # camadas visíveis que o CompositeVideoClip faz a cada quadro
+        print("\nCompondo vídeo...")
+        video = mp.concatenate_videoclips(clips, method="chain")
+        video_final = video
+
+        # Adicionar legendas se fornecidas: de preferência desenhadas pelo próprio
+        # ffmpeg (filtro subtitles, libass em C) ao codificar, sem uma camada
+        # composta em Python a cada quadro; sem libass, sobrepostas com PIL
+        filtros = []
+        if legendas_moviepy:
+            print(f"Adicionando {len(legendas_moviepy)} legendas...")
+            if filtro_subtitles_disponivel(FFMPEG_BINARY):
+                # Pasta relativa ao diretório atual (onde o moviepy executa o ffmpeg):
+                # o caminho no filtro não tem ':' nem barras invertidas, que exigiriam escape
+                pasta_legendas = Path(tempfile.mkdtemp(prefix="legendas_", dir="."))
+                escrever_legendas_srt(legendas_moviepy, pasta_legendas)
+                caminho_srt = Path(os.path.relpath(pasta_legendas)) / NOME_ARQUIVO_LEGENDAS
+                filtros.append(filtro_legendas(altura, caminho_srt.as_posix()))
+            else:
+                video_final = adicionar_legendas(video_final, legendas_moviepy, resolucao)
+        filtros.append(_filtro_descarte_repetidos(fps))
+        # -t: a folga do tpad é cortada já na codificação, na duração exata do áudio
+        parametros_filtros = (["-vf", ",".join(filtros)] + PARAMETROS_DESCARTE_REPETIDOS
+                              + ["-t", f"{duracao_audio:.3f}"])
+
+        # Renderizar vídeo final
+        print(f"\nRenderizando vídeo final para '{output_path.name}'...")
+        print(f"  Resolução: {resolucao[0]}x{resolucao[1]}")
+        print(f"  FPS: {fps}")
+        print("\nEste processo pode levar alguns minutos...\n")
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Encoders por hardware primeiro (NVENC, Quick Sync, VideoToolbox), libx264 por último
+        codecs = list(detectar_encoders_hardware()) + ["libx264"]
+
+        for codec in codecs:
+            if codec == "libx264":
+                preset, parametros_ffmpeg = escolher_parametros_x264(num_slides, duracao_audio)
+                print(f"  Codec: libx264 (preset {preset})")
+            else:
+                # O moviepy sempre envia -preset; o dos parâmetros do encoder prevalece
+                preset, parametros_ffmpeg = "medium", PARAMETROS_ENCODER_HARDWARE[codec]
+                print(f"  Codec: {codec}")
+
+            # MoviePy 2.x mudou os parâmetros de write_videofile
+            # Otimizações para renderização mais rápida:
+            # - preset/tune conforme a densidade de slides (escolher_parametros_x264):
+            #   slides estáticos usam tune=stillimage, que reduz muito o arquivo
+            # - threads: um por núcleo (até 16), com frame-threading do x264
+            # - subtitles: legendas desenhadas pelo ffmpeg (quando disponível)
+            # - mpdecimate: quadros repetidos não chegam ao encoder
+            # - audio=False: o áudio é acrescentado depois, sem passar pelo moviepy
+            # - logger='bar': Barra de progresso limpa
+            try:
+                video_final.write_videofile(
+                    str(video_sem_audio_path),
+                    fps=fps,
+                    codec=codec,
+                    audio=False,
+                    preset=preset,  # Opções: ultrafast, superfast, veryfast, faster, fast, medium, slow, slower, veryslow
+                    ffmpeg_params=parametros_ffmpeg + parametros_filtros,
+                    threads=obter_threads_x264(),  # Número de threads para codificação paralela
+                    logger='bar'  # Barra de progresso limpa
+                )
+                break
+            except (IOError, OSError) as e:
+                # Encoder compilado no ffmpeg mas sem GPU/driver disponível: tenta o próximo
+                if codec == "libx264":
+                    raise
+                print(f"  Aviso: encoder {codec} falhou ({e}), tentando o próximo...")
+
+        # Áudio copiado do arquivo original para o MP4 (vídeo sem recodificar);
+        # faststart: MP4 pronto para streaming
+        print("Adicionando áudio...")
+        _adicionar_audio(video_sem_audio_path, audio_path, output_path, duracao_audio, FFMPEG_BINARY)
+    finally:
+        # Fechar clipes para liberar recursos
+        if video_final is not None:
+            video_final.close()
+        video_sem_audio_path.unlink(missing_ok=True)
+        if pasta_legendas is not None:
+            shutil.rmtree(pasta_legendas, ignore_errors=True)
+
+        if caminho_pilha is not None:
+            # Sem referências ao mmap, o arquivo pode ser removido (inclusive no Windows)
+            clips = fontes = pilha = video = video_final = None
+            try:
+                caminho_pilha.unlink()
+            except OSError:
+                pass
 
     print("\n" + "=" * 70)
     print("OK VÍDEO RENDERIZADO COM SUCESSO!")
     print("=" * 70)
     print(f"Vídeo salvo em: {output_path}")
     print(f"Duração: {duracao_audio:.2f}s")
-    print(f"Total de slides: {len(clips)}")
+    print(f"Total de slides: {num_slides}")
     if legendas_moviepy:
         print(f"Legendas: {len(legendas_moviepy)} legendas adicionadas")
     print("=" * 70)
@@ -206,6 +510,7 @@ def adicionar_legendas(video_clip, legendas_moviepy, resolucao):
 
 def _adicionar_legendas_textclip(video_clip, legendas_moviepy, resolucao):
     """Adiciona legendas usando TextClip (requer ImageMagick)."""
+    mp = _obter_moviepy()
     texto_clips = []
 
     for inicio, fim, texto in legendas_moviepy:
@@ -213,7 +518,7 @@ def _adicionar_legendas_textclip(video_clip, legendas_moviepy, resolucao):
         if duracao <= 0:
             continue
 
-        txt_clip = TextClip(
+        txt_clip = mp.TextClip(
             texto,
             fontsize=40,
             color='white',
@@ -230,78 +535,227 @@ def _adicionar_legendas_textclip(video_clip, legendas_moviepy, resolucao):
         texto_clips.append(txt_clip)
 
     if texto_clips:
-        return CompositeVideoClip([video_clip] + texto_clips)
+        return mp.CompositeVideoClip([video_clip] + texto_clips)
     return video_clip
 
 
-def _adicionar_legendas_pil(video_clip, legendas_moviepy, resolucao):
-    """Adiciona legendas usando PIL (funciona sem ImageMagick)."""
-    from PIL import Image, ImageDraw, ImageFont
+@lru_cache(maxsize=8)
+def _carregar_fonte_legendas(tamanho=TAMANHO_FONTE_LEGENDA):
+    """
+    Carrega a primeira fonte de FONTES_LEGENDA disponível no sistema.
+    O arquivo da fonte é lido uma única vez por tamanho (e por processo).
+
+    Args:
+        tamanho (int): Tamanho da fonte em pixels
+
+    Returns:
+        ImageFont: Fonte TrueType, ou a fonte padrão do PIL como fallback
+    """
+    from PIL import ImageFont
+
+    for caminho_fonte in FONTES_LEGENDA:
+        try:
+            return ImageFont.truetype(caminho_fonte, tamanho)
+        except OSError:
+            continue
+    # Fallback - fonte padrão
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1)
+def _desenho_para_medicao():
+    """ImageDraw de 1x1 usado só para medir textos (textbbox)."""
+    from PIL import Image, ImageDraw
+
+    return ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+
+
+@lru_cache(maxsize=1024)
+def _medir_texto_legenda(texto):
+    """Bounding box do texto desenhado em (0, 0) com a fonte das legendas."""
+    return _desenho_para_medicao().textbbox((0, 0), texto, font=_carregar_fonte_legendas())
+
+
+def _renderizar_legenda(texto):
+    """
+    Desenha uma legenda (texto branco com contorno preto) numa imagem recortada
+    ao tamanho do texto, em vez de uma faixa com a largura do vídeo.
+
+    Args:
+        texto (str): Texto da legenda
+
+    Returns:
+        tuple: (array RGBA da imagem, bbox do texto em relação a (0, 0))
+    """
+    from PIL import Image, ImageDraw
     import numpy as np
 
-    texto_clips = []
-    largura, altura = resolucao
+    fonte = _carregar_fonte_legendas()
+    bbox = _medir_texto_legenda(texto)
+    largura_texto = bbox[2] - bbox[0]
+    altura_texto = bbox[3] - bbox[1]
+
+    img = Image.new('RGBA', (largura_texto + 2 * MARGEM_LEGENDA, altura_texto + 2 * MARGEM_LEGENDA), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+
+    # Origem deslocada para que o texto comece exatamente na margem
+    x = MARGEM_LEGENDA - bbox[0]
+    y = MARGEM_LEGENDA - bbox[1]
+
+    # Desenhar borda (contorno) do texto
+    for dx, dy in [(-CONTORNO_LEGENDA, -CONTORNO_LEGENDA), (-CONTORNO_LEGENDA, CONTORNO_LEGENDA),
+                   (CONTORNO_LEGENDA, -CONTORNO_LEGENDA), (CONTORNO_LEGENDA, CONTORNO_LEGENDA)]:
+        draw.text((x + dx, y + dy), texto, font=fonte, fill='black')
 
-    # Tenta carregar fonte do sistema
+    # Desenhar texto principal
+    draw.text((x, y), texto, font=fonte, fill='white')
+
+    # np.asarray usa direto os bytes exportados pelo PIL (somente leitura, o
+    # que basta ao ImageClip); np.array faria uma segunda cópia da imagem
+    return np.asarray(img), bbox
+
+
+def _renderizar_legenda_worker(texto):
+    """
+    Renderiza uma legenda em um processo do pool.
+    Erros são devolvidos como None para não derrubar as demais legendas.
+
+    Args:
+        texto (str): Texto da legenda
+
+    Returns:
+        tuple: (array RGBA, bbox) ou None
+    """
     try:
-        # Windows - Arial
-        fonte = ImageFont.truetype("arial.ttf", 40)
-    except:
-        try:
-            # Linux - DejaVu Sans
-            fonte = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 40)
-        except:
-            # Fallback - fonte padrão
-            fonte = ImageFont.load_default()
+        return _renderizar_legenda(texto)
+    except Exception:
+        return None
 
-    for inicio, fim, texto in legendas_moviepy:
-        duracao = fim - inicio
-        if duracao <= 0:
-            continue
 
+def _renderizar_legendas_em_lote(textos):
+    """
+    Renderiza as imagens de várias legendas, em paralelo (um processo por núcleo)
+    a partir de MIN_LEGENDAS_PROCESSOS legendas; abaixo disso, ou se o pool
+    falhar, uma a uma no próprio processo.
+
+    Args:
+        textos (list): Textos das legendas
+
+    Returns:
+        list: (array RGBA, bbox) ou None para cada texto, na mesma ordem
+    """
+    num_processos = min(len(textos), os.cpu_count() or 1)
+
+    if len(textos) >= MIN_LEGENDAS_PROCESSOS and num_processos >= 2:
+        # spawn: o main.py roda várias threads, e fork com threads ativas não é seguro
+        contexto = multiprocessing.get_context("spawn")
         try:
-            # Criar imagem de legenda com PIL
-            # Dimensões da caixa de legenda
-            largura_legenda = largura - 100  # Margem de 50px cada lado
-            altura_legenda = 150
+            with ProcessPoolExecutor(max_workers=num_processos, mp_context=contexto) as executor:
+                return list(executor.map(_renderizar_legenda_worker, textos, chunksize=8))
+        except (OSError, BrokenProcessPool) as e:
+            print(f"  Aviso: renderização paralela de legendas indisponível ({e}), usando PIL sequencial")
+
+    return [_renderizar_legenda_worker(texto) for texto in textos]
+
+
+def _juntar_legendas_repetidas(legendas):
+    """
+    Junta legendas consecutivas com o mesmo texto (ex: frases de preenchimento,
+    trechos de música) em uma só, do primeiro início ao último fim.
 
-            # Criar imagem transparente
-            img = Image.new('RGBA', (largura_legenda, altura_legenda), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(img)
+    Args:
+        legendas (list): Legendas [(inicio, fim, texto)] em ordem cronológica
 
-            # Calcular posição do texto (centralizado)
-            bbox = draw.textbbox((0, 0), texto, font=fonte)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
+    Returns:
+        list: Legendas [(inicio, fim, texto)] sem repetições consecutivas
+    """
+    juntas = []
+    for inicio, fim, texto in legendas:
+        if juntas:
+            inicio_anterior, fim_anterior, texto_anterior = juntas[-1]
+            if texto == texto_anterior and inicio - fim_anterior <= INTERVALO_MAXIMO_LEGENDAS_IGUAIS:
+                juntas[-1] = (inicio_anterior, max(fim, fim_anterior), texto)
+                continue
+        juntas.append((inicio, fim, texto))
+    return juntas
 
-            x = (largura_legenda - text_width) // 2
-            y = (altura_legenda - text_height) // 2
 
-            # Desenhar borda (contorno) do texto
-            for dx, dy in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-                draw.text((x + dx, y + dy), texto, font=fonte, fill='black')
+def _adicionar_legendas_pil(video_clip, legendas_moviepy, resolucao):
+    """
+    Adiciona legendas usando PIL (funciona sem ImageMagick).
 
-            # Desenhar texto principal
-            draw.text((x, y), texto, font=fonte, fill='white')
+    Todas as legendas formam um único clip de sobreposição, do tamanho da
+    área que elas ocupam: a cada quadro, a legenda visível é achada por busca
+    binária nos inícios, em vez de o CompositeVideoClip testar um ImageClip
+    por legenda.
+    """
+    import numpy as np
 
-            # Converter PIL Image para numpy array
-            img_array = np.array(img)
+    mp = _obter_moviepy()
+    largura, altura = resolucao
 
-            # Criar ImageClip com a imagem da legenda
-            legenda_clip = ImageClip(img_array, duration=duracao)
-            legenda_clip = legenda_clip.with_start(inicio)
-            legenda_clip = legenda_clip.with_position(('center', altura - 180))
+    legendas_validas = _juntar_legendas_repetidas(
+        [(inicio, fim, texto) for inicio, fim, texto in legendas_moviepy if fim > inicio]
+    )
 
-            texto_clips.append(legenda_clip)
+    # Imagens recortadas ao texto, rasterizadas em lote uma vez por texto distinto
+    textos_distintos = list(dict.fromkeys(texto for _, _, texto in legendas_validas))
+    renderizadas = dict(zip(textos_distintos, _renderizar_legendas_em_lote(textos_distintos)))
 
-        except Exception as e:
-            print(f"  Aviso: Erro ao criar legenda '{texto[:30]}...': {e}")
+    # Posição vertical de cada texto como antes: centralizado na faixa de
+    # ALTURA_FAIXA_LEGENDA px a DISTANCIA_FAIXA_LEGENDA px da base
+    posicoes = {}
+    for texto, renderizada in renderizadas.items():
+        if renderizada is None:
+            print(f"  Aviso: Erro ao criar legenda '{texto[:30]}...': falha ao desenhar o texto")
             continue
-
-    # Compor vídeo com legendas
-    if texto_clips:
-        return CompositeVideoClip([video_clip] + texto_clips)
-    return video_clip
+        img_array, bbox = renderizada
+        altura_texto = bbox[3] - bbox[1]
+        posicoes[texto] = (altura - DISTANCIA_FAIXA_LEGENDA + (ALTURA_FAIXA_LEGENDA - altura_texto) // 2
+                           + bbox[1] - MARGEM_LEGENDA)
+
+    if not posicoes:
+        return video_clip
+
+    # Área da sobreposição: a menor caixa que contém todas as legendas
+    topo = min(posicoes.values())
+    base = max(y + renderizadas[texto][0].shape[0] for texto, y in posicoes.items())
+    largura_area = max(renderizadas[texto][0].shape[1] for texto in posicoes)
+    altura_area = base - topo
+
+    # Quadro (RGB) e máscara (alfa 0-1) de cada texto, prontos para serem
+    # devolvidos sem cópia; um par vazio para os instantes sem legenda
+    quadros = {}
+    for texto, y in posicoes.items():
+        img_array = renderizadas[texto][0]
+        h, w = img_array.shape[:2]
+        x = (largura_area - w) // 2
+        quadro = np.zeros((altura_area, largura_area, 3), dtype=np.uint8)
+        mascara = np.zeros((altura_area, largura_area), dtype=np.float32)
+        quadro[y - topo:y - topo + h, x:x + w] = img_array[:, :, :3]
+        mascara[y - topo:y - topo + h, x:x + w] = img_array[:, :, 3] / 255.0
+        quadros[texto] = (quadro, mascara)
+    vazio = (np.zeros((altura_area, largura_area, 3), dtype=np.uint8),
+             np.zeros((altura_area, largura_area), dtype=np.float32))
+
+    legendas_desenhaveis = [legenda for legenda in legendas_validas if legenda[2] in quadros]
+    legendas_desenhaveis.sort(key=lambda legenda: legenda[0])
+    inicios = [inicio for inicio, _, _ in legendas_desenhaveis]
+
+    def _quadro_e_mascara(t):
+        idx = bisect_right(inicios, t) - 1
+        if idx < 0 or t >= legendas_desenhaveis[idx][1]:
+            return vazio
+        return quadros[legendas_desenhaveis[idx][2]]
+
+    # Primeiro argumento posicional: frame_function (2.x) / make_frame (1.x);
+    # segundo: is_mask / ismask
+    mascara_clip = mp.VideoClip(lambda t: _quadro_e_mascara(t)[1], True, duration=video_clip.duration)
+    sobreposicao = mp.VideoClip(lambda t: _quadro_e_mascara(t)[0], duration=video_clip.duration)
+    sobreposicao = sobreposicao.with_mask(mascara_clip).with_position(('center', topo))
+
+    # Compor vídeo com legendas: duas camadas, vídeo e sobreposição
+    return mp.CompositeVideoClip([video_clip, sobreposicao])
 
 
 def estimar_tempo_renderizacao(duracao_audio, num_slides):
@@ -333,15 +787,15 @@ def verificar_dependencias_moviepy():
     Returns:
         tuple: (instalado: bool, mensagem: str)
     """
-    try:
-        import moviepy
+    # find_spec localiza o pacote sem importá-lo (o import é feito na renderização)
+    if importlib.util.find_spec("moviepy") is not None:
         return True, "moviepy instalado corretamente"
-    except ImportError:
-        mensagem = (
-            "moviepy não está instalado.\n"
-            "Instale com: pip install moviepy\n"
-            "Dependências adicionais:\n"
-            "  - ImageMagick (para TextClip)\n"
-            "  - ffmpeg (para codecs de vídeo)"
-        )
-        return False, mensagem
+
+    mensagem = (
+        "moviepy não está instalado.\n"
+        "Instale com: pip install moviepy\n"
+        "Dependências adicionais:\n"
+        "  - ImageMagick (para TextClip)\n"
+        "  - ffmpeg (para codecs de vídeo)"
+    )
+    return False, mensagem
@@ -0,0 +1,603 @@
+"""
+Módulo para renderização de vídeo diretamente com ffmpeg.
+Alternativa mais rápida ao moviepy: as imagens dos slides são encadeadas pelo
+demuxer concat do ffmpeg e as legendas são desenhadas pelo filtro subtitles,
+sem compor quadro a quadro em Python.
+"""
+
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice, zip_longest
+from pathlib import Path
+
+from src.audio_utils import obter_duracao_audio
+from src.json_utils import carregar_json
+from src.subtitle_generator import gerar_conteudo_srt
+
+
+# Encoders H.264 com aceleração por hardware, em ordem de preferência
+ENCODERS_HARDWARE = ["h264_nvenc", "h264_qsv", "h264_videotoolbox"]
+
+# Parâmetros de qualidade/velocidade de cada encoder por hardware (sem eles,
+# NVENC e QSV usam um bitrate fixo baixo, ruim para texto de slides)
+PARAMETROS_ENCODER_HARDWARE = {
+    "h264_nvenc": ["-preset", "p1", "-tune", "ll", "-rc", "vbr", "-cq", "23"],
+    "h264_qsv": ["-preset", "veryfast", "-global_quality", "23"],
+    "h264_videotoolbox": ["-q:v", "55"],
+}
+
+# Preset/tune do libx264 por densidade de slides (slides por segundo de áudio):
+# apresentações quase estáticas comprimem quase de graça com tune=stillimage
+# (macroblocos repetidos), então um preset mais lento sai menor sem custar tempo
+PRESETS_X264 = [
+    (0.2, "veryfast", "stillimage"),
+    (1.0, "faster", "stillimage"),
+    (2.0, "superfast", None),
+]
+PRESET_X264_PADRAO = ("ultrafast", None)
+
+# GOP longo e sem detecção de cena: cada troca de slide não vira um I-frame extra
+X264_PARAMS = "keyint=240:scenecut=0"
+
+# Limite de threads do x264: o ganho do frame-threading se estabiliza por volta
+# de 8-16 threads em 1080p, e mais threads só aumentam latência e memória
+MAX_THREADS_X264 = 16
+
+# Codificação em partes (só libx264): o frame-threading do x264 para de escalar
+# por volta de 8-16 threads; em máquinas com mais núcleos, trechos contíguos da
+# linha do tempo são codificados ao mesmo tempo, com este número de threads
+# cada, e depois emendados sem recodificar. Partes menores que
+# DURACAO_MINIMA_PARTE (segundos) não compensam um processo a mais
+THREADS_POR_PARTE = 8
+DURACAO_MINIMA_PARTE = 60.0
+
+# moov atom no início do MP4: o vídeo pode ser exibido/enviado para a web
+# (YouTube, S3 + player) sem uma segunda passada para reposicionar os metadados
+PARAMETROS_MP4 = ["-movflags", "+faststart"]
+
+
+def obter_threads_x264():
+    """
+    Número de threads de codificação: um por núcleo, até MAX_THREADS_X264.
+
+    Returns:
+        int: Número de threads
+    """
+    return min(MAX_THREADS_X264, os.cpu_count() or 4)
+
+# Nome do arquivo de legendas na pasta temporária em que o ffmpeg é executado:
+# referenciado pelo nome, o filtro subtitles não precisa de escape de caminho
+NOME_ARQUIVO_LEGENDAS = "legendas.srt"
+
+# Altura de referência do libass para legendas SRT (PlayResY): tamanhos e
+# margens do estilo são proporcionais a ela, não à altura do vídeo
+ALTURA_REFERENCIA_LEGENDAS = 288
+
+
+def ffmpeg_disponivel():
+    """
+    Verifica se o ffmpeg está instalado no PATH.
+
+    Returns:
+        bool: True se o ffmpeg foi encontrado
+    """
+    return shutil.which("ffmpeg") is not None
+
+
+@lru_cache(maxsize=1)
+def detectar_encoders_hardware():
+    """
+    Lista os encoders H.264 com aceleração por hardware compilados no ffmpeg.
+    O ffmpeg é consultado uma única vez por execução.
+
+    Returns:
+        tuple: Encoders disponíveis (subconjunto de ENCODERS_HARDWARE, mesma ordem)
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True, text=True, check=True
+        )
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        return ()
+
+    return tuple(encoder for encoder in ENCODERS_HARDWARE if encoder in result.stdout)
+
+
+@lru_cache(maxsize=None)
+def filtro_subtitles_disponivel(ffmpeg_bin="ffmpeg"):
+    """
+    Verifica se o ffmpeg foi compilado com o filtro subtitles (libass).
+    Cada binário é consultado uma única vez por execução.
+
+    Args:
+        ffmpeg_bin (str): Executável do ffmpeg (ex: o usado pelo moviepy)
+
+    Returns:
+        bool: True se o filtro está disponível
+    """
+    try:
+        result = subprocess.run(
+            [ffmpeg_bin, "-hide_banner", "-filters"],
+            capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+    return any(linha.split()[1:2] == ["subtitles"] for linha in result.stdout.splitlines())
+
+
+def _tamanho_png(image_path):
+    """
+    Lê largura e altura do cabeçalho IHDR de um PNG, sem decodificar a imagem
+    (e sem depender do PIL).
+
+    Args:
+        image_path (Path): Caminho da imagem
+
+    Returns:
+        tuple: (largura, altura), ou None se o arquivo não for um PNG legível
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            cabecalho = f.read(24)
+    except OSError:
+        return None
+
+    if len(cabecalho) < 24 or cabecalho[:8] != b"\x89PNG\r\n\x1a\n" or cabecalho[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", cabecalho[16:24])
+
+
+def _escrever_lista_concat(segmentos, lista_path):
+    """
+    Escreve o arquivo de entrada do demuxer concat do ffmpeg.
+
+    Args:
+        segmentos (list): Lista de (image_path, duracao)
+        lista_path (Path): Caminho do arquivo de lista
+    """
+    def _escapar(path):
+        return str(Path(path).absolute()).replace("'", r"'\''")
+
+    linhas = []
+    for image_path, duracao in segmentos:
+        linhas.append(f"file '{_escapar(image_path)}'")
+        linhas.append(f"duration {duracao:.3f}")
+
+    # O concat ignora a duração do último item se ele não for repetido
+    linhas.append(f"file '{_escapar(segmentos[-1][0])}'")
+
+    with open(lista_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(linhas) + "\n")
+
+
+def escolher_parametros_x264(num_slides, duracao_audio, threads=None):
+    """
+    Escolhe preset e tune do libx264 conforme a densidade de slides do vídeo.
+    Força frame-threading (sliced-threads=0) com um thread por núcleo.
+
+    Args:
+        num_slides (int): Número de slides (clipes) do vídeo
+        duracao_audio (float): Duração do vídeo em segundos
+        threads (int): Threads do x264 (padrão: obter_threads_x264())
+
+    Returns:
+        tuple: (preset, lista de parâmetros extras do ffmpeg para o x264)
+    """
+    slides_por_segundo = num_slides / duracao_audio if duracao_audio > 0 else float("inf")
+
+    preset, tune = PRESET_X264_PADRAO
+    for limite, preset_faixa, tune_faixa in PRESETS_X264:
+        if slides_por_segundo < limite:
+            preset, tune = preset_faixa, tune_faixa
+            break
+
+    if threads is None:
+        threads = obter_threads_x264()
+    parametros = ["-x264-params", f"{X264_PARAMS}:threads={threads}:sliced-threads=0"]
+    if tune:
+        parametros = ["-tune", tune] + parametros
+    return preset, parametros
+
+
+def escrever_legendas_srt(legendas, pasta, nome_arquivo=NOME_ARQUIVO_LEGENDAS):
+    """
+    Escreve as legendas (formato moviepy) como SRT na pasta de execução do ffmpeg.
+
+    Args:
+        legendas (list): Lista de legendas [(inicio, fim, texto)]
+        pasta (Path): Pasta temporária da renderização
+        nome_arquivo (str): Nome do arquivo SRT dentro da pasta
+
+    Returns:
+        int: Número de legendas escritas (as de duração inválida são ignoradas)
+    """
+    legendas_validas = [
+        {"inicio": inicio, "fim": fim, "texto": texto}
+        for inicio, fim, texto in legendas
+        if fim > inicio
+    ]
+    with open(pasta / nome_arquivo, 'w', encoding='utf-8') as f:
+        f.write(gerar_conteudo_srt(legendas_validas))
+    return len(legendas_validas)
+
+
+def filtro_legendas(altura, caminho_srt=NOME_ARQUIVO_LEGENDAS):
+    """
+    Monta o filtro subtitles com o mesmo visual das legendas do moviepy:
+    texto branco de 40px com contorno preto, centralizado na parte inferior.
+
+    Args:
+        altura (int): Altura do vídeo em pixels
+        caminho_srt (str): Caminho do SRT relativo à pasta de execução do ffmpeg
+            (sem ':' nem aspas, que exigiriam escape no filtro)
+
+    Returns:
+        str: Filtro para a cadeia -vf
+    """
+    escala = ALTURA_REFERENCIA_LEGENDAS / altura
+    estilo = ",".join([
+        "FontName=Arial",
+        f"FontSize={40 * escala:.1f}",
+        "PrimaryColour=&H00FFFFFF",
+        "OutlineColour=&H00000000",
+        "BorderStyle=1",
+        f"Outline={2 * escala:.2f}",
+        "Shadow=0",
+        "Alignment=2",
+        f"MarginV={round(105 * escala)}",
+    ])
+    return f"subtitles={caminho_srt}:force_style='{estilo}'"
+
+
+def _montar_segmentos(show_script, images_folder, duracao_audio):
+    """
+    Converte o show_script em segmentos (imagem, duração), com as mesmas regras
+    do renderizador moviepy: o primeiro slide cobre desde 0.0s e slides de
+    duração inválida são ignorados. Quando falta a imagem de um slide, seu tempo
+    é absorvido pelo slide anterior para manter a sincronia com o áudio.
+
+    Returns:
+        list: Lista de (image_path, duracao)
+    """
+    segmentos = []
+    duracao_pendente = 0.0
+
+    # Cada evento é visitado junto com o seguinte (o último, com o fim do áudio)
+    proximos = islice(show_script, 1, None)
+    fim_do_audio = {"timestamp": duracao_audio}
+
+    linhas_log = []  # Impressas de uma vez ao final, não uma por slide
+    for i, (evento, proximo) in enumerate(zip_longest(show_script, proximos, fillvalue=fim_do_audio)):
+        timestamp_inicio = 0.0 if i == 0 else evento["timestamp"]
+        slide_index = evento["slide_index"]
+        timestamp_fim = proximo["timestamp"]
+
+        duracao = timestamp_fim - timestamp_inicio
+
+        if duracao <= 0:
+            linhas_log.append(f"  Aviso: Slide {slide_index} tem duração inválida ({duracao:.2f}s), ignorando...")
+            continue
+
+        image_path = images_folder / f"slide_{slide_index}.png"
+
+        if not image_path.exists():
+            linhas_log.append(f"  Aviso: Imagem não encontrada para slide {slide_index}: {image_path.name}")
+            if segmentos:
+                anterior_path, anterior_duracao = segmentos[-1]
+                segmentos[-1] = (anterior_path, anterior_duracao + duracao)
+            else:
+                duracao_pendente += duracao
+            continue
+
+        segmentos.append((image_path, duracao + duracao_pendente))
+        duracao_pendente = 0.0
+
+        linhas_log.append(f"  Slide {slide_index}: {timestamp_inicio:.2f}s -> {timestamp_fim:.2f}s (duracao: {duracao:.2f}s)")
+
+    if linhas_log:
+        print("\n".join(linhas_log))
+
+    return segmentos
+
+
+def _numero_de_partes(segmentos):
+    """
+    Número de partes em que a linha do tempo é codificada em paralelo:
+    um grupo de THREADS_POR_PARTE núcleos por parte, cada parte com pelo
+    menos DURACAO_MINIMA_PARTE segundos e um segmento.
+
+    Args:
+        segmentos (list): Lista de (image_path, duracao)
+
+    Returns:
+        int: Número de partes (1 = codificação única)
+    """
+    duracao_total = sum(duracao for _, duracao in segmentos)
+    return max(1, min(
+        (os.cpu_count() or 1) // THREADS_POR_PARTE,
+        int(duracao_total // DURACAO_MINIMA_PARTE),
+        len(segmentos),
+    ))
+
+
+def _dividir_em_partes(segmentos, num_partes):
+    """
+    Divide os segmentos em grupos contíguos de duração aproximadamente igual.
+    Os cortes caem sempre numa troca de slide.
+
+    Args:
+        segmentos (list): Lista de (image_path, duracao)
+        num_partes (int): Número de grupos desejado
+
+    Returns:
+        list: Lista de listas de (image_path, duracao)
+    """
+    duracao_por_parte = sum(duracao for _, duracao in segmentos) / num_partes
+    partes = []
+    parte_atual = []
+    acumulado = 0.0
+
+    for segmento in segmentos:
+        parte_atual.append(segmento)
+        acumulado += segmento[1]
+        if len(partes) < num_partes - 1 and acumulado >= duracao_por_parte * (len(partes) + 1):
+            partes.append(parte_atual)
+            parte_atual = []
+
+    if parte_atual:
+        partes.append(parte_atual)
+    return partes
+
+
+def _legendas_do_trecho(legendas, inicio_trecho, fim_trecho):
+    """
+    Legendas visíveis em um trecho do vídeo, com tempos relativos ao início dele.
+
+    Args:
+        legendas (list): Lista de legendas [(inicio, fim, texto)]
+        inicio_trecho (float): Início do trecho em segundos
+        fim_trecho (float): Fim do trecho em segundos
+
+    Returns:
+        list: Legendas [(inicio, fim, texto)] recortadas ao trecho
+    """
+    return [
+        (max(inicio, inicio_trecho) - inicio_trecho, min(fim, fim_trecho) - inicio_trecho, texto)
+        for inicio, fim, texto in legendas
+        if fim > inicio_trecho and inicio < fim_trecho
+    ]
+
+
+def _renderizar_em_partes(partes, audio_path, output_path, filtros_base, legendas,
+                          altura, fps, num_slides, duracao_audio):
+    """
+    Codifica cada parte da linha do tempo (só vídeo, libx264) em um ffmpeg
+    próprio, todos ao mesmo tempo, e emenda as partes com o demuxer concat
+    sem recodificar (-c copy), acrescentando o áudio codificado uma única vez.
+
+    Args:
+        partes (list): Grupos contíguos de (image_path, duracao)
+        audio_path (Path): Caminho absoluto do áudio
+        output_path (Path): Caminho absoluto do vídeo final
+        filtros_base (list): Filtros aplicados antes das legendas (ex: scale)
+        legendas (list): Lista de legendas [(inicio, fim, texto)] (opcional)
+        altura (int): Altura do vídeo em pixels
+        fps (int): Frames por segundo
+        num_slides (int): Número de slides do vídeo inteiro
+        duracao_audio (float): Duração do vídeo em segundos
+
+    Returns:
+        bool: True se o vídeo foi gerado; False se alguma etapa falhou
+    """
+    # Preset pela densidade do vídeo inteiro: todas as partes precisam dos
+    # mesmos parâmetros para que o concat -c copy produza um stream válido
+    preset, parametros_x264 = escolher_parametros_x264(num_slides, duracao_audio, threads=THREADS_POR_PARTE)
+    pasta = Path(tempfile.mkdtemp(prefix="partes_"))
+
+    try:
+        comandos = []
+        nomes_partes = []
+        inicio_parte = 0.0
+
+        for k, parte in enumerate(partes):
+            fim_parte = inicio_parte + sum(duracao for _, duracao in parte)
+            lista_parte = f"parte_{k}.concat.txt"
+            _escrever_lista_concat(parte, pasta / lista_parte)
+
+            filtros = list(filtros_base)
+            if legendas:
+                nome_srt = f"legendas_{k}.srt"
+                if escrever_legendas_srt(_legendas_do_trecho(legendas, inicio_parte, fim_parte), pasta, nome_srt):
+                    filtros.append(filtro_legendas(altura, nome_srt))
+            filtros.append("format=yuv420p")
+
+            # A lista repete a última imagem da parte (um quadro a mais): cada
+            # parte é cortada no quadro em que a seguinte começa, contado desde
+            # o início do vídeo, para que a soma das partes não se desloque do
+            # áudio e das legendas
+            quadros_parte = round(fim_parte * fps) - round(inicio_parte * fps)
+
+            nome_parte = f"parte_{k}.mp4"
+            comandos.append([
+                "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", lista_parte,
+                "-vf", ",".join(filtros),
+                "-r", str(fps),
+                "-frames:v", str(quadros_parte),
+                "-c:v", "libx264", "-preset", preset,
+            ] + parametros_x264 + ["-an", nome_parte])
+            nomes_partes.append(nome_parte)
+            inicio_parte = fim_parte
+
+        print(f"\nRenderizando vídeo final para '{output_path.name}'...")
+        print(f"  Codec: libx264 (preset {preset}), {len(partes)} partes simultâneas de {THREADS_POR_PARTE} threads")
+
+        def _codificar(cmd):
+            subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=pasta)
+
+        # Cada parte é um processo ffmpeg: as threads só aguardam o término
+        with ThreadPoolExecutor(max_workers=len(comandos)) as executor:
+            list(executor.map(_codificar, comandos))
+
+        with open(pasta / "partes.concat.txt", 'w', encoding='utf-8') as f:
+            f.write("".join(f"file '{nome}'\n" for nome in nomes_partes))
+
+        _codificar([
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", "partes.concat.txt",
+            "-i", str(audio_path),
+            "-map", "0:v:0", "-map", "1:a:0",
+            "-c:v", "copy", "-c:a", "aac", "-shortest",
+        ] + PARAMETROS_MP4 + [str(output_path)])
+        return True
+    except (OSError, subprocess.CalledProcessError) as e:
+        detalhe = e.stderr.strip() if isinstance(e, subprocess.CalledProcessError) and e.stderr else e
+        print(f"  Aviso: codificação em partes falhou ({detalhe}), codificando em uma única passada...")
+        return False
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def renderizar_video_ffmpeg(
+    show_script_path,
+    audio_path,
+    images_folder,
+    output_path,
+    resolucao=(1920, 1080),
+    fps=24,
+    legendas=None
+):
+    """
+    Renderiza o vídeo final com ffmpeg (concat de imagens + áudio + legendas).
+    Usa encoder por hardware quando disponível, senão libx264 (em partes
+    paralelas quando a máquina tem núcleos de sobra).
+
+    Args:
+        show_script_path (Path): Caminho para o show_script.json
+        audio_path (Path): Caminho para o arquivo de áudio
+        images_folder (Path): Pasta com as imagens dos slides
+        output_path (Path): Caminho para salvar o vídeo final
+        resolucao (tuple): Resolução do vídeo (largura, altura)
+        fps (int): Frames por segundo
+        legendas (list): Lista de legendas [(inicio, fim, texto)] (opcional)
+
+    Returns:
+        Path: Caminho do vídeo renderizado
+    """
+    show_script_path = Path(show_script_path)
+    # Absolutos: com legendas, o ffmpeg roda dentro de uma pasta temporária
+    audio_path = Path(audio_path).absolute()
+    images_folder = Path(images_folder)
+    output_path = Path(output_path).absolute()
+
+    print("=" * 70)
+    print("RENDERIZAÇÃO DE VÍDEO (ffmpeg)")
+    print("=" * 70)
+
+    # Validar arquivos
+    if not show_script_path.exists():
+        raise FileNotFoundError(f"Script de apresentação não encontrado: {show_script_path}")
+
+    if not audio_path.exists():
+        raise FileNotFoundError(f"Arquivo de áudio não encontrado: {audio_path}")
+
+    if not images_folder.exists():
+        raise FileNotFoundError(f"Pasta de imagens não encontrada: {images_folder}")
+
+    show_script = carregar_json(show_script_path)
+
+    duracao_audio = obter_duracao_audio(audio_path)
+    print(f"  Duração do áudio: {duracao_audio:.2f}s")
+
+    print(f"\nMontando sequência de {len(show_script)} slides...")
+    segmentos = _montar_segmentos(show_script, images_folder, duracao_audio)
+
+    if not segmentos:
+        raise ValueError("Nenhum clipe foi criado. Verifique as imagens dos slides.")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    lista_path = output_path.with_suffix(".concat.txt")
+    _escrever_lista_concat(segmentos, lista_path)
+
+    largura, altura = resolucao
+    encoders = list(detectar_encoders_hardware()) + ["libx264"]
+    num_partes = 1 if encoders[0] != "libx264" else _numero_de_partes(segmentos)
+
+    # Slides já exportados na resolução do vídeo (o caso comum) dispensam o
+    # filtro scale; cada imagem distinta é verificada uma vez pelo cabeçalho
+    imagens = {image_path for image_path, _ in segmentos}
+    if all(_tamanho_png(image_path) == (largura, altura) for image_path in imagens):
+        filtros = []
+    else:
+        filtros = [f"scale={largura}:{altura}"]
+    filtros_base = list(filtros)
+
+    # Legendas: SRT numa pasta temporária, desenhado pelo próprio ffmpeg (libass)
+    pasta_execucao = None
+    total_legendas = 0
+    if legendas:
+        pasta_execucao = Path(tempfile.mkdtemp(prefix="legendas_"))
+        total_legendas = escrever_legendas_srt(legendas, pasta_execucao)
+        filtros.append(filtro_legendas(altura))
+    filtros.append("format=yuv420p")
+
+    try:
+        em_partes = num_partes > 1 and _renderizar_em_partes(
+            _dividir_em_partes(segmentos, num_partes), audio_path, output_path,
+            filtros_base, legendas, altura, fps, len(segmentos), duracao_audio
+        )
+
+        for encoder in ([] if em_partes else encoders):
+            cmd = [
+                "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", str(lista_path),
+                "-i", str(audio_path),
+                "-vf", ",".join(filtros),
+                "-r", str(fps),
+                "-c:v", encoder,
+            ]
+            if encoder == "libx264":
+                preset, parametros_x264 = escolher_parametros_x264(len(segmentos), duracao_audio)
+                cmd += ["-preset", preset] + parametros_x264
+            else:
+                cmd += PARAMETROS_ENCODER_HARDWARE[encoder]
+            cmd += ["-c:a", "aac", "-shortest"] + PARAMETROS_MP4 + [str(output_path)]
+
+            print(f"\nRenderizando vídeo final para '{output_path.name}'...")
+            print(f"  Resolução: {largura}x{altura}")
+            print(f"  FPS: {fps}")
+            print(f"  Codec: {encoder}")
+            if total_legendas:
+                print(f"  Legendas: {total_legendas}")
+
+            try:
+                subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=pasta_execucao)
+                break
+            except subprocess.CalledProcessError as e:
+                # Encoder compilado no ffmpeg mas sem GPU/driver disponível: tenta o próximo
+                if encoder == "libx264":
+                    raise RuntimeError(f"ffmpeg falhou: {e.stderr.strip()}")
+                print(f"  Aviso: encoder {encoder} falhou, tentando o próximo...")
+    finally:
+        lista_path.unlink(missing_ok=True)
+        if pasta_execucao is not None:
+            shutil.rmtree(pasta_execucao, ignore_errors=True)
+
+    print("\n" + "=" * 70)
+    print("OK VÍDEO RENDERIZADO COM SUCESSO!")
+    print("=" * 70)
+    print(f"Vídeo salvo em: {output_path}")
+    print(f"Duração: {duracao_audio:.2f}s")
+    print(f"Total de slides: {len(segmentos)}")
+    if total_legendas:
+        print(f"Legendas: {total_legendas} legendas adicionadas")
+    print("=" * 70)
+
+    return output_path
@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Os módulos são importados como src.<modulo>, a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def cache_temporario(tmp_path, monkeypatch):
+    """Aponta o cache de respostas para uma pasta temporária (nunca output/.cache)."""
+    import src.cache
+
+    monkeypatch.setattr(src.cache, "PASTA_CACHE", tmp_path / ".cache")
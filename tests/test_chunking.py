@@ -0,0 +1,36 @@
+import pytest
+
+from src import chunking
+from src.chunking import encontrar_marcador_no_audio
+
+
+# "o limite o que função" (índice 3) pontua 0.837 no fuzz.ratio do RapidFuzz,
+# mas 0.791 no difflib, abaixo do mínimo de 0.8; a janela certa,
+# "o limite da nossa função" (índice 10), pontua 0.826 nos dois
+TRANSCRICAO = (
+    "hoje vamos estudar o limite o que função e então "
+    "o limite da nossa função aparece"
+).split()
+INDICE_ESPERADO = 10
+
+
+@pytest.fixture(params=["rapidfuzz", "difflib"])
+def backend(request, monkeypatch):
+    if request.param == "rapidfuzz":
+        if chunking._rapidfuzz_ratio is None:
+            pytest.skip("rapidfuzz não instalado")
+    else:
+        monkeypatch.setattr(chunking, "_rapidfuzz_ratio", None)
+    return request.param
+
+
+def test_marcador_no_mesmo_indice_com_e_sem_rapidfuzz(backend):
+    palavras = [
+        {"palavra": palavra, "inicio": float(i), "fim": i + 0.5}
+        for i, palavra in enumerate(TRANSCRICAO)
+    ]
+
+    indice, num_palavras = encontrar_marcador_no_audio("O limite de uma função", palavras)
+
+    assert indice == INDICE_ESPERADO
+    assert num_palavras == 5
@@ -0,0 +1,43 @@
+import pytest
+
+from src import timestamp_matcher
+from src.timestamp_matcher import encontrar_inicio_conteudo_no_array
+
+
+# "o limite a com função" (índice 3) pontua 0.837 no fuzz.ratio do RapidFuzz,
+# mas 0.791 no difflib; a janela certa, "o limite da nossa função" (índice 10),
+# pontua 0.826 nos dois
+TRANSCRICAO = (
+    "hoje vamos estudar o limite a com função e então "
+    "o limite da nossa função aparece"
+).split()
+INDICE_ESPERADO = 10
+
+
+def _palavras_com_timestamps(palavras):
+    return [
+        {"palavra": palavra, "inicio": float(i), "fim": i + 0.5}
+        for i, palavra in enumerate(palavras)
+    ]
+
+
+@pytest.fixture(params=["rapidfuzz", "difflib"])
+def backend(request, monkeypatch):
+    if request.param == "rapidfuzz":
+        if timestamp_matcher._rapidfuzz_extract_iter is None:
+            pytest.skip("rapidfuzz não instalado")
+    else:
+        monkeypatch.setattr(timestamp_matcher, "_rapidfuzz_ratio", None)
+        monkeypatch.setattr(timestamp_matcher, "_rapidfuzz_extract_iter", None)
+        monkeypatch.setattr(timestamp_matcher, "_rapidfuzz_alinhamento_parcial", None)
+    return request.param
+
+
+def test_mesmo_indice_com_e_sem_rapidfuzz(backend):
+    indice, similaridade = encontrar_inicio_conteudo_no_array(
+        "O limite de uma função", _palavras_com_timestamps(TRANSCRICAO),
+        min_palavras=5, threshold=0.8
+    )
+
+    assert indice == INDICE_ESPERADO
+    assert similaridade == pytest.approx(0.826, abs=1e-3)
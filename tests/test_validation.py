@@ -0,0 +1,37 @@
+from src.validation import validar_conteudo
+
+
+TRANSCRICAO = (
+    "Olá, pessoal, sejam bem-vindos à aula de hoje. "
+    "Hoje vamos falar sobre o poema. O poema é um texto escrito em versos."
+)
+
+
+class _ClienteSemChamadas:
+    """Cliente falso: a verificação local não deve chegar ao LLM."""
+
+    @property
+    def chat(self):
+        raise AssertionError("validar_conteudo chamou o LLM")
+
+
+def test_slide_de_introducao_sem_conceito_passa_na_verificacao_local():
+    slides = [
+        {
+            "tipo": "introducao",
+            "titulo_conceito": None,
+            "slide_title": "Boas-vindas",
+            "slide_bullets": ["sejam bem-vindos à aula de hoje"],
+        },
+        {
+            "tipo": "conteudo",
+            "titulo_conceito": "poema",
+            "slide_title": "O Poema",
+            "slide_bullets": ["O poema é um texto escrito em versos"],
+        },
+    ]
+
+    resultado = validar_conteudo(_ClienteSemChamadas(), TRANSCRICAO, slides)
+
+    assert resultado["conteudo_valido"] is True
+    assert resultado["slides_corretos"] == [0, 1]
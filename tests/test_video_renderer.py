@@ -0,0 +1,79 @@
+import json
+import wave
+
+import pytest
+
+pytest.importorskip("moviepy")
+pytest.importorskip("PIL")
+
+from PIL import Image
+
+from src import video_renderer
+from src.video_renderer import renderizar_video
+
+
+DURACAO_AUDIO = 6.0
+FPS = 24
+
+
+def _escrever_wav_silencioso(caminho, duracao, taxa=16000):
+    with wave.open(str(caminho), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(taxa)
+        wav.writeframes(b"\0\0" * int(duracao * taxa))
+
+
+def _preparar_entradas(pasta):
+    pasta_imagens = pasta / "imagens"
+    pasta_imagens.mkdir()
+    for i, cor in enumerate(["red", "blue"]):
+        Image.new("RGB", (320, 180), cor).save(pasta_imagens / f"slide_{i}.png")
+
+    show_script_path = pasta / "show_script.json"
+    show_script_path.write_text(json.dumps([
+        {"timestamp": 0.0, "slide_index": 0},
+        {"timestamp": 2.0, "slide_index": 1},
+    ]))
+    audio_path = pasta / "audio.wav"
+    _escrever_wav_silencioso(audio_path, DURACAO_AUDIO)
+    return show_script_path, audio_path, pasta_imagens
+
+
+def test_video_dura_o_mesmo_que_o_audio(tmp_path, monkeypatch):
+    from moviepy import VideoFileClip
+
+    monkeypatch.chdir(tmp_path)
+    show_script_path, audio_path, pasta_imagens = _preparar_entradas(tmp_path)
+
+    video_path = renderizar_video(
+        show_script_path, audio_path, pasta_imagens, tmp_path / "video.mp4",
+        resolucao=(320, 180), fps=FPS
+    )
+
+    # Slides estáticos: o mpdecimate descarta quase todos os quadros do último
+    # slide, mas o vídeo ainda precisa cobrir o áudio inteiro
+    video = VideoFileClip(str(video_path))
+    try:
+        assert video.duration == pytest.approx(DURACAO_AUDIO, abs=2 / FPS)
+    finally:
+        video.close()
+
+
+def test_pilha_removida_quando_a_renderizacao_falha(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    show_script_path, audio_path, pasta_imagens = _preparar_entradas(tmp_path)
+
+    def _falhar(*args, **kwargs):
+        raise OSError("falha simulada")
+
+    monkeypatch.setattr(video_renderer, "MIN_SLIDES_MMAP", 1)
+    monkeypatch.setattr(video_renderer, "_adicionar_audio", _falhar)
+
+    with pytest.raises(OSError):
+        renderizar_video(
+            show_script_path, audio_path, pasta_imagens, tmp_path / "video.mp4",
+            resolucao=(320, 180), fps=FPS
+        )
+
+    assert not list(pasta_imagens.rglob("pilha_*.npy"))